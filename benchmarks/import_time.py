@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+#
+# Measure how long it takes a fresh interpreter to import cdrouter and
+# get a CDRouter object ready to use one service, so changes that slow
+# down startup of short-lived scripts are noticed.  If budget is given,
+# exit non-zero when the median time to construct a CDRouter object
+# and access one service exceeds it.
+#
+# usage: import_time.py [runs] [budget_ms]
+
+import os
+import statistics
+import subprocess
+import sys
+
+runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+budget = float(sys.argv[2]) if len(sys.argv) > 2 else None
+
+here = os.path.dirname(os.path.abspath(__file__))
+top = os.path.dirname(here)
+env = dict(os.environ, PYTHONPATH=top, PYTHONWARNINGS='ignore')
+
+stages = [
+    ('import cdrouter', 'import cdrouter'),
+    ('from cdrouter import CDRouter', 'from cdrouter import CDRouter'),
+    ('CDRouter()', 'from cdrouter import CDRouter\n'
+                   'c = CDRouter("http://localhost", token="x")'),
+    ('CDRouter().results', 'from cdrouter import CDRouter\n'
+                           'c = CDRouter("http://localhost", token="x")\n'
+                           'c.results'),
+    ('CDRouter() all services', 'from cdrouter import CDRouter\n'
+                                'c = CDRouter("http://localhost", token="x")\n'
+                                'for s in ["alerts", "configs", "devices", "attachments", "jobs", "packages",\n'
+                                '          "results", "tests", "annotations", "captures", "highlights",\n'
+                                '          "imports", "exports", "history", "system", "tags", "testsuites",\n'
+                                '          "users"]:\n'
+                                '    getattr(c, s)'),
+]
+
+template = '''import time
+t = time.perf_counter()
+{}
+print(time.perf_counter() - t)
+'''
+
+def measure(code):
+    times = []
+    for _ in range(runs):
+        out = subprocess.check_output([sys.executable, '-c', template.format(code)], cwd=top, env=env)
+        times.append(float(out) * 1000)
+    return min(times), statistics.median(times)
+
+results = {}
+print('{:<30} {:>10} {:>10}'.format('stage', 'min ms', 'median ms'))
+for label, code in stages:
+    best, median = measure(code)
+    results[label] = median
+    print('{:<30} {:>10.1f} {:>10.1f}'.format(label, best, median))
+
+if budget is not None and results['CDRouter().results'] > budget:
+    print('CDRouter().results took {:.1f}ms, over budget of {:.1f}ms'.format(results['CDRouter().results'], budget))
+    sys.exit(1)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+#
+# Compare the time taken by each installed JSON backend to decode list
+# responses and encode bulk request bodies like the ones sent and
+# received by cdrouter.py.
+#
+# usage: json_backends.py [rows]
+
+import sys
+import timeit
+
+from cdrouter import cdr_json
+
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+def result(i):
+    return {'id': str(i), 'created': '2020-01-01T12:00:00.123456-05:00', 'updated': '2020-01-01T13:00:00.123456-05:00',
+            'result': 'fail', 'status': 'completed', 'loops': 1, 'tests': 250, 'pass': 247, 'fail': 3, 'alerts': 0,
+            'duration': 3600, 'size_on_disk': 1048576, 'starred': False, 'archived': False,
+            'result_dir': '/usr/cdrouter-data/results/20200101120000', 'agent_name': '', 'package_name': 'nightly',
+            'device_name': 'gateway', 'config_name': 'lab', 'package_id': '10', 'device_id': '20', 'config_id': '30',
+            'user_id': '1', 'note': '', 'tags': ['nightly', 'dhcp'], 'testcases': ['cdrouter-1', 'cdrouter-2'],
+            'options': {'tags': ['nightly'], 'skip_tests': [], 'begin_at': '', 'end_at': '', 'extra_cli_args': ''}}
+
+def testresult(i):
+    return {'id': '12345', 'seq': str(i), 'loop': '1', 'result': 'pass', 'alerts': 0, 'retries': 0,
+            'started': '2020-01-01T12:00:00.123456-05:00', 'duration': 12, 'flagged': False,
+            'name': 'cdrouter_basic_{}'.format(i), 'description': 'Verify DHCP lease renewal',
+            'skip_name': '', 'skip_reason': '', 'log': 'cdrouter_basic_{}.txt'.format(i), 'note': ''}
+
+links = {'first': 1, 'last': 10, 'current': 1, 'total': rows * 10, 'limit': rows, 'next': 2}
+
+payloads = [
+    ('results page', {'timestamp': '2020-01-01T12:00:00Z', 'data': [result(i) for i in range(rows)], 'links': links}),
+    ('tests page', {'timestamp': '2020-01-01T12:00:00Z', 'data': [testresult(i) for i in range(rows)], 'links': links}),
+]
+bodies = [
+    ('bulk_edit', {'fields': {'tags': ['nightly', 'dhcp'], 'starred': True},
+                   'results': [{'id': str(i)} for i in range(rows)]}),
+    ('bulk_launch', {'jobs': [{'package_id': str(i), 'tags': ['nightly'], 'options': {'tags': ['nightly']}}
+                              for i in range(rows)]}),
+]
+
+backends = []
+for name, _ in cdr_json.BACKENDS:
+    try:
+        backends.append(cdr_json.backend(name))
+    except ImportError:
+        print('{}: not installed'.format(name))
+
+stdlib = cdr_json.backend('json')
+
+def bench(fn):
+    return min(timeit.repeat(fn, number=1, repeat=5))
+
+print('{:<22} {:<8} {:>10} {:>14}'.format('payload', 'backend', 'ms', 'vs json'))
+for label, obj in payloads:
+    doc = stdlib.dumps(obj)
+    base = bench(lambda: stdlib.loads(doc))
+    for b in backends:
+        t = base if b.name == 'json' else bench(lambda: b.loads(doc))
+        print('{:<22} {:<8} {:>10.1f} {:>13.1f}x'.format('loads ' + label, b.name, t * 1000, base / t))
+for label, obj in bodies:
+    base = bench(lambda: stdlib.dumps(obj))
+    for b in backends:
+        t = base if b.name == 'json' else bench(lambda: b.dumps(obj))
+        print('{:<22} {:<8} {:>10.1f} {:>13.1f}x'.format('dumps ' + label, b.name, t * 1000, base / t))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+#
+# Compare memory used by the slotted high-volume models against the
+# same models with a per-instance __dict__.
+#
+# usage: models_memory.py [count]
+
+import gc
+import sys
+import tracemalloc
+from datetime import datetime
+
+from cdrouter.alerts import Alert
+from cdrouter.history import History
+from cdrouter.results import Result
+from cdrouter.testresults import Line, TestResult
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+now = datetime(2020, 1, 1, 12, 0, 0)
+
+samples = [
+    (Result, dict(id=12345, created=now, updated=now, result='fail', status='completed', loops=1,
+                  tests=250, fail=3, alerts=0, duration=3600, size_on_disk=1048576, starred=False,
+                  archived=False, result_dir='/usr/cdrouter-data/results/20200101120000',
+                  agent_name='', package_name='nightly', device_name='gateway', config_name='lab',
+                  package_id=10, device_id=20, config_id=30, user_id=1, note='', tags=['nightly'],
+                  testcases=['cdrouter-1'], options=None, features=None, **{'pass': 247})),
+    (TestResult, dict(id=12345, seq=42, loop=1, result='pass', alerts=0, retries=0, started=now,
+                      duration=12, flagged=False, name='cdrouter_basic_1',
+                      description='Verify DHCP lease', skip_name='', skip_reason='',
+                      log='cdrouter_basic_1.txt', note='')),
+    (Line, dict(raw='2020-01-01 12:00:00 INFO  Sending DHCP DISCOVER', line=1234, header=False,
+                section=False, prefix='INFO', name='', timestamp='12:00:00',
+                timestamp_display='12:00:00.000', message='Sending DHCP DISCOVER')),
+    (Alert, dict(category='Potentially Bad Traffic', description='DNS query', dest_ip='10.0.0.1',
+                 dest_port=53, interface='lan', line=100, proto='UDP', rev=1, severity=2,
+                 sid=2000001, signature='ET POLICY DNS', src_ip='10.0.0.2', src_port=5353,
+                 test_name='cdrouter_basic_1', timestamp=now, id=12345, seq=42, loop=1)),
+    (History, dict(user_id=1, created=now, resource='results', id=12345, name='12345',
+                   action='created', description='Result started')),
+]
+
+def measure(cls, kwargs):
+    gc.collect()
+    tracemalloc.start()
+    objs = [cls(**kwargs) for _ in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objs
+    return size
+
+print('{:<12} {:>14} {:>14} {:>8}'.format('model', 'dict B/obj', 'slots B/obj', 'saved'))
+for cls, kwargs in samples:
+    plain = type(cls.__name__, (object,), {'__init__': cls.__init__})
+    before = measure(plain, kwargs)
+    after = measure(cls, kwargs)
+    print('{:<12} {:>14} {:>14} {:>7.0f}%'.format(cls.__name__, before // count, after // count,
+                                                   100.0 * (before - after) / before))
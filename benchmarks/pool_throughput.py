@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+#
+# Measure request throughput of one CDRouter object shared by a growing
+# number of threads, with requests' default pool of 10 connections and
+# with CDRouter's default pool size.  Requests go to a small local HTTP
+# server run in a separate process which answers after a fixed delay
+# and counts the connections it accepts.  Each new connection also
+# waits connect_ms before being served, standing in for the TCP and TLS
+# handshakes with a remote system.
+#
+# usage: pool_throughput.py [requests] [delay_ms] [connect_ms]
+
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cdrouter import CDRouter
+
+total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+delay = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.005
+connect = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.02
+
+def serve(port, connections, delay, connect):
+    body = json.dumps({'data': 'cdrouter'}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            BaseHTTPRequestHandler.setup(self)
+            with connections.get_lock():
+                connections.value += 1
+            time.sleep(connect)
+
+        def do_GET(self): # pylint: disable=invalid-name
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args): # pylint: disable=arguments-differ
+            pass
+
+    srv = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    srv.request_queue_size = 256
+    port.value = srv.server_address[1]
+    srv.serve_forever()
+
+def run(url, workers, pool_size):
+    # every worker sends the same GET, so keep them from being coalesced
+    c = CDRouter(url, token='x', pool_size=pool_size, coalesce=False)
+    c.system.hostname()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(lambda _: c.system.hostname(), range(total)))
+    return total / (time.perf_counter() - start)
+
+if __name__ == '__main__':
+    port = multiprocessing.Value('i', 0)
+    connections = multiprocessing.Value('i', 0)
+    proc = multiprocessing.Process(target=serve, args=(port, connections, delay, connect), daemon=True)
+    proc.start()
+    while port.value == 0:
+        time.sleep(0.01)
+    url = 'http://127.0.0.1:{}'.format(port.value)
+
+    print('{:>8} {:>10} {:>10} {:>12}'.format('workers', 'pool_size', 'req/s', 'connections'))
+    for workers in [1, 4, 8, 16, 32, 64]:
+        for pool_size in [10, 32]:
+            before = connections.value
+            rate = run(url, workers, pool_size)
+            print('{:>8} {:>10} {:>10.0f} {:>12}'.format(workers, pool_size, rate, connections.value - before))
+    proc.terminate()
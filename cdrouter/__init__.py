@@ -5,6 +5,28 @@
 
 """Python client for the CDRouter Web API."""
 
+import importlib
+import sys
+
 __version__ = "0.5.4"
 
-from .cdrouter import CDRouter
+__all__ = ['CDRouter']
+
+if sys.version_info < (3, 7):
+    from .cdrouter import CDRouter
+else:
+    # import CDRouter on first use so that importing the package
+    # (e.g. just to read __version__) doesn't load requests and
+    # marshmallow.  Submodules, such as cdrouter.jobs, are imported on
+    # first access too.
+    def __getattr__(name):
+        if name == 'CDRouter':
+            cls = globals()['CDRouter'] = importlib.import_module('.cdrouter', __name__).CDRouter
+            return cls
+        if not name.startswith('__'):
+            try:
+                return importlib.import_module('.' + name, __name__)
+            except ImportError as e:
+                if getattr(e, 'name', None) != __name__ + '.' + name:
+                    raise
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
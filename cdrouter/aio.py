@@ -0,0 +1,1035 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Module for accessing the CDRouter Web API with asyncio.
+
+Requires Python 3.6+ and aiohttp (``pip install cdrouter[async]``).
+"""
+
+import asyncio
+import collections
+from functools import partial
+import inspect
+import io
+import json as _json
+import os
+import socket
+from timeit import default_timer as timer
+
+try:
+    from urllib.parse import urljoin
+except ImportError: # pragma: no cover
+    from urlparse import urljoin
+
+import aiohttp
+from requests.exceptions import HTTPError
+from requests.utils import super_len
+from requests_toolbelt.utils.user_agent import user_agent
+
+from . import __version__
+from . import cdr_json
+from .cdr_adapter import socket_options
+from .cdr_cache import ResponseCache, cache_key, identity
+from .cdr_error import CDRouterError
+from .cdr_jsonstream import ArrayParser
+from .cdr_pagesize import PageSizer
+from .cdr_limit import release_on_close
+from .cdr_retry import RetryPolicy
+from .cdr_watch import Event, Watch
+from .cdrouter import CDRouter, _Service, _getuser_default, _getpass_default
+from .filters import Field as field
+from .alerts import AlertsService, AlertSchema, Page as AlertsPage
+from .attachments import AttachmentsService, AttachmentSchema, Page as AttachmentsPage
+from .captures import CapturesService
+from .configs import ConfigsService, Page as ConfigsPage
+from .devices import DevicesService, DeviceSchema, Page as DevicesPage
+from .exports import ExportsService
+from .history import HistoryService, HistorySchema, Page as HistoryPage
+from .jobs import JobsService, JobSchema, Page as JobsPage
+from .packages import PackagesService, PackageSchema, Page as PackagesPage
+from .results import ResultsService, ResultSchema, Page as ResultsPage
+from .system import SystemService
+from .testresults import TestResultsService, TestResultSchema, Page as TestResultsPage
+from .users import UsersService, UserSchema, Page as UsersPage
+
+class AsyncResponse(object):
+    """Class wrapping an ``aiohttp`` response so it can be handled like a
+    ``requests`` response by the shared decoding code in
+    :class:`CDRouter <cdrouter.CDRouter>`.
+
+    :param resp: ``aiohttp.ClientResponse`` object.
+    :param content: (optional) Response body as bytes, `None` if the
+        body has not been read (streaming responses).
+    """
+    def __init__(self, resp, content=None):
+        self.raw = resp
+        self.status_code = resp.status
+        self.reason = resp.reason
+        self.url = str(resp.url)
+        self.headers = resp.headers
+        self.encoding = resp.get_encoding() if content is not None else None
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self):
+        return _json.loads(self.text)
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            kind = 'Client' if self.status_code < 500 else 'Server'
+            raise HTTPError('{} {} Error: {} for url: {}'.format(self.status_code, kind, self.reason, self.url),
+                            response=self)
+
+    async def iter_content(self, chunk_size=8192):
+        async for chunk in self.raw.content.iter_chunked(chunk_size):
+            yield chunk
+
+    def close(self):
+        self.raw.release()
+
+def _params(params):
+    # aiohttp rejects None and bool query values, so encode params the
+    # same way requests does: drop None, str() everything else and
+    # repeat the key for list values
+    if params is None:
+        return None
+    ret = []
+    for k, v in params.items():
+        if not isinstance(v, (list, tuple)):
+            v = [v]
+        for x in v:
+            if x is not None:
+                ret.append((k, str(x)))
+    return ret
+
+class _ProgressReader(io.RawIOBase):
+    # file wrapper calling progress(sent, total) as aiohttp reads it
+    def __init__(self, fd, progress):
+        super(_ProgressReader, self).__init__()
+        self.fd = fd
+        self.progress = progress
+        self.sent = 0
+        self.total = super_len(fd)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return hasattr(self.fd, 'seek')
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self.fd.seek(offset, whence)
+
+    def tell(self):
+        return self.fd.tell()
+
+    def read(self, size=-1):
+        b = self.fd.read(size)
+        self.sent += len(b)
+        self.progress(self.sent, self.total)
+        return b
+
+def _client_timeout(timeout):
+    # requests-style timeout to aiohttp.ClientTimeout
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+    else:
+        connect = read = timeout
+    return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+
+def _socket_factory(opts):
+    def factory(addr_info):
+        family, type_, proto, _, _ = addr_info
+        sock = socket.socket(family=family, type=type_, proto=proto)
+        for opt in opts:
+            sock.setsockopt(*opt)
+        return sock
+    return factory
+
+async def _acquire(limit):
+    # asyncio version of cdr_limit.Limit.acquire
+    if limit.max_in_flight:
+        if limit.async_sem is None:
+            limit.async_sem = asyncio.Semaphore(limit.max_in_flight)
+        await limit.async_sem.acquire()
+    delay = limit.reserve()
+    if delay:
+        await asyncio.sleep(delay)
+
+def _release(limit):
+    if limit.async_sem is not None:
+        limit.async_sem.release()
+
+class AsyncCDRouter(object):
+    """Service for accessing the CDRouter Web API from asyncio code.
+
+    Takes the same parameters as :class:`CDRouter <cdrouter.CDRouter>`
+    and exposes the same service objects, but every service method
+    returns a coroutine and every ``iter_list`` method, as well as
+    ``results.watch``, returns an async generator.  All requests share
+    a single ``aiohttp.ClientSession``.
+
+    Usage::
+
+      async with AsyncCDRouter('http://localhost', token='deadbeef') as c:
+          r = await c.results.get(12345)
+          async for tr in c.tests.iter_list(r.id, filter=['result=fail']):
+              print(tr.name)
+
+    :param session: (optional) ``aiohttp.ClientSession`` to use.  If
+        omitted, one is created on first use and closed by ``close``.
+        ``pool_size``, ``timeout`` and ``keepalive`` only apply to a
+        session created this way.  ``pool_block`` is ignored, since
+        aiohttp always waits for a free connection.  If ``timeout`` is
+        omitted, aiohttp's default timeout is used.  ``keepalive``
+        needs aiohttp 3.12 or later.
+    """
+    BASE = CDRouter.BASE
+    MAX_VALIDATORS = CDRouter.MAX_VALIDATORS
+    STREAM_CHUNK_SIZE = CDRouter.STREAM_CHUNK_SIZE
+    MAX_FILTER_LENGTH = CDRouter.MAX_FILTER_LENGTH
+
+    #: :class:`aio.AsyncAlertsService <aio.AsyncAlertsService>` object
+    alerts = _Service('alerts', '.aio', 'AsyncAlertsService')
+    #: :class:`aio.AsyncConfigsService <aio.AsyncConfigsService>` object
+    configs = _Service('configs', '.aio', 'AsyncConfigsService')
+    #: :class:`aio.AsyncDevicesService <aio.AsyncDevicesService>` object
+    devices = _Service('devices', '.aio', 'AsyncDevicesService')
+    #: :class:`aio.AsyncAttachmentsService <aio.AsyncAttachmentsService>` object
+    attachments = _Service('attachments', '.aio', 'AsyncAttachmentsService')
+    #: :class:`aio.AsyncJobsService <aio.AsyncJobsService>` object
+    jobs = _Service('jobs', '.aio', 'AsyncJobsService')
+    #: :class:`aio.AsyncPackagesService <aio.AsyncPackagesService>` object
+    packages = _Service('packages', '.aio', 'AsyncPackagesService')
+    #: :class:`aio.AsyncResultsService <aio.AsyncResultsService>` object
+    results = _Service('results', '.aio', 'AsyncResultsService')
+    #: :class:`aio.AsyncTestResultsService <aio.AsyncTestResultsService>` object
+    tests = _Service('tests', '.aio', 'AsyncTestResultsService')
+    #: :class:`annotations.AnnotationsService <annotations.AnnotationsService>` object
+    annotations = _Service('annotations', '.annotations', 'AnnotationsService')
+    #: :class:`aio.AsyncCapturesService <aio.AsyncCapturesService>` object
+    captures = _Service('captures', '.aio', 'AsyncCapturesService')
+    #: :class:`highlights.HighlightsService <highlights.HighlightsService>` object
+    highlights = _Service('highlights', '.highlights', 'HighlightsService')
+    #: :class:`imports.ImportsService <imports.ImportsService>` object
+    imports = _Service('imports', '.imports', 'ImportsService')
+    #: :class:`aio.AsyncExportsService <aio.AsyncExportsService>` object
+    exports = _Service('exports', '.aio', 'AsyncExportsService')
+    #: :class:`aio.AsyncHistoryService <aio.AsyncHistoryService>` object
+    history = _Service('history', '.aio', 'AsyncHistoryService')
+    #: :class:`aio.AsyncSystemService <aio.AsyncSystemService>` object
+    system = _Service('system', '.aio', 'AsyncSystemService')
+    #: :class:`tags.TagsService <tags.TagsService>` object
+    tags = _Service('tags', '.tags', 'TagsService')
+    #: :class:`testsuites.TestsuitesService <testsuites.TestsuitesService>` object
+    testsuites = _Service('testsuites', '.testsuites', 'TestsuitesService')
+    #: :class:`aio.AsyncUsersService <aio.AsyncUsersService>` object
+    users = _Service('users', '.aio', 'AsyncUsersService')
+
+    def __init__(self, base, token=None, username=None, password=None, _getuser=_getuser_default, _getpass=_getpass_default, retries=3, insecure=False, session=None, cache=None, revalidate=False, fast_decode=True, json_backend=None, pool_size=32, pool_block=False, timeout=None, keepalive=60, retry_policy=None, rate_limiter=None, coalesce=False): # pylint: disable=unused-argument
+        self.base = base.rstrip('/')
+        self.token = token or os.environ.get('CDROUTER_API_TOKEN')
+        self.username = username
+        self.password = password
+        self._getuser = _getuser
+        self._getpass = _getpass
+        self.retries = retries
+        self.insecure = insecure
+        self.cache = cache
+        self.fast_decode = fast_decode
+        self.json_backend = cdr_json.backend(json_backend)
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        self.retry_policy = retry_policy or None
+        self.rate_limiter = rate_limiter
+        # in-flight GETs by cache key, as [future, waiters] lists
+        self.flights = {} if coalesce else None
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self.validators = None
+        if revalidate:
+            self.validators = ResponseCache(maxsize=self.MAX_VALIDATORS, ttl=float('inf'))
+
+        self.session = session
+        self._own_session = session is None
+        # whether Automatic Login is enabled, or None if not known yet
+        self.auto_login = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying ``aiohttp.ClientSession`` if it was created
+        by this object."""
+        if self.session is not None and self._own_session:
+            await self.session.close()
+            self.session = None
+
+    def _session(self):
+        if self.session is None:
+            kwargs = {}
+            if self.timeout is not None:
+                kwargs['timeout'] = _client_timeout(self.timeout)
+            self.session = aiohttp.ClientSession(connector=self._connector(), **kwargs)
+        return self.session
+
+    def _connector(self):
+        try:
+            return aiohttp.TCPConnector(limit=self.pool_size,
+                                        socket_factory=_socket_factory(socket_options(self.keepalive)))
+        except TypeError:
+            # socket_factory was added in aiohttp 3.12
+            return aiohttp.TCPConnector(limit=self.pool_size)
+
+    async def _auth(self, path, method, headers):
+        if method == 'POST' and path.startswith(self.base+'/authenticate'):
+            return
+
+        token = self.token
+        if token is None and self.auto_login is None:
+            # if API request with no token returns a 401, automatic
+            # login is disabled and user needs to authenticate.  The
+            # answer is kept until a request without a token gets a 401
+            async with self._session().get(self.base+self.BASE+'system/hostname/', **self._ssl()) as resp:
+                self.auto_login = resp.status != 401
+
+        if token is None and not self.auto_login:
+            await self.authenticate(self.retries)
+            token = self.token
+
+        if token is not None:
+            headers['authorization'] = 'Bearer ' + token
+
+    async def _send(self, method, path, url, retry, limit, **kwargs): # pylint: disable=too-many-arguments
+        attempt = 0
+        while True:
+            if limit is not None:
+                await _acquire(limit)
+            held = False
+            try:
+                try:
+                    raw = await self._session().request(method, url, **dict(kwargs, **self._ssl()))
+                except aiohttp.ClientConnectionError as e:
+                    if not retry:
+                        raise
+                    delay = self.retry_policy.wait(method, path, attempt, error=e)
+                    if delay is None:
+                        raise
+                else:
+                    delay = None
+                    if retry:
+                        delay = self.retry_policy.wait(method, path, attempt, status=raw.status,
+                                                       retry_after=raw.headers.get('Retry-After'))
+                    if delay is None:
+                        # the response keeps its slot until it's released
+                        if limit is not None:
+                            release_on_close(raw, partial(_release, limit), 'release')
+                            held = True
+                        return raw
+                    raw.release()
+            finally:
+                if limit is not None and not held:
+                    _release(limit)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _relogin(self, path, method, headers):
+        # a request sent without a token got a 401, so Automatic Login
+        # has been disabled since it was probed: authenticate from now on
+        if method == 'POST' and path.startswith(self.base+'/authenticate'):
+            return False
+        if self.auto_login is True and 'authorization' not in headers:
+            self.auto_login = False
+            return True
+        return False
+
+    def _ssl(self):
+        if self.insecure:
+            return {'ssl': False}
+        return {}
+
+    # base request methods
+    async def _req(self, path, method='GET', json=None, data=None, params=None, headers=None, files=None, stream=None, idempotent=False, progress=None, cached=True): # pylint: disable=too-many-arguments
+        if headers is None:
+            headers = {}
+        headers.update({'user-agent': user_agent('cdrouter.py', __version__)})
+        if json is not None:
+            data = self.json_backend.dumps(json)
+            headers.update({'content-type': 'application/json'})
+            json = None
+        if files:
+            data = aiohttp.FormData()
+            for name, (filename, fd) in files.items():
+                if progress is not None:
+                    fd = _ProgressReader(fd, progress)
+                data.add_field(name, fd, filename=filename)
+
+        key = None
+        if self.cache is not None and cached and method == 'GET' and not stream:
+            key = cache_key(path, params, identity(self.username, self.token))
+            resp = self.cache.get(self.base, key)
+            if resp is not None:
+                return resp
+
+        url = urljoin(self.base+self.BASE, path)
+        await self._auth(url, method, headers)
+
+        retry = self.retry_policy is not None and not files and self.retry_policy.retryable(method, idempotent)
+        limit = None
+        if self.rate_limiter is not None:
+            limit = self.rate_limiter.limit_for(method, params, stream, files)
+        kwargs = dict(params=_params(params), headers=headers, json=json, data=data)
+        raw = await self._send(method, path, url, retry, limit, **kwargs)
+        if raw.status == 401 and self._relogin(url, method, headers) and not files:
+            raw.release()
+            await self._auth(url, method, headers)
+            raw = await self._send(method, path, url, retry, limit, **kwargs)
+        if stream and raw.status < 400:
+            resp = AsyncResponse(raw)
+        else:
+            try:
+                resp = AsyncResponse(raw, content=await raw.read())
+            finally:
+                raw.release()
+        if self.cache is not None and method != 'GET' and not idempotent:
+            self._invalidate(path)
+        self.raise_for_status(resp)
+        if key is not None and resp.status_code == 200:
+            resp._models = {} # pylint: disable=protected-access
+            self.cache.set(self.base, key, resp)
+        return resp
+
+    async def get(self, path, params=None, stream=None, cached=True):
+        if stream or not cached or self.flights is None:
+            return await self._req(path, method='GET', params=params, stream=stream, cached=cached)
+
+        # the request runs as its own task, so any caller, including
+        # the first, can be cancelled without cancelling it for the
+        # others; it's only cancelled once every caller has been
+        key = cache_key(path, params)
+        flight = self.flights.get(key)
+        if flight is None:
+            flight = self.flights[key] = [None, 0]
+            flight[0] = asyncio.ensure_future(self._flight(key, flight, path, params))
+        flight[1] += 1
+        try:
+            return await asyncio.shield(flight[0])
+        except asyncio.CancelledError:
+            flight[1] -= 1
+            if flight[1] == 0:
+                flight[0].cancel()
+            raise
+
+    async def _flight(self, key, flight, path, params):
+        try:
+            resp = await self._req(path, method='GET', params=params)
+        finally:
+            del self.flights[key]
+        if flight[1] > 1:
+            self._share(resp)
+        return resp
+
+    # request building is transport-agnostic, so share it with
+    # CDRouter: these return coroutines here because _req does
+    post = CDRouter.post
+    patch = CDRouter.patch
+    delete = CDRouter.delete
+    list = CDRouter.list
+    create = CDRouter.create
+    edit = CDRouter.edit
+    delete_id = CDRouter.delete_id
+    get_shares = CDRouter.get_shares
+    edit_shares = CDRouter.edit_shares
+    bulk_copy = CDRouter.bulk_copy
+    bulk_edit = CDRouter.bulk_edit
+    bulk_delete = CDRouter.bulk_delete
+    filename = CDRouter.filename
+    encode = CDRouter.encode
+    raise_for_status = staticmethod(CDRouter.raise_for_status)
+    _resource = staticmethod(CDRouter._resource)
+    _invalidate = CDRouter._invalidate
+    _share = staticmethod(CDRouter._share)
+    _conditional = CDRouter._conditional
+    _revalidated = CDRouter._revalidated
+    _names = staticmethod(CDRouter._names)
+    _decode = CDRouter._decode
+    _load = CDRouter._load
+    _stream_decode = CDRouter._stream_decode
+    _stream_links = CDRouter._stream_links
+
+    async def get_id(self, base, id, params=None, stream=None, cached=True): # pylint: disable=invalid-name,redefined-builtin
+        path = base+str(id)+'/'
+        if self.validators is None or stream:
+            return await self.get(path, params=params, stream=stream, cached=cached)
+        key, prev, headers = self._conditional(path, params)
+        resp = await self._req(path, method='GET', params=params, headers=headers, cached=cached)
+        return self._revalidated(key, prev, resp)
+
+    async def get_many(self, list_fn, ids, workers=4):
+        ids = list(ids)
+        sem = asyncio.Semaphore(max(workers, 1))
+
+        async def fetch(chunk):
+            async with sem:
+                return (await list_fn(**self._id_filter(chunk))).data
+
+        pages = await asyncio.gather(*[fetch(chunk) for chunk in self._id_chunks(ids)])
+        return self._many(ids, pages)
+
+    _id_chunks = CDRouter._id_chunks # pylint: disable=protected-access
+    _id_filter = staticmethod(CDRouter._id_filter) # pylint: disable=protected-access
+    _many = staticmethod(CDRouter._many) # pylint: disable=protected-access
+
+    async def iter_list(self, list_fn, *args, **kwargs):
+        """Async version of :meth:`CDRouter.iter_list <cdrouter.CDRouter.iter_list>`.
+        With ``prefetch`` or ``workers``, upcoming pages are fetched by
+        background tasks instead of threads."""
+        prefetch = kwargs.pop('prefetch', 0)
+        workers = kwargs.pop('workers', 0)
+        keyset = kwargs.pop('keyset', None)
+        page_time = kwargs.pop('page_time', None)
+        max_limit = kwargs.pop('max_limit', None)
+
+        sizer = None
+        if page_time and PageSizer.adaptable(kwargs.get('limit', None)):
+            sizer = PageSizer(page_time, max_limit)
+
+        stream = kwargs.get('stream', None)
+        if stream:
+            # a page's links aren't known until its data is consumed
+            prefetch = 0
+            pages = self._iter_pages(None, list_fn, *args, **kwargs)
+        elif keyset:
+            pages = self._keyset_pages(sizer, keyset, list_fn, *args, **kwargs)
+        elif workers:
+            pages = self._parallel_pages(workers, list_fn, *args, **kwargs)
+        else:
+            pages = self._iter_pages(sizer, list_fn, *args, **kwargs)
+        if prefetch:
+            pages = self._prefetch_pages(prefetch, pages)
+
+        async for data, _ in pages:
+            if stream:
+                async for d in data:
+                    yield d
+            else:
+                for d in data:
+                    yield d
+
+    async def _iter_pages(self, sizer, list_fn, *args, **kwargs):
+        while True:
+            start = timer()
+            data, links = await list_fn(*args, **kwargs)
+            elapsed = timer() - start
+            yield data, links
+            if links.next is None:
+                break
+            if sizer is not None and links.limit:
+                offset = (links.current - 1) * links.limit + len(data)
+                limit = sizer.next_limit(links.limit, len(data), elapsed, offset)
+                kwargs.update({'limit': limit, 'page': offset // limit + 1})
+            else:
+                kwargs.update({'page': links.next})
+
+    def iter_list_parallel(self, list_fn, *args, **kwargs):
+        """Async version of :meth:`CDRouter.iter_list_parallel <cdrouter.CDRouter.iter_list_parallel>`."""
+        kwargs.setdefault('workers', 4)
+        return self.iter_list(list_fn, *args, **kwargs)
+
+    async def _keyset_pages(self, sizer, key, list_fn, *args, **kwargs):
+        key, filter, sort = self._keyset_args(self._keyset_key(key, list_fn), kwargs) # pylint: disable=redefined-builtin
+        last = None
+        while True:
+            f = self._keyset_filter(key, filter, sort, last)
+            start = timer()
+            data, links = await list_fn(*args, filter=f, sort=sort, **kwargs)
+            elapsed = timer() - start
+            if data and getattr(data[-1], key, None) is None:
+                if not kwargs.get('detailed'):
+                    # the key is left out of the summary, fetch the page again in full
+                    kwargs['detailed'] = True
+                    continue
+                raise CDRouterError('keyset field {} missing from listed resources'.format(key))
+            yield data, links
+            if links.next is None or len(data) == 0:
+                break
+            last = getattr(data[-1], key)
+            if sizer is not None and links.limit:
+                kwargs.update({'limit': sizer.next_limit(links.limit, len(data), elapsed)})
+
+    _keyset_key = staticmethod(CDRouter._keyset_key) # pylint: disable=protected-access
+    _keyset_args = staticmethod(CDRouter._keyset_args) # pylint: disable=protected-access
+    _keyset_filter = staticmethod(CDRouter._keyset_filter) # pylint: disable=protected-access
+
+    async def _parallel_pages(self, workers, list_fn, *args, **kwargs):
+        data, links = await list_fn(*args, **kwargs)
+        yield data, links
+        if links.next is None or links.last is None:
+            return
+
+        pages = iter(range(links.next, links.last+1))
+        tasks = collections.deque()
+
+        def submit():
+            page = next(pages, None)
+            if page is not None:
+                tasks.append(asyncio.ensure_future(list_fn(*args, **dict(kwargs, page=page))))
+
+        try:
+            for _ in range(workers):
+                submit()
+            while tasks:
+                t = tasks.popleft()
+                submit()
+                yield await t
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    async def _prefetch_pages(self, depth, pages):
+        q = asyncio.Queue(maxsize=depth)
+
+        async def produce():
+            try:
+                async for page in pages:
+                    await q.put((page, None))
+            except Exception as e: # pylint: disable=broad-except
+                await q.put((None, e))
+                return
+            finally:
+                await pages.aclose()
+            await q.put((None, None))
+
+        task = asyncio.ensure_future(produce())
+        try:
+            while True:
+                page, err = await q.get()
+                if err is not None:
+                    raise err
+                if page is None:
+                    break
+                yield page
+        finally:
+            task.cancel()
+
+    async def decode(self, schema, resp, many=None, links=False, stream=False):
+        if inspect.isawaitable(resp):
+            resp = await resp
+        if stream and many is True:
+            return self._stream_decode(schema, resp, links)
+        return CDRouter.decode(self, schema, resp, many=many, links=links)
+
+    async def _iter_decode(self, schema, resp, links):
+        parser = ArrayParser()
+        try:
+            async for chunk in resp.iter_content(chunk_size=self.STREAM_CHUNK_SIZE):
+                for d in parser.feed(chunk):
+                    yield self._load(schema, d, many=False)
+            for d in parser.close():
+                yield self._load(schema, d, many=False)
+        finally:
+            resp.close()
+        self._stream_links(parser, resp, links)
+
+    async def download(self, resp, dest=None, stream=False, chunk_size=None):
+        """Async version of :meth:`CDRouter.download <cdrouter.CDRouter.download>`.
+        With ``stream``, the chunks come from an async generator.
+        Files given by path are written with blocking writes.
+
+        :param resp: Awaitable returning a streaming :class:`aio.AsyncResponse <aio.AsyncResponse>`.
+        :rtype: tuple `(dest, 'filename')`
+        """
+        resp = await resp
+        if chunk_size is None:
+            chunk_size = self.STREAM_CHUNK_SIZE
+        filename = self.filename(resp)
+        if stream:
+            return (self._iter_chunks(resp, chunk_size), filename)
+
+        try:
+            if dest is None:
+                b = io.BytesIO()
+                await self._write_chunks(resp, b, chunk_size)
+                b.seek(0)
+                return (b, filename)
+            if hasattr(dest, 'write'):
+                await self._write_chunks(resp, dest, chunk_size)
+                return (dest, filename)
+            dest = self._dest_path(dest, filename)
+            with open(dest, 'wb') as fd:
+                await self._write_chunks(resp, fd, chunk_size)
+            return (dest, filename)
+        finally:
+            resp.close()
+
+    _dest_path = staticmethod(CDRouter._dest_path) # pylint: disable=protected-access
+
+    @staticmethod
+    async def _write_chunks(resp, fd, chunk_size):
+        async for chunk in resp.iter_content(chunk_size):
+            fd.write(chunk)
+
+    @staticmethod
+    async def _iter_chunks(resp, chunk_size):
+        try:
+            async for chunk in resp.iter_content(chunk_size):
+                yield chunk
+        finally:
+            resp.close()
+
+    async def text(self, resp):
+        return (await resp).text
+
+    async def json(self, resp):
+        return (await resp).json()
+
+    def download_range(self, path, dest, params=None, ranges=1, chunk_size=None): # pylint: disable=too-many-arguments,unused-argument,no-self-use
+        raise CDRouterError('resumable downloads are not supported by AsyncCDRouter')
+
+    def export(self, base, id, format='gz', params=None, dest=None, stream=False, chunk_size=None, resume=False, ranges=1): # pylint: disable=invalid-name,redefined-builtin,too-many-arguments
+        if params is None:
+            params = {}
+        params.update({'format': format})
+        if resume or ranges > 1:
+            return self.download_range(base+str(id)+'/', dest, params=params, ranges=ranges, chunk_size=chunk_size)
+        return self.download(self.get(base+str(id)+'/', params=params, stream=True),
+                             dest=dest, stream=stream, chunk_size=chunk_size)
+
+    def bulk_export(self, base, ids, params=None, dest=None, stream=False, chunk_size=None, resume=False, ranges=1): # pylint: disable=too-many-arguments
+        if params is None:
+            params = {}
+        params.update({'bulk': 'export', 'ids': ','.join(map(str, ids))})
+        if resume or ranges > 1:
+            return self.download_range(base, dest, params=params, ranges=ranges, chunk_size=chunk_size)
+        return self.download(self.get(base, params=params, stream=True),
+                             dest=dest, stream=stream, chunk_size=chunk_size)
+
+    async def authenticate(self, retries=3):
+        """Set API token by authenticating via username/password.
+
+        :param retries: Number of authentication attempts to make before giving up as an int.
+        :return: Learned API token
+        :rtype: string
+        """
+
+        username = self.username or self._getuser(self.base)
+        password = self.password
+
+        while retries > 0:
+            if password is None:
+                password = self._getpass(self.base, username)
+
+            try:
+                resp = self.post(self.base+'/authenticate', params={'username': username, 'password': password})
+
+                schema = UserSchema()
+                u = await self.decode(schema, resp)
+
+                if u.token is not None:
+                    self.token = u.token
+                    break
+            except CDRouterError as cde:
+                password = None
+                retries -= 1
+                if retries == 0:
+                    raise cde
+
+        return self.token
+
+# Async services subclass the sync services.  Methods which only issue
+# a request and decode its response are inherited as-is, since
+# AsyncCDRouter's request methods return awaitables which its decode
+# method awaits.  Methods which post-process a response are overridden
+# below.
+
+class AsyncAlertsService(AlertsService):
+    """Asyncio version of :class:`alerts.AlertsService <alerts.AlertsService>`."""
+
+    async def list(self, id, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=invalid-name,redefined-builtin
+        schema = AlertSchema()
+        if not detailed:
+            schema = AlertSchema(exclude=('id', 'payload', 'payload_ascii', 'payload_hex', 'references'))
+        resp = self.service.list(self._base(id), filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        trs, l = await self.service.decode(schema, resp, many=True, links=True, stream=stream)
+        return AlertsPage(trs, l)
+
+class AsyncAttachmentsService(AttachmentsService):
+    """Asyncio version of :class:`attachments.AttachmentsService <attachments.AttachmentsService>`."""
+
+    async def list(self, id, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=invalid-name,redefined-builtin
+        schema = AttachmentSchema()
+        if not detailed:
+            schema = AttachmentSchema(exclude=('path'))
+        resp = self.service.list(self._base(id), filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        at, l = await self.service.decode(schema, resp, many=True, links=True, stream=stream)
+        return AttachmentsPage(at, l)
+
+    def download(self, id, attid): # pylint: disable=invalid-name,redefined-builtin
+        return self.service.download(self.service.get_id(self._base(id), attid, params={'format': 'download'}, stream=True))
+
+    def thumbnail(self, id, attid, size=None): # pylint: disable=invalid-name,redefined-builtin
+        return self.service.download(self.service.get_id(self._base(id), attid, params={'format': 'thumbnail', 'size': size}, stream=True))
+
+class AsyncCapturesService(CapturesService):
+    """Asyncio version of :class:`captures.CapturesService <captures.CapturesService>`."""
+
+    def download(self, id, seq, intf, inline=False, dest=None, stream=False, chunk_size=None, resume=False, ranges=1): # pylint: disable=invalid-name,redefined-builtin,too-many-arguments
+        if resume or ranges > 1:
+            return self.service.download_range(None, dest)
+        return self.service.download(self.service.get_id(self._base(id, seq), intf, params={'format': 'cap', 'inline': inline}, stream=True),
+                                     dest=dest, stream=stream, chunk_size=chunk_size)
+
+class AsyncConfigsService(ConfigsService):
+    """Asyncio version of :class:`configs.ConfigsService <configs.ConfigsService>`."""
+
+    async def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
+        schema = self.GET_SCHEMA
+        if not detailed:
+            schema = self.LIST_SCHEMA
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        cs, l = await self.service.decode(schema, resp, many=True, links=True, stream=stream)
+        return ConfigsPage(cs, l)
+
+    def get_new(self):
+        return self.service.text(self.service.get(self.base, params={'template': 'default'}))
+
+    def get_plaintext(self, id): # pylint: disable=invalid-name,redefined-builtin
+        return self.service.text(self.service.get_id(self.base, id, params={'format': 'text'}))
+
+    async def get_by_name(self, name): # pylint: disable=invalid-name,redefined-builtin
+        rs, _ = await self.list(filter=field('name').eq(name), limit=1)
+        if len(rs) == 0:
+            raise CDRouterError('no such config')
+        return rs[0]
+
+class AsyncDevicesService(DevicesService):
+    """Asyncio version of :class:`devices.DevicesService <devices.DevicesService>`."""
+
+    async def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
+        schema = DeviceSchema()
+        if not detailed:
+            schema = DeviceSchema(exclude=('attachments_dir', 'default_ip', 'default_login', 'default_password',
+                                           'location', 'device_category', 'manufacturer', 'manufacturer_oui',
+                                           'model_name', 'model_number', 'product_class', 'serial_number',
+                                           'hardware_version', 'software_version', 'provisioning_code', 'note',
+                                           'insecure_mgmt_url', 'mgmt_url', 'add_mgmt_addr', 'mgmt_interface',
+                                           'mgmt_addr', 'power_on_cmd', 'power_off_cmd'))
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        ds, l = await self.service.decode(schema, resp, many=True, links=True, stream=stream)
+        return DevicesPage(ds, l)
+
+    async def get_by_name(self, name): # pylint: disable=invalid-name,redefined-builtin
+        rs, _ = await self.list(filter=field('name').eq(name), limit=1)
+        if len(rs) == 0:
+            raise CDRouterError('no such device')
+        return rs[0]
+
+class AsyncExportsService(ExportsService):
+    """Asyncio version of :class:`exports.ExportsService <exports.ExportsService>`."""
+
+    def bulk_export(self, config_ids=None, device_ids=None, package_ids=None, result_ids=None, exclude_captures=False, dest=None, stream=False, chunk_size=None): # pylint: disable=too-many-arguments
+        json = {
+            'configs': [int(x) for x in config_ids or []],
+            'devices': [int(x) for x in device_ids or []],
+            'packages': [int(x) for x in package_ids or []],
+            'results': [int(x) for x in result_ids or []],
+            'options': {'exclude_captures': exclude_captures}
+        }
+        return self.service.download(self.service.post(self.base, json=json, stream=True),
+                                     dest=dest, stream=stream, chunk_size=chunk_size)
+
+class AsyncHistoryService(HistoryService):
+    """Asyncio version of :class:`history.HistoryService <history.HistoryService>`."""
+
+    async def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
+        schema = HistorySchema()
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        hs, l = await self.service.decode(schema, resp, many=True, links=True, stream=stream)
+        return HistoryPage(hs, l)
+
+class AsyncJobsService(JobsService):
+    """Asyncio version of :class:`jobs.JobsService <jobs.JobsService>`."""
+
+    async def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
+        schema = JobSchema()
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        js, l = await self.service.decode(schema, resp, many=True, links=True, stream=stream)
+        return JobsPage(js, l)
+
+class AsyncPackagesService(PackagesService):
+    """Asyncio version of :class:`packages.PackagesService <packages.PackagesService>`."""
+
+    async def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
+        schema = PackageSchema()
+        if not detailed:
+            schema = PackageSchema(exclude=('testlist', 'extra_cli_args', 'agent_id', 'options', 'note'))
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        ps, l = await self.service.decode(schema, resp, many=True, links=True, stream=stream)
+        return PackagesPage(ps, l)
+
+    async def get_by_name(self, name): # pylint: disable=invalid-name,redefined-builtin
+        rs, _ = await self.list(filter=field('name').eq(name), limit=1)
+        if len(rs) == 0:
+            raise CDRouterError('no such package')
+        return rs[0]
+
+    async def testlist_expanded(self, id): # pylint: disable=invalid-name,redefined-builtin
+        return (await self.service.json(self.service.post(self.base+str(id)+'/', params={'process': 'testlist-expanded'}, idempotent=True)))['data']
+
+class AsyncResultsService(ResultsService):
+    """Asyncio version of :class:`results.ResultsService <results.ResultsService>`."""
+
+    async def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
+        schema = ResultSchema()
+        if not detailed:
+            schema = ResultSchema(exclude=('result', 'loops', 'tests', 'result_dir', 'agent_name', 'config_name', 'note', 'pause_message', 'testcases', 'options', 'build_info'))
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        rs, l = await self.service.decode(schema, resp, many=True, links=True, stream=stream)
+        return ResultsPage(rs, l)
+
+    def list_csv(self, filter=None, type=None, sort=None, limit=None, page=None): # pylint: disable=redefined-builtin
+        return self.service.text(self.service.list(self.base, filter, type, sort, limit, page, format='csv'))
+
+    def get_logdir_file(self, id, filename): # pylint: disable=invalid-name,redefined-builtin
+        return self.service.download(self.service.get(self.base+str(id)+'/logdir/'+filename+'/', stream=True))
+
+    def download_logdir_archive(self, id, format='zip', exclude_captures=False, dest=None, stream=False, chunk_size=None, resume=False, ranges=1): # pylint: disable=invalid-name,redefined-builtin,too-many-arguments
+        if resume or ranges > 1:
+            return self.service.download_range(None, dest)
+        return self.service.download(self.service.get(self.base+str(id)+'/logdir/', params={'format': format, 'exclude_captures': exclude_captures}, stream=True),
+                                     dest=dest, stream=stream, chunk_size=chunk_size)
+
+    def get_test_metric_csv(self, id, name, metric): # pylint: disable=invalid-name,redefined-builtin
+        return self.service.text(self.service.get(self.base+str(id)+'/metrics/'+name+'/'+metric+'/',
+                                                  params={'format': 'csv'}))
+
+    async def watch(self, id, update_id=None, min_interval=0.0, max_interval=5.0): # pylint: disable=invalid-name,redefined-builtin
+        w = Watch(id, update_id, min_interval, max_interval)
+        while not w.finished:
+            start = timer()
+            items = w.handle(await self.updates(id, w.update_id), timer() - start)
+            if w.check:
+                items = w.handle_result(await self.get(id, cached=False))
+            for item in items:
+                yield item
+            if not w.finished and w.interval:
+                await asyncio.sleep(w.interval)
+
+    async def watch_many(self, ids, max_workers=4, min_interval=0.0, max_interval=5.0): # pylint: disable=invalid-name,redefined-builtin
+        # tasks instead of cdr_watch.Watcher's threads, with a semaphore
+        # bounding the polls in flight
+        sem = asyncio.Semaphore(max(max_workers, 1))
+        events = asyncio.Queue()
+
+        async def follow(id):
+            w = Watch(id, None, min_interval, max_interval)
+            try:
+                while not w.finished:
+                    async with sem:
+                        items = w.handle(await self.updates(id, w.update_id))
+                        if w.check:
+                            items = w.handle_result(await self.get(id, cached=False))
+                    for item in items:
+                        events.put_nowait(Event(self.service, id, item))
+                    if not w.finished:
+                        await asyncio.sleep(w.interval)
+            except Exception as e: # pylint: disable=broad-except
+                events.put_nowait(Event(self.service, id, e))
+            finally:
+                events.put_nowait(None)
+
+        tasks = [asyncio.ensure_future(follow(id)) for id in dict.fromkeys(ids)]
+        try:
+            left = len(tasks)
+            while left:
+                e = await events.get()
+                if e is None:
+                    left -= 1
+                else:
+                    yield e
+        finally:
+            for t in tasks:
+                t.cancel()
+
+class AsyncSystemService(SystemService):
+    """Asyncio version of :class:`system.SystemService <system.SystemService>`."""
+
+    def live(self):
+        return self.service.text(self.service.get(self.base+'live/'))
+
+    def info(self):
+        return self.service.text(self.service.get(self.base+'info/'))
+
+    def diagnostics(self):
+        return self.service.text(self.service.get(self.base+'diag/'))
+
+    async def time(self):
+        return (await self.service.json(self.service.get(self.base+'time/')))['data']['time']
+
+    async def hostname(self):
+        return (await self.service.json(self.service.get(self.base+'hostname/')))['data']
+
+class AsyncTestResultsService(TestResultsService):
+    """Asyncio version of :class:`testresults.TestResultsService <testresults.TestResultsService>`."""
+
+    async def list(self, id, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=invalid-name,redefined-builtin
+        schema = TestResultSchema()
+        resp = self.service.list(self._base(id), filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        trs, l = await self.service.decode(schema, resp, many=True, links=True, stream=stream)
+        return TestResultsPage(trs, l)
+
+    def list_csv(self, id, filter=None, type=None, sort=None, limit=None, page=None): # pylint: disable=invalid-name,redefined-builtin
+        return self.service.text(self.service.list(self._base(id), filter, type, sort, limit, page, format='csv'))
+
+    async def iter_list_log(self, id, seq, *args, **kwargs): # pylint: disable=invalid-name,redefined-builtin
+        if 'limit' not in kwargs:
+            kwargs['limit'] = 250
+
+        sizer = None
+        page_time = kwargs.pop('page_time', None)
+        max_limit = kwargs.pop('max_limit', None)
+        if page_time and PageSizer.adaptable(kwargs['limit']):
+            sizer = PageSizer(page_time, max_limit)
+
+        while True:
+            start = timer()
+            logs = await self.list_log(id, seq, *args, **kwargs)
+            elapsed = timer() - start
+            nlines = len(logs.lines)
+            if nlines == 0:
+                break
+            for l in logs.lines:
+                yield l
+            kwargs.update({'offset': logs.lines[nlines-1].line})
+            if sizer is not None:
+                kwargs.update({'limit': sizer.next_limit(kwargs['limit'], nlines, elapsed)})
+
+    def get_log_plaintext(self, id, seq): # pylint: disable=invalid-name,redefined-builtin
+        return self.service.text(self.service.get(self._base(id)+str(seq)+'/log/',
+                                                  params={'format': 'text'}))
+
+class AsyncUsersService(UsersService):
+    """Asyncio version of :class:`users.UsersService <users.UsersService>`."""
+
+    async def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
+        schema = UserSchema()
+        if not detailed:
+            schema = UserSchema(exclude=('created', 'updated', 'token', 'password', 'password_confirm'))
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        us, l = await self.service.decode(schema, resp, many=True, links=True, stream=stream)
+        return UsersPage(us, l)
+
+    async def get_by_name(self, name): # pylint: disable=invalid-name,redefined-builtin
+        rs, _ = await self.list(filter=field('name').eq(name), limit=1)
+        if len(rs) == 0:
+            raise CDRouterError('no such user')
+        return rs[0]
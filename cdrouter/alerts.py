@@ -42,6 +42,11 @@ class Alert(object):
     :param src_ip: (optional) Alert source IP as a string.
     :param src_port: (optional) Alert source port as an int.
     """
+    __slots__ = ('id', 'idx', 'created', 'updated', 'seq', 'loop', 'test_name', 'test_description',
+                 'category', 'description', 'dest_ip', 'dest_port', 'interface', 'payload',
+                 'payload_ascii', 'payload_hex', 'proto', 'references', 'rev', 'rule', 'rule_set',
+                 'severity', 'sid', 'signature', 'src_ip', 'src_port')
+
     def __init__(self, **kwargs):
         self.id = kwargs.get('id', None)
         self.idx = kwargs.get('idx', None)
@@ -268,6 +273,8 @@ class AlertsService(object):
 
     RESOURCE = 'alerts'
     BASE = '/' + RESOURCE + '/'
+    # id is the result's ID, so keyset iteration goes by idx
+    KEYSET = 'idx'
 
     def __init__(self, service):
         self.service = service
@@ -275,7 +282,7 @@ class AlertsService(object):
     def _base(self, id): # pylint: disable=invalid-name,redefined-builtin
         return 'results/'+str(id)+self.BASE
 
-    def list(self, id, filter=None, type=None, sort=None, limit=None, page=None, detailed=None): # pylint: disable=invalid-name,redefined-builtin
+    def list(self, id, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=invalid-name,redefined-builtin
         """Get a list of alerts.
 
         :param id: Result ID as an int.
@@ -285,13 +292,17 @@ class AlertsService(object):
         :param limit: (optional) Limit returned list length.
         :param page: (optional) Page to return.
         :param detailed: (optional) Return all fields if Bool `True`.
+        :param stream: (optional) If Bool `True`, read the response
+            incrementally: ``data`` of the returned page is a generator
+            decoding one resource at a time, and ``links`` is only
+            filled in once ``data`` has been exhausted.
         :return: :class:`alerts.Page <alerts.Page>` object
         """
         schema = AlertSchema()
         if not detailed:
             schema = AlertSchema(exclude=('id', 'payload', 'payload_ascii', 'payload_hex', 'references'))
-        resp = self.service.list(self._base(id), filter, type, sort, limit, page, detailed=detailed)
-        trs, l =self.service.decode(schema, resp, many=True, links=True)
+        resp = self.service.list(self._base(id), filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        trs, l =self.service.decode(schema, resp, many=True, links=True, stream=stream)
         return Page(trs, l)
 
     def iter_list(self, id, *args, **kwargs):
@@ -302,7 +313,8 @@ class AlertsService(object):
 
         :param id: Result ID as an int.
         :param args: Arguments that ``list`` takes.
-        :param kwargs: Optional arguments that ``list`` takes.
+        :param kwargs: Optional arguments that ``list`` takes, plus
+            those taken by :meth:`CDRouter.iter_list <cdrouter.CDRouter.iter_list>`.
         :return: :class:`alerts.Alert <alerts.Alert>` list
 
         """
@@ -329,5 +341,5 @@ class AlertsService(object):
         :rtype: alerts.AllStats
         """
         schema = AllStatsSchema()
-        resp = self.service.post(self._base(id), params={'stats': 'all'})
+        resp = self.service.post(self._base(id), params={'stats': 'all'}, idempotent=True)
         return self.service.decode(schema, resp)
@@ -65,7 +65,7 @@ class AttachmentsService(object):
     def _base(self, id): # pylint: disable=invalid-name,redefined-builtin
         return 'devices/'+str(id)+'/'+self.BASE
 
-    def list(self, id, filter=None, type=None, sort=None, limit=None, page=None, detailed=None): # pylint: disable=invalid-name,redefined-builtin
+    def list(self, id, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=invalid-name,redefined-builtin
         """Get a list of a device's attachments.
 
         :param id: Device ID as an int.
@@ -75,13 +75,17 @@ class AttachmentsService(object):
         :param limit: (optional) Limit returned list length.
         :param page: (optional) Page to return.
         :param detailed: (optional) Return all fields if Bool `True`.
+        :param stream: (optional) If Bool `True`, read the response
+            incrementally: ``data`` of the returned page is a generator
+            decoding one resource at a time, and ``links`` is only
+            filled in once ``data`` has been exhausted.
         :return: :class:`attachments.Page <attachments.Page>` object
         """
         schema = AttachmentSchema()
         if not detailed:
             schema = AttachmentSchema(exclude=('path'))
-        resp = self.service.list(self._base(id), filter, type, sort, limit, page, detailed=detailed)
-        at, l = self.service.decode(schema, resp, many=True, links=True)
+        resp = self.service.list(self._base(id), filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        at, l = self.service.decode(schema, resp, many=True, links=True, stream=stream)
         return Page(at, l)
 
     def iter_list(self, id, *args, **kwargs):
@@ -92,7 +96,8 @@ class AttachmentsService(object):
 
         :param id: Device ID as an int.
         :param args: Arguments that ``list`` takes.
-        :param kwargs: Optional arguments that ``list`` takes.
+        :param kwargs: Optional arguments that ``list`` takes, plus
+            those taken by :meth:`CDRouter.iter_list <cdrouter.CDRouter.iter_list>`.
         :return: :class:`attachments.Attachment <attachments.Attachment>` list
 
         """
@@ -111,18 +116,20 @@ class AttachmentsService(object):
         resp = self.service.get_id(self._base(id), attid)
         return self.service.decode(schema, resp)
 
-    def create(self, id, fd, filename='attachment-name'): # pylint: disable=invalid-name,redefined-builtin
+    def create(self, id, fd, filename='attachment-name', progress=None): # pylint: disable=invalid-name,redefined-builtin
         """Add an attachment to a device.
 
         :param id: Device ID as an int.
         :param fd: File-like object to upload.
         :param filename: (optional) Name to use for new attachment as a string.
+        :param progress: (optional) Function to call as ``progress(sent, total)``
+            while uploading, with the bytes sent so far and in total as ints.
         :return: :class:`attachments.Attachment <attachments.Attachment>` object
         :rtype: attachments.Attachment
         """
         schema = AttachmentSchema(exclude=('id', 'created', 'updated', 'size', 'path', 'device_id'))
         resp = self.service.post(self._base(id),
-                                 files={'file': (filename, fd)})
+                                 files={'file': (filename, fd)}, progress=progress)
         return self.service.decode(schema, resp)
 
     def download(self, id, attid): # pylint: disable=invalid-name,redefined-builtin
@@ -5,9 +5,6 @@
 
 """Module for accessing CDRouter Captures."""
 
-import io
-
-from requests_toolbelt.downloadutils import stream
 from marshmallow import Schema, post_load
 from marshmallow import fields as mfields
 
@@ -332,21 +329,31 @@ class CapturesService(object):
         resp = self.service.get_id(self._base(id, seq), intf)
         return self.service.decode(schema, resp)
 
-    def download(self, id, seq, intf, inline=False): # pylint: disable=invalid-name,redefined-builtin
+    def download(self, id, seq, intf, inline=False, dest=None, stream=False, chunk_size=None, resume=False, ranges=1): # pylint: disable=invalid-name,redefined-builtin,too-many-arguments
         """Download a capture as a PCAP file.
 
         :param id: Result ID as an int.
         :param seq: TestResult sequence ID as an int.
         :param intf: Interface name as string.
         :param inline: (optional) Use inline version of capture file.
+        :param dest: (optional) Path or file object to write to, see
+            :meth:`CDRouter.download <cdrouter.CDRouter.download>`.
+        :param stream: (optional) If bool `True`, return a generator of chunks instead.
+        :param chunk_size: (optional) Read size in bytes as an int.
+        :param resume: (optional) If bool `True`, download to ``dest``
+            (a path) with HTTP Range requests, continuing an earlier
+            interrupted download, see :class:`cdr_range.RangeDownload
+            <cdr_range.RangeDownload>`.
+        :param ranges: (optional) Number of byte ranges to fetch in
+            parallel as an int.  Implies ``resume``.
         :rtype: tuple `(io.BytesIO, 'filename')`
         """
-        resp = self.service.get_id(self._base(id, seq), intf, params={'format': 'cap', 'inline': inline}, stream=True)
-        b = io.BytesIO()
-        stream.stream_response_to_file(resp, path=b)
-        resp.close()
-        b.seek(0)
-        return (b, self.service.filename(resp))
+        params = {'format': 'cap', 'inline': inline}
+        if resume or ranges > 1:
+            return self.service.download_range(self._base(id, seq)+str(intf)+'/', dest, params=params, ranges=ranges,
+                                               chunk_size=chunk_size)
+        resp = self.service.get_id(self._base(id, seq), intf, params=params, stream=True)
+        return self.service.download(resp, dest=dest, stream=stream, chunk_size=chunk_size)
 
     def summary(self, id, seq, intf, filter=None, inline=False): # pylint: disable=invalid-name,redefined-builtin
         """Get a capture's summary.
@@ -0,0 +1,75 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Module for configuring the connections used to talk to a CDRouter
+system."""
+
+import socket
+
+from requests.adapters import HTTPAdapter
+
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT = 6
+
+def socket_options(keepalive):
+    """Get the options to set on each new connection's socket.
+
+    :param keepalive: Seconds a connection must be idle before TCP
+        keep-alive probes are sent as an int, or `None` to leave TCP
+        keep-alive off.
+    :return: List of ``(level, option, value)`` tuples.
+    """
+    # urllib3 disables Nagle's algorithm by default, keep doing that
+    opts = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)]
+    if not keepalive:
+        return opts
+
+    opts.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # TCP_KEEPIDLE is called TCP_KEEPALIVE on macOS
+    idle = getattr(socket, 'TCP_KEEPIDLE', getattr(socket, 'TCP_KEEPALIVE', None))
+    if idle is not None:
+        opts.append((socket.IPPROTO_TCP, idle, int(keepalive)))
+    if hasattr(socket, 'TCP_KEEPINTVL'):
+        opts.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE_INTERVAL))
+    if hasattr(socket, 'TCP_KEEPCNT'):
+        opts.append((socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KEEPALIVE_COUNT))
+    return opts
+
+class Adapter(HTTPAdapter):
+    """Transport adapter for a CDRouter system's ``requests`` session.
+
+    :param pool_size: (optional) Most connections to keep open as an
+        int.
+    :param pool_block: (optional) If bool `True`, requests wait for a
+        pooled connection to be free when ``pool_size`` are in use.
+        Otherwise a new connection is opened and then closed once the
+        request is done.
+    :param timeout: (optional) Timeout in seconds for requests which
+        don't give one, as a float or a ``(connect, read)`` tuple.  If
+        `None`, requests wait forever.
+    :param keepalive: (optional) Seconds a connection must be idle
+        before TCP keep-alive probes are sent as an int, or `None` to
+        leave TCP keep-alive off.
+    """
+    __attrs__ = HTTPAdapter.__attrs__ + ['timeout', 'socket_options']
+
+    def __init__(self, pool_size=10, pool_block=False, timeout=None, keepalive=None):
+        self.timeout = timeout
+        self.socket_options = socket_options(keepalive)
+        super(Adapter, self).__init__(pool_maxsize=pool_size, pool_block=pool_block)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs): # pylint: disable=arguments-differ
+        pool_kwargs['socket_options'] = self.socket_options
+        super(Adapter, self).init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        proxy_kwargs['socket_options'] = self.socket_options
+        return super(Adapter, self).proxy_manager_for(proxy, **proxy_kwargs)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None): # pylint: disable=too-many-arguments
+        if timeout is None:
+            timeout = self.timeout
+        return super(Adapter, self).send(request, stream=stream, timeout=timeout, verify=verify,
+                                         cert=cert, proxies=proxies)
@@ -0,0 +1,102 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Module for running many independent CDRouter Web API calls at once."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+class Batch(object):
+    """Class for running service calls on a thread pool, as returned by
+    :meth:`CDRouter.batch <cdrouter.CDRouter.batch>`.  Calls share the
+    ``CDRouter`` object's connection pool, so ``max_workers`` should be
+    no larger than its ``pool_size``.
+
+    An exception raised by a call is kept in its future and doesn't
+    stop the other calls.  Leaving the ``with`` block waits for every
+    call to finish, unless the block raised an exception, in which
+    case calls which haven't started yet are cancelled.
+
+    Usage::
+
+      with c.batch(max_workers=8) as b:
+          for tr in c.tests.iter_list(result_id, filter=['result=fail']):
+              b.submit(c.tests.list_log, tr.id, tr.seq, filter=['prefix=FAIL'])
+          for logs in b.results():
+              if isinstance(logs, Exception):
+                  continue
+              print(' '.join(log.message for log in logs.lines))
+
+    :param max_workers: (optional) Most calls to run at once as an int.
+    """
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self.futures = []
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            for f in self.futures:
+                f.cancel()
+        self.close()
+
+    def close(self):
+        """Wait for running calls to finish and shut down the thread pool."""
+        self.executor.shutdown(wait=True)
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule a call.
+
+        :param fn: Function to call, such as ``c.captures.summary``.
+        :param args: Arguments to pass to ``fn``.
+        :param kwargs: Optional arguments to pass to ``fn``.
+        :return: ``concurrent.futures.Future`` object.
+        """
+        f = self.executor.submit(fn, *args, **kwargs)
+        self.futures.append(f)
+        return f
+
+    def map(self, fn, *iterables):
+        """Schedule a call for each set of arguments taken from
+        ``iterables``, like the builtin ``map``.
+
+        :param fn: Function to call.
+        :param iterables: Iterables of arguments to pass to ``fn``.
+        :return: List of ``concurrent.futures.Future`` objects.
+        """
+        return [self.submit(fn, *args) for args in zip(*iterables)]
+
+    def results(self, return_exceptions=True):
+        """Iterate over the outcome of every call in the order they were
+        submitted, waiting for each in turn.  Calls submitted while
+        iterating are included.
+
+        :param return_exceptions: (optional) If bool `True`, yield the
+            exception raised by a failed call in place of its result.
+            If bool `False`, raise it instead.
+        :return: Generator of results.
+        """
+        i = 0
+        while i < len(self.futures):
+            f = self.futures[i]
+            i += 1
+            e = f.exception()
+            if e is None:
+                yield f.result()
+            elif return_exceptions:
+                yield e
+            else:
+                raise e
+
+    def errors(self):
+        """Get the calls which have failed so far.
+
+        :return: List of ``(index, exception)`` tuples, where ``index``
+            is the position of the call in submission order.
+        """
+        return [(i, f.exception()) for i, f in enumerate(self.futures)
+                if f.done() and not f.cancelled() and f.exception() is not None]
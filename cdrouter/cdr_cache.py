@@ -0,0 +1,420 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Module for caching CDRouter Web API responses."""
+
+import collections
+import hashlib
+import json
+import os
+import re
+from threading import Lock
+import time
+from timeit import default_timer as timer
+
+from requests.compat import urlencode
+from requests.exceptions import HTTPError
+from requests.structures import CaseInsensitiveDict
+
+def cache_key(path, params=None, identity=None):
+    """Build the cache key for a GET request.  Query params with a value
+    of `None` are dropped and the rest are sorted, so equivalent
+    requests share a key.
+
+    :param path: Request path relative to the API base as a string.
+    :param params: (optional) Query params as a dict.
+    :param identity: (optional) Who the request is made as, as
+        returned by ``identity``, so responses aren't shared between
+        users.
+    :rtype: string
+    """
+    key = path
+    if params:
+        ps = []
+        for k in sorted(params):
+            v = params[k]
+            if v is None:
+                continue
+            if not isinstance(v, (list, tuple)):
+                v = [v]
+            ps.extend((k, str(x)) for x in v)
+        if ps:
+            key += '?' + urlencode(ps)
+    if identity:
+        key += '#' + identity
+    return key
+
+def identity(username=None, token=None):
+    """Get a digest of the user requests are made as, for ``cache_key``.
+
+    :param username: (optional) Username as a string.
+    :param token: (optional) API token as a string, used if ``username`` is `None`.
+    :return: Hex digest as a string, or `None` if neither is set.
+    """
+    who = username or token
+    if not who:
+        return None
+    return hashlib.sha256(('cdrouter:' + who).encode('utf-8')).hexdigest()[:32]
+
+def matches(key, path, children=True):
+    """Check whether a cache key is for a request to ``path``.
+
+    :param key: Cache key as a string.
+    :param path: Request path prefix as a string.
+    :param children: (optional) If bool `False`, match only requests
+        for ``path`` itself, not paths under it.
+    :rtype: bool
+    """
+    if children:
+        return key.startswith(path)
+    return key == path or key.startswith(path + '?') or key.startswith(path + '#')
+
+class ResponseCache(object):
+    """Class for caching responses to read-only GET requests in memory,
+    for use as the ``cache`` argument of :class:`CDRouter
+    <cdrouter.CDRouter>`.  Cached responses expire after a TTL and the
+    least recently used response is evicted once ``maxsize`` responses
+    are cached.
+
+    TTLs are looked up by request path prefix, longest prefix first,
+    so ``ttls={'results/': 10, 'testsuites/': 3600}`` caches results
+    and their test results for 10 seconds and testsuite metadata for
+    an hour.  Requests matching no prefix use ``ttl``, and are not
+    cached if that is `None`.
+
+    Entries are keyed by the CDRouter system's base URL and the user
+    the request was made as, as well as the request, so one cache can
+    be shared by several :class:`CDRouter <cdrouter.CDRouter>`
+    objects, even ones logged in as different users.  Any other cache with the same
+    ``get``, ``set`` and ``invalidate`` methods can be passed to
+    :class:`CDRouter <cdrouter.CDRouter>` instead.
+
+    :param maxsize: (optional) Max number of responses to cache as an int.
+    :param ttl: (optional) Default TTL in seconds as a float.
+    :param ttls: (optional) Dict of TTLs in seconds keyed by path prefix.
+    """
+
+    def __init__(self, maxsize=256, ttl=None, ttls=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.lock = Lock()
+        self.entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def ttl_for(self, path):
+        """Get the TTL for a request path.
+
+        :param path: Request path relative to the API base as a string.
+        :return: TTL in seconds as a float, or `None` if ``path`` isn't cached.
+        """
+        prefixes = [p for p in self.ttls if path.startswith(p)]
+        if not prefixes:
+            return self.ttl
+        return self.ttls[max(prefixes, key=len)]
+
+    def get(self, base, key):
+        """Get a cached response.
+
+        :param base: Base URL of CDRouter system as a string.
+        :param key: Cache key as a string.
+        :return: Response, or `None` if not cached or expired.
+        """
+        with self.lock:
+            entry = self.entries.get((base, key), None)
+            if entry is None:
+                return None
+            expires, resp = entry
+            if timer() >= expires:
+                del self.entries[(base, key)]
+                return None
+            # move to the end of the LRU order
+            del self.entries[(base, key)]
+            self.entries[(base, key)] = entry
+            return resp
+
+    def set(self, base, key, resp):
+        """Cache a response.  Does nothing if the key's path has no TTL.
+
+        :param base: Base URL of CDRouter system as a string.
+        :param key: Cache key as a string.
+        :param resp: Response to cache.
+        """
+        ttl = self.ttl_for(key)
+        if ttl is None or ttl <= 0:
+            return
+        with self.lock:
+            self.entries.pop((base, key), None)
+            self.entries[(base, key)] = (timer() + ttl, resp)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, path=None, base=None, children=True):
+        """Drop cached responses.
+
+        :param path: (optional) Drop only responses whose request path
+            starts with this prefix as a string, for example
+            ``results/`` or ``results/12345/``.  If `None`, drop
+            responses for all paths.
+        :param base: (optional) Drop only responses from the CDRouter
+            system with this base URL as a string.  If `None`, drop
+            responses from all systems.
+        :param children: (optional) If bool `False`, drop only
+            responses to requests for ``path`` itself, whatever their
+            query params, such as the pages of a ``results/`` listing.
+        """
+        with self.lock:
+            for b, k in list(self.entries):
+                if (base is None or b == base) and (path is None or matches(k, path, children)):
+                    del self.entries[(b, k)]
+
+class CachedResponse(object):
+    """Class for responses read back from a :class:`DiskCache
+    <cdr_cache.DiskCache>`, with the parts of the ``requests``
+    response interface used to decode them.
+
+    :param status_code: HTTP status code as an int.
+    :param headers: Response headers as a dict.
+    :param content: Response body as bytes.
+    :param url: (optional) Request URL as a string.
+    """
+    def __init__(self, status_code, headers, content, url=None):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.url = url
+        self.reason = 'OK'
+        self.encoding = 'utf-8'
+        self._models = {}
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, 'replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            raise HTTPError('{} Error for url: {}'.format(self.status_code, self.url), response=self)
+
+    def close(self):
+        pass
+
+class DiskCache(ResponseCache):
+    """Class for caching responses to read-only GET requests in an SQLite
+    database on disk, for use as the ``cache`` argument of
+    :class:`CDRouter <cdrouter.CDRouter>`.  Any number of processes
+    can share a cache directory, so short-lived processes start with
+    the responses earlier ones fetched.
+
+    TTLs work as for :class:`ResponseCache <cdr_cache.ResponseCache>`,
+    except that once a result has been seen with a status of
+    ``completed`` or ``stopped``, it and everything under it (test
+    results, logs, etc.) are cached without expiry.  Writes made
+    through a :class:`CDRouter <cdrouter.CDRouter>` using the cache
+    still invalidate them.  Least recently used responses are evicted
+    once the cached response bodies exceed ``max_bytes``.
+
+    The cache directory and database are created readable only by
+    their owner.
+
+    :param directory: (optional) Cache directory as a string.  Default
+        is ``~/.cache/cdrouter``.
+    :param max_bytes: (optional) Max total size of cached response
+        bodies in bytes as an int.  Default is 256 MiB.
+    :param ttl: (optional) Default TTL in seconds as a float.
+    :param ttls: (optional) Dict of TTLs in seconds keyed by path prefix.
+    """
+    FINISHED = ('completed', 'stopped')
+    MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, directory=None, max_bytes=None, ttl=None, ttls=None):
+        super(DiskCache, self).__init__(ttl=ttl, ttls=ttls)
+        if directory is None:
+            directory = os.path.join(os.path.expanduser('~'), '.cache', 'cdrouter')
+        self.directory = directory
+        self.max_bytes = max_bytes or self.MAX_BYTES
+        self.conn = None
+        self.pid = None
+
+    def __len__(self):
+        with self.lock:
+            return self._db().execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def _db(self):
+        # connections can't be shared with forked children, so open a
+        # new one per process
+        if self.conn is not None and self.pid == os.getpid():
+            return self.conn
+
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory, 0o700)
+            except OSError:
+                if not os.path.isdir(self.directory):
+                    raise
+
+        # create the database before SQLite does, which would use the
+        # umask, and the journal files SQLite adds copy its mode
+        path = os.path.join(self.directory, 'responses.sqlite')
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+
+        # sqlite3 is only imported once a DiskCache is used
+        import sqlite3 # pylint: disable=import-outside-toplevel
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS responses (base TEXT, key TEXT, expires REAL, accessed REAL, '
+                     'size INTEGER, status INTEGER, headers TEXT, content BLOB, PRIMARY KEY (base, key))')
+        conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+        if 'accessed' not in [r[1] for r in conn.execute('PRAGMA table_info(finished)')]:
+            # caches from before finished rows were expired
+            conn.execute('DROP TABLE IF EXISTS finished')
+        conn.execute('CREATE TABLE IF NOT EXISTS finished (base TEXT, id TEXT, accessed REAL, PRIMARY KEY (base, id))')
+        conn.execute('CREATE INDEX IF NOT EXISTS finished_accessed ON finished (accessed)')
+        self.conn = conn
+        self.pid = os.getpid()
+        return conn
+
+    def get(self, base, key):
+        """Get a cached response.
+
+        :param base: Base URL of CDRouter system as a string.
+        :param key: Cache key as a string.
+        :return: :class:`cdr_cache.CachedResponse <cdr_cache.CachedResponse>`
+            object, or `None` if not cached or expired.
+        """
+        now = time.time()
+        with self.lock:
+            db = self._db()
+            row = db.execute('SELECT expires, status, headers, content FROM responses WHERE base=? AND key=?',
+                             (base, key)).fetchone()
+            if row is None:
+                return None
+            expires, status, headers, content = row
+            if expires is not None and now >= expires:
+                db.execute('DELETE FROM responses WHERE base=? AND key=?', (base, key))
+                return None
+            db.execute('UPDATE responses SET accessed=? WHERE base=? AND key=?', (now, base, key))
+        return CachedResponse(status, json.loads(headers), bytes(content), url=base+'/'+key)
+
+    def set(self, base, key, resp):
+        """Cache a response.  Does nothing if the key's path has no TTL
+        and isn't part of a finished result.
+
+        :param base: Base URL of CDRouter system as a string.
+        :param key: Cache key as a string.
+        :param resp: Response to cache.
+        """
+        now = time.time()
+        with self.lock:
+            db = self._db()
+            self._mark_finished(db, base, key, resp, now)
+
+            expires = None
+            if self._result_id(base, key, now) is None:
+                ttl = self.ttl_for(key)
+                if ttl is None or ttl <= 0:
+                    return
+                expires = now + ttl
+
+            import sqlite3 # pylint: disable=import-outside-toplevel
+            content = resp.content
+            db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                       (base, key, expires, now, len(content), resp.status_code,
+                        json.dumps(dict(resp.headers)), sqlite3.Binary(content)))
+            self._evict(db)
+
+    def invalidate(self, path=None, base=None, children=True):
+        """Drop cached responses.  Results are only forgotten as
+        finished when ``path`` is `None`.
+
+        :param path: (optional) Drop only responses whose request path
+            starts with this prefix as a string, for example
+            ``results/`` or ``results/12345/``.  If `None`, drop
+            responses for all paths.
+        :param base: (optional) Drop only responses from the CDRouter
+            system with this base URL as a string.  If `None`, drop
+            responses from all systems.
+        :param children: (optional) If bool `False`, drop only
+            responses to requests for ``path`` itself, whatever their
+            query params, such as the pages of a ``results/`` listing.
+        """
+        where, args = [], []
+        if base is not None:
+            where.append('base=?')
+            args.append(base)
+        if path is not None and children:
+            where.append('substr(key, 1, ?)=?')
+            args.extend([len(path), path])
+        elif path is not None:
+            where.append('(key=? OR substr(key, 1, ?) IN (?, ?))')
+            args.extend([path, len(path) + 1, path + '?', path + '#'])
+        sql = 'DELETE FROM responses'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        with self.lock:
+            db = self._db()
+            db.execute(sql, args)
+            if path is None:
+                # writes don't unfinish a result, so only forget them
+                # when dropping everything
+                if base is None:
+                    db.execute('DELETE FROM finished')
+                else:
+                    db.execute('DELETE FROM finished WHERE base=?', (base,))
+
+    def _result_id(self, base, key, now):
+        # return the result ID if key is part of a finished result
+        m = re.match(r'results/([0-9]+)/', key)
+        if m is None:
+            return None
+        db = self._db()
+        row = db.execute('SELECT id FROM finished WHERE base=? AND id=?', (base, m.group(1))).fetchone()
+        if row is None:
+            return None
+        db.execute('UPDATE finished SET accessed=? WHERE base=? AND id=?', (now, base, row[0]))
+        return row[0]
+
+    def _mark_finished(self, db, base, key, resp, now):
+        # remember finished results seen in results/ and results/<id>/ responses
+        if re.match(r'results/([0-9]+/)?(\?|#|$)', key) is None:
+            return
+        try:
+            data = resp.json()['data']
+        except (ValueError, KeyError, TypeError):
+            return
+        if not isinstance(data, list):
+            data = [data]
+        ids = [(base, str(r['id']), now) for r in data
+               if isinstance(r, dict) and 'id' in r and r.get('status') in self.FINISHED]
+        if ids:
+            db.executemany('INSERT OR REPLACE INTO finished VALUES (?, ?, ?)', ids)
+
+    def _evict(self, db):
+        db.execute('DELETE FROM responses WHERE expires<?', (time.time(),))
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            doomed = []
+            for rowid, size in db.execute('SELECT rowid, size FROM responses ORDER BY accessed'):
+                doomed.append((rowid,))
+                excess -= size
+                if excess <= 0:
+                    break
+            db.executemany('DELETE FROM responses WHERE rowid=?', doomed)
+        self._expire_finished(db)
+
+    @staticmethod
+    def _expire_finished(db):
+        # finished results not used since the least recently used
+        # response still cached go with the responses evicted before it
+        oldest = db.execute('SELECT MIN(accessed) FROM responses').fetchone()[0]
+        if oldest is None:
+            db.execute('DELETE FROM finished')
+        else:
+            db.execute('DELETE FROM finished WHERE accessed<?', (oldest,))
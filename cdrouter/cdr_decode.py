@@ -0,0 +1,221 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Module for quickly decoding CDRouter Web API responses into models.
+
+marshmallow spends most of a ``load`` call on bookkeeping around
+each field: error collection, hooks, validation.  For schemas that
+only use plain fields and simple ``post_load`` hooks, ``compile_schema``
+builds a loader that converts JSON values straight into model
+objects.  Any value a compiled loader isn't sure about (wrong type,
+`None` where it isn't allowed, etc.) makes it give up and hand the
+whole ``load`` back to marshmallow, so the result is always the same
+as ``schema.load(data, many=many).data``.
+"""
+
+from marshmallow import fields
+from marshmallow.compat import text_type
+from marshmallow.decorators import POST_LOAD, PRE_LOAD, VALIDATES, VALIDATES_SCHEMA
+from marshmallow.exceptions import ValidationError
+from marshmallow.marshalling import missing
+
+class Fallback(Exception):
+    """Exception raised by a compiled loader when ``data`` must be loaded
+    by marshmallow instead."""
+
+_loaders = {}
+
+def load(schema, data, many=None):
+    """Deserialize data with a schema, using a compiled loader if
+    possible.
+
+    :param schema: marshmallow ``Schema`` object.
+    :param data: Data to deserialize as a dict, or a list if ``many`` is `True`.
+    :param many: (optional) Bool `True` if ``data`` is a list.  If
+        `None`, ``schema.many`` is used.
+    :return: Same as ``schema.load(data, many=many).data``.
+    """
+    if many is None:
+        many = schema.many
+    loader = compile_schema(schema)
+    if loader is not None:
+        try:
+            if many:
+                if type(data) is not list: # pylint: disable=unidiomatic-typecheck
+                    raise Fallback()
+                return [loader(d) for d in data]
+            return loader(data)
+        except Fallback:
+            pass
+    return schema.load(data, many=many).data
+
+def _key(schema):
+    only = tuple(sorted(schema.only)) if schema.only else None
+    exclude = tuple(sorted(schema.exclude)) if schema.exclude else None
+    return (type(schema), only, exclude)
+
+def compile_schema(schema):
+    """Get the compiled loader for a schema.
+
+    :param schema: marshmallow ``Schema`` object.
+    :return: Function taking a dict and returning a deserialized
+        object, or `None` if the schema can't be compiled.
+    """
+    key = _key(schema)
+    if key not in _loaders:
+        _loaders[key] = None
+        _loaders[key] = _compile(schema)
+    return _loaders[key]
+
+def _compile(schema):
+    procs = schema.__processors__
+    for tag in [(PRE_LOAD, False), (PRE_LOAD, True), (POST_LOAD, True), (VALIDATES, False),
+                (VALIDATES_SCHEMA, False), (VALIDATES_SCHEMA, True)]:
+        if procs.get(tag):
+            return None
+    if schema.partial:
+        return None
+
+    hooks = []
+    for name in procs.get((POST_LOAD, False), []):
+        hook = getattr(schema, name)
+        if hook.__marshmallow_kwargs__[(POST_LOAD, False)].get('pass_original', False):
+            return None
+        hooks.append(hook)
+
+    plan = []
+    for name, field in schema.fields.items():
+        if field.dump_only:
+            continue
+        if field.required or (field.attribute and '.' in field.attribute):
+            return None
+        conv = _field(field)
+        if conv is None:
+            return None
+        plan.append((name, field.load_from, field.attribute or name, field.missing, conv))
+
+    dict_class = schema.dict_class
+
+    def loader(data):
+        if type(data) is not dict: # pylint: disable=unidiomatic-typecheck
+            raise Fallback()
+        ret = dict_class()
+        for name, load_from, attr, miss, conv in plan:
+            value = data.get(name, missing)
+            if value is missing and load_from:
+                value = data.get(load_from, missing)
+            if value is missing:
+                if miss is missing:
+                    continue
+                value = miss() if callable(miss) else miss
+            ret[attr] = conv(value)
+        for hook in hooks:
+            out = hook(ret)
+            if out is not None:
+                ret = out
+        return ret
+
+    return loader
+
+def _field(field):
+    # build a function converting a JSON value the way field.deserialize
+    # would, raising Fallback where it would raise ValidationError
+    if field.validators:
+        conv = _generic(field)
+    elif isinstance(field, fields.String) and type(field)._deserialize is fields.String._deserialize:
+        conv = _string
+    elif isinstance(field, fields.Integer) and type(field)._format_num is fields.Number._format_num:
+        conv = _number(int)
+    elif isinstance(field, fields.Float) and type(field)._format_num is fields.Number._format_num:
+        conv = _number(float)
+    elif type(field) is fields.Boolean: # pylint: disable=unidiomatic-typecheck
+        conv = _boolean(field)
+    elif type(field) is fields.Dict: # pylint: disable=unidiomatic-typecheck
+        conv = _dict
+    elif type(field) is fields.List: # pylint: disable=unidiomatic-typecheck
+        conv = _list(field)
+    elif type(field) is fields.Nested: # pylint: disable=unidiomatic-typecheck
+        conv = _nested(field)
+    else:
+        conv = _generic(field)
+
+    if conv is None:
+        return None
+
+    allow_none = getattr(field, 'allow_none', False) is True
+
+    def convert(value):
+        if value is None:
+            if allow_none:
+                return None
+            raise Fallback()
+        return conv(value)
+
+    return convert
+
+def _generic(field):
+    def conv(value):
+        try:
+            return field.deserialize(value)
+        except ValidationError:
+            raise Fallback()
+    return conv
+
+def _string(value):
+    if type(value) is not text_type: # pylint: disable=unidiomatic-typecheck
+        raise Fallback()
+    return value
+
+def _number(num_type):
+    def conv(value):
+        if type(value) is num_type: # pylint: disable=unidiomatic-typecheck
+            return value
+        try:
+            return num_type(value)
+        except (TypeError, ValueError, OverflowError):
+            raise Fallback()
+    return conv
+
+def _boolean(field):
+    def conv(value):
+        if value is True or value is False:
+            return value
+        try:
+            return field._deserialize(value, None, None) # pylint: disable=protected-access
+        except ValidationError:
+            raise Fallback()
+    return conv
+
+def _dict(value):
+    if type(value) is not dict: # pylint: disable=unidiomatic-typecheck
+        raise Fallback()
+    return value
+
+def _list(field):
+    item = _field(field.container)
+    if item is None:
+        return None
+
+    def conv(value):
+        if type(value) is not list: # pylint: disable=unidiomatic-typecheck
+            raise Fallback()
+        return [item(v) for v in value]
+    return conv
+
+def _nested(field):
+    if isinstance(field.only, text_type):
+        return None
+    schema = field.schema
+    loader = compile_schema(schema)
+    if loader is None:
+        return None
+
+    if schema.many:
+        def conv(value):
+            if type(value) is not list: # pylint: disable=unidiomatic-typecheck
+                raise Fallback()
+            return [loader(v) for v in value]
+        return conv
+    return loader
@@ -0,0 +1,68 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Module for sharing one in-flight request between callers making the
+same request at the same time."""
+
+from threading import Event, Lock
+
+class _Call(object):
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight(object):
+    """Class for coalescing concurrent identical calls.  While a call
+    for a key is running, other threads calling ``do`` with the same
+    key wait for it and get its result (or its exception) instead of
+    making the call again.  Once it returns, the next call for the key
+    is made afresh, so results are never reused after the fact.
+
+    ``shared`` counts the calls which got another call's result.
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.calls = {}
+        self.shared = 0
+
+    def do(self, key, fn, share=None):
+        """Call ``fn`` unless a call for ``key`` is already running, in
+        which case wait for it.
+
+        :param key: Hashable key identifying the call.
+        :param fn: Function to call with no arguments.
+        :param share: (optional) Function to call with the result
+            before it's handed to more than one caller.
+        :return: Return value of ``fn``.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            else:
+                call.waiters += 1
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e: # pylint: disable=broad-except
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            if call.waiters and call.error is None and share is not None:
+                share(call.result)
+            call.done.set()
+        return call.result
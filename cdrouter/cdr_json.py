@@ -0,0 +1,85 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Module for choosing the JSON library used to encode request bodies
+and decode responses."""
+
+import json
+
+class JSONBackend(object):
+    """Class wrapping a JSON library.
+
+    :param name: Name of library as a string.
+    :param loads: Function taking a JSON document as bytes and returning an object.
+    :param dumps: Function taking an object and returning a JSON document as bytes.
+    """
+    def __init__(self, name, loads, dumps):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self):
+        return 'JSONBackend({!r})'.format(self.name)
+
+def _stdlib():
+    def loads(b):
+        if isinstance(b, bytes):
+            b = b.decode('utf-8')
+        return json.loads(b)
+
+    def dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
+    return JSONBackend('json', loads, dumps)
+
+def _orjson():
+    import orjson # pylint: disable=import-error
+
+    opts = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        try:
+            return orjson.dumps(obj, option=opts)
+        except TypeError:
+            # orjson rejects some types json accepts (int subclasses
+            # over 64 bits, iterables other than list/tuple, etc.)
+            return json.dumps(obj).encode('utf-8')
+
+    return JSONBackend('orjson', orjson.loads, dumps)
+
+def _ujson():
+    import ujson # pylint: disable=import-error
+
+    def dumps(obj):
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode('utf-8')
+
+    return JSONBackend('ujson', ujson.loads, dumps)
+
+BACKENDS = [('orjson', _orjson), ('ujson', _ujson), ('json', _stdlib)]
+
+def backend(name=None):
+    """Get a JSON backend.
+
+    :param name: (optional) ``orjson``, ``ujson`` or ``json`` as a
+        string, or a :class:`cdr_json.JSONBackend
+        <cdr_json.JSONBackend>` object which is returned as is.  If
+        `None`, the fastest installed library is used, in that order.
+    :return: :class:`cdr_json.JSONBackend <cdr_json.JSONBackend>` object
+    :raise ImportError: If the library named by ``name`` is not installed.
+    :raise ValueError: If ``name`` is not a known library.
+    """
+    if isinstance(name, JSONBackend):
+        return name
+
+    for n, fn in BACKENDS:
+        if name is None:
+            try:
+                return fn()
+            except ImportError:
+                continue
+        elif name == n:
+            return fn()
+
+    raise ValueError('unknown JSON backend {!r}'.format(name))
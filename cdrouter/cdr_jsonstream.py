@@ -0,0 +1,178 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Module for incrementally parsing CDRouter Web API list responses."""
+
+import codecs
+import json
+import re
+
+_ws = re.compile(r'[ \t\n\r]*')
+_more = object()
+
+class ArrayParser(object):
+    """Class for parsing the array under one key of a JSON object as it
+    is received.  Bytes are passed to ``feed`` as they arrive, and each
+    call returns the array elements completed so far, so only one
+    element needs to be held in memory at a time.  Every other key of
+    the object is parsed into ``envelope``.
+
+    :param key: (optional) Key of array to stream as a string.
+    """
+    def __init__(self, key='data'):
+        self.key = key
+        self.envelope = {}
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.state = 'start'
+        self.current = None
+        self.closed = False
+
+    def feed(self, chunk):
+        """Parse more of the response.
+
+        :param chunk: Next part of the response body as bytes.
+        :return: List of array elements completed by ``chunk``.
+        """
+        self.buf = self.buf[self.pos:] + self.utf8.decode(chunk)
+        self.pos = 0
+        return self._parse()
+
+    def close(self):
+        """Finish parsing the response.
+
+        :return: List of any remaining array elements.
+        :raise ValueError: If the response is not a complete JSON object.
+        """
+        self.buf = self.buf[self.pos:] + self.utf8.decode(b'', final=True)
+        self.pos = 0
+        self.closed = True
+        items = self._parse()
+        if self.state != 'done' or self._skip() < len(self.buf):
+            raise ValueError('truncated or invalid JSON response')
+        return items
+
+    def _skip(self):
+        self.pos = _ws.match(self.buf, self.pos).end()
+        return self.pos
+
+    def _value(self):
+        # decode the value at pos, returning _more if the buffer doesn't
+        # hold all of it yet
+        try:
+            value, end = self.decoder.raw_decode(self.buf, self.pos)
+        except ValueError:
+            if self.closed:
+                raise
+            return _more
+        # a number at the end of the buffer may continue in the next chunk
+        if end == len(self.buf) and not self.closed:
+            return _more
+        self.pos = end
+        return value
+
+    def _parse(self): # pylint: disable=too-many-branches
+        items = []
+        buf = self.buf
+        while self._skip() < len(buf):
+            c = buf[self.pos]
+            if self.state == 'start':
+                if c != '{':
+                    raise ValueError('expected JSON object')
+                self.pos += 1
+                self.state = 'key'
+            elif self.state == 'key':
+                if c == '}':
+                    self.pos += 1
+                    self.state = 'done'
+                elif c == ',':
+                    self.pos += 1
+                else:
+                    key = self._value()
+                    if key is _more:
+                        break
+                    self.current = key
+                    self.state = 'colon'
+            elif self.state == 'colon':
+                if c != ':':
+                    raise ValueError('expected : in JSON object')
+                self.pos += 1
+                self.state = 'value'
+            elif self.state == 'value':
+                if self.current == self.key and c == '[':
+                    self.pos += 1
+                    self.envelope[self.key] = []
+                    self.state = 'array'
+                else:
+                    value = self._value()
+                    if value is _more:
+                        break
+                    self.envelope[self.current] = value
+                    self.state = 'key'
+            elif self.state == 'array':
+                if c == ']':
+                    self.pos += 1
+                    self.state = 'key'
+                elif c == ',':
+                    self.pos += 1
+                else:
+                    value = self._value()
+                    if value is _more:
+                        break
+                    items.append(value)
+            else:
+                raise ValueError('extra data after JSON object')
+        return items
+
+class StreamData(object):
+    """Class for the ``data`` of a page returned by a ``list`` call with
+    ``stream``, iterating over the resources as they are decoded.  With
+    :class:`AsyncCDRouter <aio.AsyncCDRouter>`, iterate with ``async
+    for`` instead.
+
+    The response, along with its connection and any :class:`RateLimiter
+    <cdr_limit.RateLimiter>` slot it holds, is released once every
+    resource has been read, when ``close`` is called or when the object
+    is garbage collected, whether or not iterating has started.
+
+    :param gen: Generator or async generator of resources.
+    :param resp: Streaming response object ``gen`` reads from.
+    """
+    def __init__(self, gen, resp):
+        self.gen = gen
+        self.resp = resp
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.gen)
+
+    next = __next__
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        return self.gen.__anext__()
+
+    def __del__(self):
+        self.resp.close()
+
+    def close(self):
+        """Stop iterating and release the response."""
+        if hasattr(self.gen, 'close'):
+            self.gen.close()
+        self.resp.close()
+
+    def aclose(self):
+        """Stop iterating and release the response, with an async generator.
+
+        :return: Awaitable.
+        """
+        self.resp.close()
+        return self.gen.aclose()
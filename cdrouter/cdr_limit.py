@@ -0,0 +1,139 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Module for limiting the rate and concurrency of requests made to a
+CDRouter system."""
+
+import math
+from threading import Lock, Semaphore
+import time
+from timeit import default_timer as timer
+
+METADATA = 'metadata'
+DOWNLOADS = 'downloads'
+UPLOADS = 'uploads'
+BULK = 'bulk'
+
+class Limit(object):
+    """Class for limiting one class of requests.  A token bucket holding
+    up to ``burst`` tokens is refilled at ``rate`` tokens per second
+    and each request takes a token, waiting for one if the bucket is
+    empty.  At most ``max_in_flight`` requests are sent at once.
+
+    :param rate: (optional) Requests per second as a float, or `None`
+        for no rate limit.
+    :param burst: (optional) Requests which can be sent at once after
+        an idle period as an int.  Default is ``rate`` rounded up.
+    :param max_in_flight: (optional) Most requests to have in flight at
+        once as an int, or `None` for no limit.
+    """
+    def __init__(self, rate=None, burst=None, max_in_flight=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(math.ceil(rate or 1)))
+        self.max_in_flight = max_in_flight
+        self.tokens = self.burst
+        self.stamp = timer()
+        self.lock = Lock()
+        self.sem = Semaphore(max_in_flight) if max_in_flight else None
+        # asyncio.Semaphore used by AsyncCDRouter, created on first use
+        self.async_sem = None
+
+    def reserve(self):
+        """Take a token from the bucket, which may leave it owing tokens.
+
+        :return: Seconds to wait before sending the request as a float.
+        """
+        if self.rate is None:
+            return 0
+        with self.lock:
+            now = timer()
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        """Wait until a request can be sent."""
+        if self.sem is not None:
+            self.sem.acquire()
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    def release(self):
+        """Mark a request sent with ``acquire`` as finished."""
+        if self.sem is not None:
+            self.sem.release()
+
+class RateLimiter(object):
+    """Class for limiting requests made to a CDRouter system, with
+    separate limits per class of request:
+
+    * ``uploads``: requests which upload files.
+    * ``downloads``: streaming requests, like exports, log and capture
+      downloads and ``list`` calls with ``stream``.  These hold their
+      ``max_in_flight`` slot until the response is closed.
+    * ``bulk``: bulk operations, like ``bulk_edit`` or ``bulk_launch``.
+    * ``metadata``: all other requests.
+
+    A ``RateLimiter`` can be shared by several :class:`CDRouter
+    <cdrouter.CDRouter>` objects to limit them as a whole.
+
+    :param limits: (optional) Dict mapping a request class as a string
+        to a :class:`cdr_limit.Limit <cdr_limit.Limit>` object.
+    :param default: (optional) :class:`cdr_limit.Limit
+        <cdr_limit.Limit>` object for request classes not in
+        ``limits``, or `None` to not limit them.
+    """
+    def __init__(self, limits=None, default=None):
+        self.limits = dict(limits or {})
+        self.default = default
+
+    @staticmethod
+    def classify(method, params=None, stream=None, files=None): # pylint: disable=unused-argument
+        """Get the class of a request.
+
+        :param method: HTTP method as a string.
+        :param params: (optional) Query parameters as a dict.
+        :param stream: (optional) Bool `True` if response is streamed.
+        :param files: (optional) Files to upload as a dict.
+        :return: Request class as a string.
+        """
+        if files:
+            return UPLOADS
+        if stream:
+            return DOWNLOADS
+        if params and params.get('bulk'):
+            return BULK
+        return METADATA
+
+    def limit_for(self, method, params=None, stream=None, files=None):
+        """Get the limit for a request.
+
+        :return: :class:`cdr_limit.Limit <cdr_limit.Limit>` object or `None`.
+        """
+        return self.limits.get(self.classify(method, params, stream, files), self.default)
+
+def release_on_close(resp, release, name='close'):
+    """Call ``release`` once ``resp`` is closed.
+
+    :param resp: Streaming response object.
+    :param release: Function to call with no arguments.
+    :param name: (optional) Name of method closing ``resp`` as a string.
+    """
+    close = getattr(resp, name)
+    released = []
+
+    def closing():
+        try:
+            close()
+        finally:
+            if not released:
+                released.append(True)
+                release()
+
+    setattr(resp, name, closing)
@@ -0,0 +1,68 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Module for adapting list page sizes to a target page time."""
+
+class PageSizer(object):
+    """Class for adapting the ``limit`` of successive ``list`` calls so
+    each page takes about ``page_time`` seconds to fetch and decode.
+
+    The limit moves by at most a factor of two per page and never
+    exceeds ``max_limit``, so memory stays bounded when rows are
+    large.
+
+    :param page_time: Target time per page in seconds as a float.
+    :param max_limit: (optional) Largest limit to use as an int.
+    """
+    MAX_LIMIT = 5000
+
+    def __init__(self, page_time, max_limit=None):
+        self.page_time = float(page_time)
+        self.max_limit = max_limit or self.MAX_LIMIT
+
+    @staticmethod
+    def adaptable(limit):
+        """Check whether a ``limit`` can be adapted.  Limits the API
+        takes which aren't a number of rows, like ``none``, can't.
+
+        :param limit: Limit as an int or string, or `None` for the default.
+        :rtype: bool
+        """
+        if limit is None:
+            return True
+        try:
+            int(limit)
+        except (TypeError, ValueError):
+            return False
+        return True
+
+    def next_limit(self, limit, rows, elapsed, offset=None):
+        """Compute the limit for the next page.
+
+        When ``offset`` is given the next page will be requested by page
+        number, so the limit is only ever halved or doubled and only
+        doubled when ``offset`` is a multiple of the new limit.  This
+        keeps ``offset // limit + 1`` the page number of the next page.
+
+        :param limit: Limit used for the last page as an int.
+        :param rows: Rows returned for the last page as an int.
+        :param elapsed: Time taken to fetch the last page in seconds as a float.
+        :param offset: (optional) Rows seen so far as an int, if paging by page number.
+        :return: Limit for the next page as an int.
+        """
+        limit = int(limit)
+        if rows == 0 or elapsed <= 0:
+            return limit
+
+        ideal = rows / float(elapsed) * self.page_time
+
+        if offset is None:
+            return int(min(max(ideal, limit/2.0, 1), 2*limit, self.max_limit))
+
+        if ideal >= 2*limit and 2*limit <= self.max_limit and offset % (2*limit) == 0:
+            return 2*limit
+        if ideal < limit/2.0 and limit % 2 == 0:
+            return limit//2
+        return limit
@@ -0,0 +1,254 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Module for downloading large files from a CDRouter system with HTTP
+Range requests, so interrupted downloads can be resumed."""
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import re
+from threading import Lock
+import time
+
+import requests
+
+from .cdr_cache import cache_key
+from .cdr_error import CDRouterError
+
+PART_SUFFIX = '.part'
+STATE_SUFFIX = '.part.json'
+
+def _replace(src, dst):
+    # os.replace is Python 3.3+, os.rename doesn't overwrite on Windows
+    if hasattr(os, 'replace'):
+        os.replace(src, dst)
+    else:
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+class _Changed(Exception):
+    # the file changed on the server since the download started
+    pass
+
+class RangeDownload(object):
+    """Class for downloading a file to disk with HTTP Range requests.
+
+    The file is split into ``ranges`` byte ranges fetched in parallel
+    into a preallocated ``dest + '.part'`` file, which is renamed to
+    ``dest`` once complete.  Progress is kept in ``dest + '.part.json'``
+    while downloading, so if the download is interrupted, running it
+    again with the same ``dest`` fetches only the bytes still missing.
+    A range whose connection drops mid-transfer is requested again from
+    where it stopped, as often as the client's :class:`RetryPolicy
+    <cdr_retry.RetryPolicy>` allows.  Ranges are sent with an
+    ``If-Range`` header, so if the file changed on the CDRouter system
+    the download starts over.  If it changes again, :class:`CDRouterError
+    <cdrouter.CDRouterError>` is raised.
+
+    If the CDRouter system doesn't answer with a partial response, the
+    file is downloaded in one go as with ``dest`` alone.
+
+    :param c: :class:`CDRouter <cdrouter.CDRouter>` object.
+    :param path: Request path relative to the API base as a string.
+    :param dest: Path to write to as a string.  If a directory, the
+        file is named after the response's filename.
+    :param params: (optional) Query params as a dict.
+    :param ranges: (optional) Number of byte ranges to fetch in
+        parallel as an int.
+    :param chunk_size: (optional) Read size in bytes as an int.
+    """
+    # bytes to write between saves of the resume state
+    SAVE_EVERY = 1024 * 1024
+
+    def __init__(self, c, path, dest, params=None, ranges=1, chunk_size=None): # pylint: disable=too-many-arguments
+        self.c = c
+        self.path = path
+        self.dest = dest
+        self.params = params
+        self.ranges = max(int(ranges), 1)
+        self.chunk_size = chunk_size or c.STREAM_CHUNK_SIZE
+        self.lock = Lock()
+        self.state = None
+        self.unsaved = 0
+        # set when a range fails, so the others stop early
+        self.stopped = False
+
+    def run(self):
+        """Download the file.
+
+        :return: Tuple of the path written to and the response's filename.
+        :rtype: tuple `('path', 'filename')`
+        """
+        try:
+            return self._run()
+        except _Changed:
+            self._discard()
+        try:
+            return self._run()
+        except _Changed:
+            self._discard()
+            raise CDRouterError('resource changed during download')
+
+    def _run(self):
+        resp = None
+        self.stopped = False
+        if not os.path.isdir(self.dest):
+            self.state = self._load(self.dest)
+
+        if self.state is None:
+            resp = self._request(0, None)
+            if resp.status_code != 206:
+                return self.c.download(resp, dest=self.dest, chunk_size=self.chunk_size)
+            start, end, size = self._content_range(resp)
+            if start != 0:
+                resp.close()
+                raise CDRouterError('unexpected Content-Range in response')
+            filename = self.c.filename(resp)
+            dest = self.c._dest_path(self.dest, filename) # pylint: disable=protected-access
+            self.state = self._load(dest)
+            if self.state is not None:
+                # the directory already holds a partial download
+                resp.close()
+                resp = None
+            else:
+                self.state = self._new_state(resp, dest, filename, size)
+                self._preallocate(dest + PART_SUFFIX, size)
+                self._save()
+
+        parts = [i for i, (_, end, pos) in enumerate(self.state['parts']) if pos <= end]
+        try:
+            if len(parts) > 1:
+                with ThreadPoolExecutor(max_workers=len(parts)) as ex:
+                    futures = [ex.submit(self._fetch, i, resp if i == 0 else None) for i in parts]
+                    for f in futures:
+                        f.result()
+            elif parts:
+                self._fetch(parts[0], resp if parts[0] == 0 else None)
+            elif resp is not None:
+                resp.close()
+        finally:
+            with self.lock:
+                self._save()
+
+        dest = self.state['dest']
+        if self.stopped:
+            raise CDRouterError('download stopped')
+        if os.path.getsize(dest + PART_SUFFIX) != self.state['size']:
+            raise CDRouterError('downloaded file has the wrong size')
+        _replace(dest + PART_SUFFIX, dest)
+        os.remove(dest + STATE_SUFFIX)
+        return (dest, self.state['filename'])
+
+    def _fetch(self, i, resp):
+        start, end, pos = self.state['parts'][i]
+        attempt = 0
+        while pos <= end and not self.stopped:
+            try:
+                if resp is None:
+                    resp = self._request(pos, end)
+                    if resp.status_code != 206 or self._content_range(resp)[0] != pos:
+                        raise _Changed()
+                # unbuffered, so the saved state never runs ahead of the file
+                with open(self.state['dest'] + PART_SUFFIX, 'r+b', 0) as fd:
+                    fd.seek(pos)
+                    for chunk in resp.iter_content(chunk_size=self.chunk_size):
+                        chunk = chunk[:end + 1 - pos]
+                        fd.write(chunk)
+                        pos += len(chunk)
+                        attempt = 0
+                        self._progress(i, start, end, pos, len(chunk))
+                        if pos > end or self.stopped:
+                            break
+                if pos <= end and not self.stopped:
+                    raise requests.exceptions.ChunkedEncodingError('range ended early')
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                policy = self.c.retry_policy
+                delay = None
+                if policy is not None:
+                    delay = policy.wait('GET', self.path, attempt, error=e)
+                if delay is None:
+                    self.stopped = True
+                    raise
+                time.sleep(delay)
+                attempt += 1
+            except CDRouterError as e:
+                self.stopped = True
+                if e.response is not None and e.response.status_code == 416:
+                    raise _Changed()
+                raise
+            except BaseException:
+                self.stopped = True
+                raise
+            finally:
+                if resp is not None:
+                    resp.close()
+                    resp = None
+
+    def _progress(self, i, start, end, pos, n): # pylint: disable=too-many-arguments
+        with self.lock:
+            self.state['parts'][i] = [start, end, pos]
+            self.unsaved += n
+            if self.unsaved >= self.SAVE_EVERY:
+                self._save()
+
+    def _request(self, start, end):
+        headers = {'Range': 'bytes={}-{}'.format(start, '' if end is None else end)}
+        if self.state is not None and self.state['validator']:
+            headers['If-Range'] = self.state['validator']
+        return self.c._req(self.path, method='GET', params=self.params, headers=headers, stream=True) # pylint: disable=protected-access
+
+    @staticmethod
+    def _content_range(resp):
+        m = re.match(r'bytes (\d+)-(\d+)/(\d+)', resp.headers.get('content-range', ''))
+        if m is None:
+            resp.close()
+            raise CDRouterError('missing Content-Range in partial response')
+        return int(m.group(1)), int(m.group(2)), int(m.group(3))
+
+    def _new_state(self, resp, dest, filename, size):
+        # a weak ETag can't be used with If-Range
+        validator = resp.headers.get('etag')
+        if validator is None or validator.startswith('W/'):
+            validator = resp.headers.get('last-modified')
+        step = max(-(-size // self.ranges), 1)
+        parts = [[start, min(start + step, size) - 1, start] for start in range(0, size, step)]
+        return {'key': cache_key(self.path, self.params), 'dest': dest, 'filename': filename,
+                'size': size, 'validator': validator, 'parts': parts}
+
+    def _load(self, dest):
+        try:
+            with open(dest + STATE_SUFFIX) as fd:
+                state = json.load(fd)
+        except (IOError, OSError, ValueError):
+            return None
+        if state.get('key') != cache_key(self.path, self.params) or not os.path.exists(dest + PART_SUFFIX):
+            return None
+        return state
+
+    def _save(self):
+        self.unsaved = 0
+        tmp = self.state['dest'] + STATE_SUFFIX + '.tmp'
+        with open(tmp, 'w') as fd:
+            json.dump(self.state, fd)
+        _replace(tmp, self.state['dest'] + STATE_SUFFIX)
+
+    def _discard(self):
+        dest = self.state['dest']
+        self.state = None
+        for suffix in (PART_SUFFIX, STATE_SUFFIX):
+            if os.path.exists(dest + suffix):
+                os.remove(dest + suffix)
+
+    @staticmethod
+    def _preallocate(path, size):
+        with open(path, 'wb') as fd:
+            fd.truncate(size)
+            if size and hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(fd.fileno(), 0, size)
+                except OSError:
+                    pass
@@ -0,0 +1,106 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Module for retrying CDRouter Web API requests which fail because
+the CDRouter system is briefly unavailable."""
+
+import collections
+from email.utils import mktime_tz, parsedate_tz
+import random
+from threading import Lock
+import time
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+class RetryPolicy(object):
+    """Class describing when and how often to retry a request.
+
+    A request is retried if it's a ``GET`` (which includes every page
+    of a ``list`` call) or a ``POST`` marked as idempotent, like
+    ``results.all_stats`` or ``packages.analyze``, and either the
+    connection failed or the response status is one of ``statuses``.
+    Before retry ``n`` (counting from 0), a random delay between 0 and
+    ``min(max_backoff, backoff * 2**n)`` seconds is waited.  If the
+    response has a ``Retry-After`` header, that many seconds (at most
+    ``max_backoff``) are waited instead.
+
+    ``counts`` is a ``collections.Counter`` of ``retries`` made,
+    requests which were still failing after ``total`` retries
+    (``exhausted``), and retries made per reason (the status code as
+    an int, or the exception class name).
+
+    :param total: (optional) Most retries per request as an int.
+    :param backoff: (optional) Base delay in seconds as a float.
+    :param max_backoff: (optional) Longest delay in seconds as a float.
+    :param statuses: (optional) HTTP status codes to retry as a tuple of ints.
+    :param hook: (optional) Function to call before each retry as
+        ``hook(method, path, attempt, delay, reason)``.
+    """
+    def __init__(self, total=5, backoff=0.5, max_backoff=30, statuses=(429, 502, 503, 504), hook=None): # pylint: disable=too-many-arguments
+        self.total = total
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+        self.hook = hook
+        self.counts = collections.Counter()
+        self.lock = Lock()
+
+    def retryable(self, method, idempotent=False):
+        """Check if requests with a method may be retried.
+
+        :param method: HTTP method as a string.
+        :param idempotent: (optional) Bool `True` if the request is
+            marked as safe to repeat.
+        :return: Bool `True` if the request may be retried.
+        """
+        return idempotent or method in SAFE_METHODS
+
+    def wait(self, method, path, attempt, status=None, retry_after=None, error=None): # pylint: disable=too-many-arguments
+        """Decide whether to retry a failed request and for how long to
+        wait before doing so.
+
+        :param method: HTTP method as a string.
+        :param path: Request path as a string.
+        :param attempt: Number of retries made so far as an int.
+        :param status: (optional) HTTP status code of response as an int.
+        :param retry_after: (optional) ``Retry-After`` header of response as a string.
+        :param error: (optional) Exception raised by the request.
+        :return: Seconds to wait as a float, or `None` if the request
+            shouldn't be retried.
+        """
+        if error is not None:
+            reason = type(error).__name__
+        elif status in self.statuses:
+            reason = status
+        else:
+            return None
+
+        if attempt >= self.total:
+            with self.lock:
+                self.counts['exhausted'] += 1
+            return None
+
+        delay = self._retry_after(retry_after)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+        with self.lock:
+            self.counts['retries'] += 1
+            self.counts[reason] += 1
+        if self.hook is not None:
+            self.hook(method, path, attempt, delay, reason)
+        return delay
+
+    def _retry_after(self, value):
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            date = parsedate_tz(value)
+            if date is None:
+                return None
+            delay = mktime_tz(date) - time.time()
+        return min(max(delay, 0), self.max_backoff)
@@ -0,0 +1,251 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Module for following running results via their updates."""
+
+import collections
+import heapq
+import itertools
+import time
+from timeit import default_timer as timer
+
+# result statuses of a result which hasn't finished yet
+RUNNING_STATUSES = ('running', 'paused')
+
+def finished(result):
+    """Check whether a result has finished running.
+
+    :param result: :class:`results.Result <results.Result>` object.
+    :rtype: bool
+    """
+    return result.status is not None and result.status not in RUNNING_STATUSES
+
+class Watch(object):
+    """Class holding the state of one result being followed by
+    :meth:`ResultsService.watch <results.ResultsService.watch>`: the
+    last update ID seen, the delay before the next poll and whether the
+    result has finished.
+
+    Each poll asks for the updates after ``update_id`` and only updates
+    with a newer ID are handed on, so every update is seen exactly once.
+    After a poll with news the next poll is made after
+    ``min_interval``.  After a poll without news the delay doubles, up
+    to ``max_interval``, unless the CDRouter system held the poll open
+    for at least ``max_interval`` itself, as it does for a running
+    result.  When a poll without news has no running test either, the
+    result is fetched to check whether it has finished.
+
+    :param id: Result ID as an int.
+    :param update_id: (optional) Update ID to start after as an int.
+    :param min_interval: (optional) Seconds to wait between polls while
+        updates keep coming as a float.
+    :param max_interval: (optional) Most seconds to wait between polls
+        as a float.
+    """
+    # first delay after a poll without news, in seconds
+    BACKOFF = 0.25
+
+    def __init__(self, id, update_id=None, min_interval=0.0, max_interval=5.0): # pylint: disable=invalid-name,redefined-builtin
+        self.id = id
+        self.update_id = update_id
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.interval = min_interval
+        self.finished = False
+        self.check = False
+
+    def handle(self, update, elapsed=0.0):
+        """Process the response to a poll for updates.
+
+        :param update: :class:`results.Update <results.Update>` object.
+        :param elapsed: (optional) Seconds the poll took as a float.
+        :return: List of the :class:`results.Result <results.Result>`,
+            :class:`testresults.TestResult <testresults.TestResult>` and
+            :class:`alerts.Alert <alerts.Alert>` objects not seen before.
+        """
+        self.check = False
+        if update.id is None or (self.update_id is not None and update.id <= self.update_id):
+            self._idle(update, elapsed)
+            return []
+
+        self.update_id = update.id
+        items = list(update.updates or [])
+        self.interval = self.min_interval
+        for item in items:
+            if hasattr(item, 'status') and finished(item):
+                self.finished = True
+        return items
+
+    def handle_result(self, result):
+        """Process the result fetched after ``handle`` set ``check``.
+
+        :param result: :class:`results.Result <results.Result>` object.
+        :return: List holding ``result`` if it has finished, or an empty list.
+        """
+        self.check = False
+        if not finished(result):
+            return []
+        self.finished = True
+        return [result]
+
+    def _idle(self, update, elapsed):
+        if elapsed >= self.max_interval:
+            # the server paced the poll itself
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, max(self.interval * 2, self.BACKOFF))
+        self.check = update.running is None
+
+class Event(collections.namedtuple('Event', ['c', 'id', 'item'])):
+    """Named tuple for an update of one of the results followed by a
+    :class:`cdr_watch.Watcher <cdr_watch.Watcher>`.
+
+    :param c: :class:`CDRouter <cdrouter.CDRouter>` object the result is on.
+    :param id: Result ID as an int.
+    :param item: :class:`results.Result <results.Result>`,
+        :class:`testresults.TestResult <testresults.TestResult>` or
+        :class:`alerts.Alert <alerts.Alert>` object, or the exception
+        raised while polling the result.
+    """
+
+class Watcher(object):
+    """Class for following many running results at once, possibly on
+    several CDRouter systems, as one stream of :class:`cdr_watch.Event
+    <cdr_watch.Event>` objects.
+
+    Rather than a thread per result, polls for updates are run on a
+    pool of ``max_workers`` threads.  Each result is polled as by
+    :meth:`ResultsService.watch <results.ResultsService.watch>`, except
+    that after every poll without news its next poll is put off further,
+    up to ``max_interval``, so a poll held open by an idle result
+    doesn't keep the pool from results with updates to send.  Polls are
+    made in the order they fall due.  A result drops out once it has
+    finished, after its finished :class:`results.Result
+    <results.Result>` has been emitted, or once polling it raises an
+    exception, after the exception has been emitted.  Iterating ends
+    when no results are left.
+
+    Results can be added with ``add`` at any time from the thread
+    iterating over the watcher, including from the body of the loop.
+
+    Usage::
+
+      with Watcher(max_workers=4) as w:
+          for c in (c1, c2):
+              for r in c.results.iter_list(filter=['status=running']):
+                  w.add(c, r.id)
+          for e in w:
+              if isinstance(e.item, Result):
+                  print(e.c.base, e.id, e.item.status)
+
+    :param max_workers: (optional) Most polls to run at once as an int.
+    :param min_interval: (optional) Seconds to wait between polls of a
+        result while updates keep coming as a float.
+    :param max_interval: (optional) Most seconds to wait between polls
+        of a result as a float.
+    """
+    def __init__(self, max_workers=4, min_interval=0.0, max_interval=5.0):
+        self.max_workers = max_workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        from concurrent.futures import ThreadPoolExecutor # pylint: disable=import-outside-toplevel
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # (c, id) -> Watch of results not yet finished
+        self.watches = {}
+        # heap of (due time, seq, (c, id), Watch) of results waiting to be polled
+        self.due = []
+        self.seq = itertools.count()
+        # future -> ((c, id), Watch) of polls in flight
+        self.inflight = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        return self.events()
+
+    def close(self):
+        """Stop following all results, waiting for polls in flight to
+        finish, and shut down the thread pool."""
+        self.watches.clear()
+        self.due = []
+        self.executor.shutdown(wait=True)
+        self.inflight.clear()
+
+    def add(self, c, id, update_id=None): # pylint: disable=invalid-name,redefined-builtin
+        """Start following a result.  Adding a result already being
+        followed does nothing.
+
+        :param c: :class:`CDRouter <cdrouter.CDRouter>` object the result is on.
+        :param id: Result ID as an int.
+        :param update_id: (optional) Update ID to start after as an int.
+        """
+        key = (c, id)
+        if key in self.watches:
+            return
+        w = self.watches[key] = Watch(id, update_id, self.min_interval, self.max_interval)
+        self._schedule(key, w, 0)
+
+    def remove(self, c, id): # pylint: disable=invalid-name,redefined-builtin
+        """Stop following a result.
+
+        :param c: :class:`CDRouter <cdrouter.CDRouter>` object the result is on.
+        :param id: Result ID as an int.
+        """
+        self.watches.pop((c, id), None)
+
+    def events(self):
+        """Poll the results being followed, yielding their updates as
+        they arrive.
+
+        :return: Generator of :class:`cdr_watch.Event <cdr_watch.Event>` objects.
+        """
+        from concurrent.futures import FIRST_COMPLETED, wait # pylint: disable=import-outside-toplevel
+        while self.watches:
+            now = timer()
+            while self.due and self.due[0][0] <= now and len(self.inflight) < self.max_workers:
+                _, _, key, w = heapq.heappop(self.due)
+                # skip results removed since
+                if self.watches.get(key) is w:
+                    self.inflight[self.executor.submit(self._poll, key[0], w)] = (key, w)
+
+            timeout = None
+            if self.due and len(self.inflight) < self.max_workers:
+                timeout = max(self.due[0][0] - now, 0)
+            if not self.inflight:
+                time.sleep(timeout)
+                continue
+
+            done, _ = wait(list(self.inflight), timeout=timeout, return_when=FIRST_COMPLETED)
+            for f in done:
+                key, w = self.inflight.pop(f)
+                if self.watches.get(key) is not w:
+                    continue
+                e = f.exception()
+                if e is not None:
+                    del self.watches[key]
+                    yield Event(key[0], key[1], e)
+                    continue
+                if w.finished:
+                    del self.watches[key]
+                else:
+                    self._schedule(key, w, w.interval)
+                for item in f.result():
+                    yield Event(key[0], key[1], item)
+
+    def _schedule(self, key, w, delay):
+        heapq.heappush(self.due, (timer() + delay, next(self.seq), key, w))
+
+    @staticmethod
+    def _poll(c, w):
+        # elapsed is left out, so a poll held open by the server still
+        # backs off and the result waits its turn behind busier ones
+        items = w.handle(c.results.updates(w.id, w.update_id))
+        if w.check:
+            items = w.handle_result(c.results.get(w.id, cached=False))
+        return items
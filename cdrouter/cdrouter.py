@@ -4,40 +4,38 @@
 #
 
 from builtins import input
+import collections
+import copy
+from datetime import datetime
 import getpass
+import importlib
 import io
 import os
 import re
 import requests
-from threading import Lock
-from requests_toolbelt.downloadutils import stream
-from requests_toolbelt import sessions
+from threading import Event, Lock, Thread
+import time
+from timeit import default_timer as timer
+from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor, sessions
 from requests_toolbelt.utils.user_agent import user_agent
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
+from requests.compat import urlencode
 from requests.exceptions import HTTPError
 from marshmallow import Schema, fields, post_load
 
 from . import __version__
+from . import cdr_decode
+from . import cdr_json
+from .cdr_adapter import Adapter
+from .cdr_cache import cache_key, identity
 from .cdr_error import CDRouterError
+from .cdr_flight import SingleFlight
+from .cdr_jsonstream import ArrayParser, StreamData
 from .cdr_datetime import DateTime
-from .alerts import AlertsService
-from .configs import ConfigsService
-from .devices import DevicesService
-from .attachments import AttachmentsService
-from .jobs import JobsService
-from .packages import PackagesService
-from .results import ResultsService
-from .testresults import TestResultsService
-from .annotations import AnnotationsService
-from .captures import CapturesService
-from .highlights import HighlightsService
-from .imports import ImportsService
-from .exports import ExportsService
-from .history import HistoryService
-from .system import SystemService
-from .tags import TagsService
-from .testsuites import TestsuitesService
-from .users import UsersService, UserSchema
+from .cdr_pagesize import PageSizer
+from .cdr_limit import release_on_close
+from .cdr_retry import RetryPolicy
+from .filters import Field as field
 
 class Links(object):
     """Class representing paging information returned by ``list`` calls to the CDRouter Web API.
@@ -120,6 +118,13 @@ class ShareSchema(Schema):
     def post_load(self, data):
         return Share(**data)
 
+class Many(collections.namedtuple('Many', ['data', 'missing'])):
+    """Named tuple for resources fetched by ``get_many`` calls.
+
+    :param data: Resources found, in the order their IDs were given, as a list.
+    :param missing: IDs given which matched no resource as a list.
+    """
+
 class Auth(requests.auth.AuthBase): # pylint: disable=too-few-public-methods
     """Class for authorizing CDRouter Web API requests."""
 
@@ -132,25 +137,49 @@ class Auth(requests.auth.AuthBase): # pylint: disable=too-few-public-methods
 
         self.c.lock.acquire()
         token = self.c.token
+        auto_login = self.c.auto_login
         self.c.lock.release()
 
-        if token is None:
+        if token is None and auto_login is None:
             # if API request with no token returns a 401, automatic
-            # login is disabled and user needs to authenticate
-            resp = requests.get(self.c.base + self.c.BASE + 'system/hostname/', verify=(not self.c.insecure))
+            # login is disabled and user needs to authenticate.  The
+            # answer is kept until a request without a token gets a 401
+            resp = self.c.session.get('system/hostname/', verify=(not self.c.insecure))
+            auto_login = resp.status_code != 401
+
+            self.c.lock.acquire()
+            self.c.auto_login = auto_login
+            self.c.lock.release()
 
-            if resp.status_code == 401:
-                self.c.authenticate(self.c.retries)
+        if token is None and not auto_login:
+            self.c.authenticate(self.c.retries)
 
-                self.c.lock.acquire()
-                token = self.c.token
-                self.c.lock.release()
+            self.c.lock.acquire()
+            token = self.c.token
+            self.c.lock.release()
 
         if token is not None:
             r.headers['authorization'] = 'Bearer ' + token
 
         return r
 
+class _Service(object): # pylint: disable=too-few-public-methods
+    """Descriptor for a service object of a CDRouter object.  The
+    service's module is imported and the service constructed on first
+    access, then stored on the object so later accesses are plain
+    attribute lookups."""
+
+    def __init__(self, name, module, cls):
+        self.name = name
+        self.module = module
+        self.cls = cls
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        cls = getattr(importlib.import_module(self.module, __package__), self.cls)
+        return obj.__dict__.setdefault(self.name, cls(obj))
+
 def _getuser_default(base):
     return input('username on {}: '.format(base))
 
@@ -197,10 +226,117 @@ class CDRouter(object):
         URL, skip certificate verification and allow insecure
         connections to the CDRouter system.
 
+    :param cache: (optional) :class:`cdr_cache.ResponseCache
+        <cdr_cache.ResponseCache>` or :class:`cdr_cache.DiskCache
+        <cdr_cache.DiskCache>` object (or any object with the same
+        ``get``, ``set`` and ``invalidate`` methods) to cache
+        responses to read-only GET requests in.  Any other request,
+        except those only reading like ``results.all_stats``, drops
+        the cached responses it makes stale: editing a result drops
+        those for ``results/<id>/`` and the ``results/`` listings,
+        while bulk operations drop every cached ``results/``
+        response.
+
+    :param revalidate: (optional) If bool `True`, remember the last
+        response to each ``get`` of a single resource and send its
+        ``ETag`` and ``Last-Modified`` validators with the next
+        ``get``.  If the CDRouter system replies ``304 Not Modified``
+        or with an unchanged body, the model decoded from the last
+        response is returned without decoding it again.
+
+    :param fast_decode: (optional) If bool `False`, decode every
+        response with marshmallow.  By default, responses are decoded
+        by loaders compiled from each model's schema, which build the
+        same model objects several times faster and defer to
+        marshmallow for anything they can't handle.
+
+    :param json_backend: (optional) JSON library to encode request
+        bodies and decode responses with, as a name (``orjson``,
+        ``ujson`` or ``json``) or a :class:`cdr_json.JSONBackend
+        <cdr_json.JSONBackend>` object.  If omitted, the fastest
+        installed library is used.
+
+    :param pool_size: (optional) Most connections to the CDRouter
+        system to keep open as an int.  Should be at least the number
+        of threads making requests with this object.
+
+    :param pool_block: (optional) If bool `True`, requests wait for a
+        connection to be free once ``pool_size`` are in use, instead of
+        opening a new connection which is closed afterwards.
+
+    :param timeout: (optional) Socket timeout in seconds as a float, or
+        separate connect and read timeouts as a ``(connect, read)``
+        tuple.  If omitted, requests wait forever.
+
+    :param keepalive: (optional) Seconds a connection must be idle
+        before TCP keep-alive probes are sent as an int, so idle pooled
+        connections aren't dropped by firewalls or NAT.  If `None`, TCP
+        keep-alive is off.
+
+    :param retry_policy: (optional) :class:`cdr_retry.RetryPolicy
+        <cdr_retry.RetryPolicy>` object saying when to retry requests
+        which fail because the CDRouter system is busy or unreachable.
+        If omitted, a ``RetryPolicy()`` is used.  If bool `False`,
+        requests are never retried.
+
+    :param rate_limiter: (optional) :class:`cdr_limit.RateLimiter
+        <cdr_limit.RateLimiter>` object limiting how many requests per
+        second and how many at once are sent to the CDRouter system,
+        so tooling running in parallel doesn't slow down tests running
+        on it.  Can be shared by several ``CDRouter`` objects.
+
+    :param coalesce: (optional) If bool `True`, identical GET requests
+        (same path and params) made by several threads at once share
+        one request and its response, which also shares the decoded
+        resources.  Off by default, so every call reaches the CDRouter
+        system.  Turn it on when many threads poll the same resources,
+        for instance dashboards refreshing one result.
+
     """
     BASE = '/api/v1/'
-
-    def __init__(self, base, token=None, username=None, password=None, _getuser=_getuser_default, _getpass=_getpass_default, retries=3, insecure=False):
+    MAX_VALIDATORS = 1024
+    STREAM_CHUNK_SIZE = 64 * 1024
+    # longest query string of id filters to send in one get_many request
+    MAX_FILTER_LENGTH = 2000
+
+    #: :class:`alerts.AlertsService <alerts.AlertsService>` object
+    alerts = _Service('alerts', '.alerts', 'AlertsService')
+    #: :class:`configs.ConfigsService <configs.ConfigsService>` object
+    configs = _Service('configs', '.configs', 'ConfigsService')
+    #: :class:`devices.DevicesService <devices.DevicesService>` object
+    devices = _Service('devices', '.devices', 'DevicesService')
+    #: :class:`attachments.AttachmentsService <attachments.AttachmentsService>` object
+    attachments = _Service('attachments', '.attachments', 'AttachmentsService')
+    #: :class:`jobs.JobsService <jobs.JobsService>` object
+    jobs = _Service('jobs', '.jobs', 'JobsService')
+    #: :class:`packages.PackagesService <packages.PackagesService>` object
+    packages = _Service('packages', '.packages', 'PackagesService')
+    #: :class:`results.ResultsService <results.ResultsService>` object
+    results = _Service('results', '.results', 'ResultsService')
+    #: :class:`testresults.TestResultsService <testresults.TestResultsService>` object
+    tests = _Service('tests', '.testresults', 'TestResultsService')
+    #: :class:`annotations.AnnotationsService <annotations.AnnotationsService>` object
+    annotations = _Service('annotations', '.annotations', 'AnnotationsService')
+    #: :class:`captures.CapturesService <captures.CapturesService>` object
+    captures = _Service('captures', '.captures', 'CapturesService')
+    #: :class:`highlights.HighlightsService <highlights.HighlightsService>` object
+    highlights = _Service('highlights', '.highlights', 'HighlightsService')
+    #: :class:`imports.ImportsService <imports.ImportsService>` object
+    imports = _Service('imports', '.imports', 'ImportsService')
+    #: :class:`exports.ExportsService <exports.ExportsService>` object
+    exports = _Service('exports', '.exports', 'ExportsService')
+    #: :class:`history.HistoryService <history.HistoryService>` object
+    history = _Service('history', '.history', 'HistoryService')
+    #: :class:`system.SystemService <system.SystemService>` object
+    system = _Service('system', '.system', 'SystemService')
+    #: :class:`tags.TagsService <tags.TagsService>` object
+    tags = _Service('tags', '.tags', 'TagsService')
+    #: :class:`testsuites.TestsuitesService <testsuites.TestsuitesService>` object
+    testsuites = _Service('testsuites', '.testsuites', 'TestsuitesService')
+    #: :class:`users.UsersService <users.UsersService>` object
+    users = _Service('users', '.users', 'UsersService')
+
+    def __init__(self, base, token=None, username=None, password=None, _getuser=_getuser_default, _getpass=_getpass_default, retries=3, insecure=False, cache=None, revalidate=False, fast_decode=True, json_backend=None, pool_size=32, pool_block=False, timeout=None, keepalive=60, retry_policy=None, rate_limiter=None, coalesce=False):
         self.lock = Lock()
 
         self.base = base.rstrip('/')
@@ -211,52 +347,33 @@ class CDRouter(object):
         self._getpass = _getpass
         self.retries = retries
         self.insecure = insecure
+        self.cache = cache
+        self.fast_decode = fast_decode
+        self.json_backend = cdr_json.backend(json_backend)
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        self.retry_policy = retry_policy or None
+        self.rate_limiter = rate_limiter
+        self.flights = SingleFlight() if coalesce else None
+        self.validators = None
+        if revalidate:
+            from .cdr_cache import ResponseCache # pylint: disable=import-outside-toplevel
+            self.validators = ResponseCache(maxsize=self.MAX_VALIDATORS, ttl=float('inf'))
 
         if insecure:
             # disable annoying InsecureRequestWarning
             requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
         self.session = sessions.BaseUrlSession(base_url=self.base+self.BASE)
-
-        #: :class:`alerts.AlertsService <alerts.AlertsService>` object
-        self.alerts = AlertsService(self)
-        #: :class:`configs.ConfigsService <configs.ConfigsService>` object
-        self.configs = ConfigsService(self)
-        #: :class:`devices.DevicesService <devices.DevicesService>` object
-        self.devices = DevicesService(self)
-        #: :class:`attachments.AttachmentsService <attachments.AttachmentsService>` object
-        self.attachments = AttachmentsService(self)
-        #: :class:`jobs.JobsService <jobs.JobsService>` object
-        self.jobs = JobsService(self)
-        #: :class:`packages.PackagesService <packages.PackagesService>` object
-        self.packages = PackagesService(self)
-        #: :class:`results.ResultsService <results.ResultsService>` object
-        self.results = ResultsService(self)
-        #: :class:`testresults.TestResultsService <testresults.TestResultsService>` object
-        self.tests = TestResultsService(self)
-        #: :class:`annotations.AnnotationsService <annotations.AnnotationsService>` object
-        self.annotations = AnnotationsService(self)
-        #: :class:`captures.CapturesService <captures.CapturesService>` object
-        self.captures = CapturesService(self)
-        #: :class:`highlights.HighlightsService <highlights.HighlightsService>` object
-        self.highlights = HighlightsService(self)
-        #: :class:`imports.ImportsService <imports.ImportsService>` object
-        self.imports = ImportsService(self)
-        #: :class:`exports.ExportsService <exports.ExportsService>` object
-        self.exports = ExportsService(self)
-        #: :class:`history.HistoryService <history.HistoryService>` object
-        self.history = HistoryService(self)
-        #: :class:`system.SystemService <system.SystemService>` object
-        self.system = SystemService(self)
-        #: :class:`tags.TagsService <tags.TagsService>` object
-        self.tags = TagsService(self)
-        #: :class:`testsuites.TestsuitesService <testsuites.TestsuitesService>` object
-        self.testsuites = TestsuitesService(self)
-        #: :class:`users.UsersService <users.UsersService>` object
-        self.users = UsersService(self)
+        adapter = Adapter(pool_size=pool_size, pool_block=pool_block, timeout=timeout, keepalive=keepalive)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.auth = Auth(c=self)
+        # whether Automatic Login is enabled, or None if not known yet
+        self.auto_login = None
 
     # base request methods
-    def _req(self, path, method='GET', json=None, data=None, params=None, headers=None, files=None, stream=None):
+    def _req(self, path, method='GET', json=None, data=None, params=None, headers=None, files=None, stream=None, idempotent=False, progress=None, cached=True): # pylint: disable=too-many-arguments
         if params is None:
             params = {}
         if headers is None:
@@ -264,16 +381,123 @@ class CDRouter(object):
         if files is None:
             files = {}
             headers.update({'user-agent': user_agent('cdrouter.py', __version__)})
-        resp = self.session.request(method, path, params=params, headers=headers, files=files, stream=stream,
-                                    json=json, data=data, verify=(not self.insecure), auth=Auth(c=self))
+        if json is not None:
+            data = self.json_backend.dumps(json)
+            headers.update({'content-type': 'application/json'})
+            json = None
+        upload = None
+        if files:
+            # stream the multipart body instead of building it in memory
+            data = upload = self._multipart(files, progress)
+            headers.update({'content-type': data.content_type})
+
+        key = None
+        if self.cache is not None and cached and method == 'GET' and not stream:
+            key = cache_key(path, params, identity(self.username, self.token))
+            resp = self.cache.get(self.base, key)
+            if resp is not None:
+                return resp
+
+        retry = self.retry_policy is not None and not files and self.retry_policy.retryable(method, idempotent)
+        limit = None
+        # Auth may call authenticate while this request holds a slot
+        if self.rate_limiter is not None and not path.startswith(self.base+'/authenticate'):
+            limit = self.rate_limiter.limit_for(method, params, stream, files)
+        kwargs = dict(params=params, headers=headers, files=None if upload else files, stream=stream, json=json, data=data)
+        resp = self._send(method, path, retry, limit, **kwargs)
+        if resp.status_code == 401 and self._relogin(resp.request) \
+           and not files and isinstance(resp.request.body, (bytes, str, type(None))):
+            resp.close()
+            resp = self._send(method, path, retry, limit, **kwargs)
+        if self.cache is not None and method != 'GET' and not idempotent:
+            self._invalidate(path)
         self.raise_for_status(resp)
+        if key is not None and resp.status_code == 200:
+            resp._models = {} # pylint: disable=protected-access
+            self.cache.set(self.base, key, resp)
         return resp
 
-    def get(self, path, params=None, stream=None):
-        return self._req(path, method='GET', params=params, stream=stream)
+    def _send(self, method, path, retry, limit, **kwargs):
+        attempt = 0
+        while True:
+            if limit is not None:
+                limit.acquire()
+            held = False
+            try:
+                try:
+                    resp = self.session.request(method, path, verify=(not self.insecure), auth=self.auth, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                    if not retry:
+                        raise
+                    delay = self.retry_policy.wait(method, path, attempt, error=e)
+                    if delay is None:
+                        raise
+                else:
+                    delay = None
+                    if retry:
+                        delay = self.retry_policy.wait(method, path, attempt, status=resp.status_code,
+                                                       retry_after=resp.headers.get('retry-after'))
+                    if delay is None:
+                        # a streaming response keeps its slot until it's closed
+                        held = limit is not None and kwargs.get('stream') and resp.status_code < 400
+                        if held:
+                            release_on_close(resp, limit.release)
+                        return resp
+                    resp.close()
+            finally:
+                if limit is not None and not held:
+                    limit.release()
+            time.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _multipart(files, progress=None):
+        encoder = MultipartEncoder(fields=files)
+        if progress is None:
+            return encoder
+        return MultipartEncoderMonitor(encoder, lambda m: progress(m.bytes_read, m.len))
+
+    def _relogin(self, r):
+        # a request sent without a token got a 401, so Automatic Login
+        # has been disabled since it was probed: authenticate from now on
+        if r.method == 'POST' and r.path_url.startswith('/authenticate'):
+            return False
+        self.lock.acquire()
+        relogin = self.auto_login is True and 'authorization' not in r.headers
+        if relogin:
+            self.auto_login = False
+        self.lock.release()
+        return relogin
+
+    @staticmethod
+    def _resource(path):
+        return path.split('/', 1)[0] + '/'
+
+    def _invalidate(self, path):
+        # a write under one resource, like results/12345/, leaves the
+        # rest of its collection cached except for the listings
+        m = re.match(r'[^/]+/[0-9]+/', path)
+        if m is None:
+            self.cache.invalidate(self._resource(path), base=self.base)
+            return
+        self.cache.invalidate(m.group(0), base=self.base)
+        self.cache.invalidate(self._resource(path), base=self.base, children=False)
+
+    def get(self, path, params=None, stream=None, cached=True):
+        if stream or not cached or self.flights is None:
+            return self._req(path, method='GET', params=params, stream=stream, cached=cached)
+        return self.flights.do(cache_key(path, params), lambda: self._req(path, method='GET', params=params),
+                               share=self._share)
+
+    @staticmethod
+    def _share(resp):
+        # callers sharing a response also share what it decodes to
+        if getattr(resp, '_models', None) is None:
+            resp._models = {} # pylint: disable=protected-access
 
-    def post(self, path, json=None, data=None, params=None, files=None, stream=None):
-        return self._req(path, method='POST', json=json, data=data, params=params, stream=stream, files=files)
+    def post(self, path, json=None, data=None, params=None, files=None, stream=None, idempotent=False, progress=None): # pylint: disable=too-many-arguments
+        return self._req(path, method='POST', json=json, data=data, params=params, stream=stream, files=files,
+                         idempotent=idempotent, progress=progress)
 
     def patch(self, path, json, params=None):
         return self._req(path, method='PATCH', json=json, params=params)
@@ -282,7 +506,7 @@ class CDRouter(object):
         return self._req(path, method='DELETE', params=params)
 
     # cdrouter-specific request methods
-    def list(self, base, filter=None, type=None, sort=None, limit=None, page=None, format=None, detailed=None): # pylint: disable=redefined-builtin
+    def list(self, base, filter=None, type=None, sort=None, limit=None, page=None, format=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
         if sort != None:
             if not isinstance(sort, list):
                 sort = [sort]
@@ -290,19 +514,292 @@ class CDRouter(object):
         if detailed != None:
             detailed = bool(detailed)
         return self.get(base, params={'filter': filter, 'type': type, 'sort': sort, 'limit': limit,
-                                      'page': page, 'format': format, 'detailed': detailed})
+                                      'page': page, 'format': format, 'detailed': detailed}, stream=stream)
 
     def iter_list(self, list_fn, *args, **kwargs):
-        while True:
-            data, links = list_fn(*args, **kwargs)
+        """Iterate over every resource returned by a paginated ``list``
+        method, as used by each service's ``iter_list`` method.
+
+        :param list_fn: Function taking ``page`` and returning a ``(data, links)`` tuple.
+        :param args: Arguments to pass to ``list_fn``.
+        :param kwargs: Optional arguments to pass to ``list_fn``.
+        :param prefetch: (optional) Number of upcoming pages to fetch in
+            a background thread while the current page is consumed, as
+            an int.  Resources are yielded in the same order and at most
+            ``prefetch`` pages are buffered.  Default is 0 (no prefetching).
+        :param workers: (optional) Number of threads to fetch pages with
+            in parallel as an int, see ``iter_list_parallel``.  Default
+            is 0 (fetch pages one at a time).
+        :param keyset: (optional) If bool `True` or a field name as a
+            string, page through resources by keyset instead of by page
+            number: sort by the field and fetch each page with a filter
+            for values after the last one seen.  Each page then costs
+            the same however deep into the list it is, and resources
+            created or deleted during iteration don't cause others to
+            be skipped or repeated.  The field must be unique per
+            resource.  If `True`, it is ``id``, except for test results
+            (``seq``) and alerts (``idx``), whose ``id`` is the result's;
+            history entries can't be iterated by keyset.  If the field
+            is missing from the summary, pages are fetched ``detailed``.
+            ``sort`` may only be the field or its descending form
+            (``-id``), ``type`` may not be ``union`` and ``page`` and
+            ``workers`` are ignored.
+        :param page_time: (optional) Target time in seconds to fetch and
+            decode each page as a float.  If set, the ``limit`` of each
+            page is grown or shrunk from the time taken and rows
+            returned by the last, so fast links need fewer round trips.
+            Ignored with ``workers`` or a ``limit`` which isn't a
+            number, like ``none``.
+        :param max_limit: (optional) Largest ``limit`` to grow to with
+            ``page_time`` as an int.  Default is 5000.
+        :param stream: (optional) If bool `True`, pass ``stream`` to
+            ``list_fn`` so each page is decoded one resource at a time
+            as it is read, keeping memory use flat even with a
+            ``limit`` of ``none``.  ``prefetch``, ``workers``,
+            ``keyset`` and ``page_time`` are ignored.
+        :return: Generator of resources.
+        """
+        prefetch = kwargs.pop('prefetch', 0)
+        workers = kwargs.pop('workers', 0)
+        keyset = kwargs.pop('keyset', None)
+        page_time = kwargs.pop('page_time', None)
+        max_limit = kwargs.pop('max_limit', None)
+
+        sizer = None
+        if page_time and PageSizer.adaptable(kwargs.get('limit', None)):
+            sizer = PageSizer(page_time, max_limit)
+
+        if kwargs.get('stream', None):
+            # a page's links aren't known until its data is consumed
+            prefetch = 0
+            pages = self._iter_pages(None, list_fn, *args, **kwargs)
+        elif keyset:
+            pages = self._keyset_pages(sizer, keyset, list_fn, *args, **kwargs)
+        elif workers:
+            pages = self._parallel_pages(workers, list_fn, *args, **kwargs)
+        else:
+            pages = self._iter_pages(sizer, list_fn, *args, **kwargs)
+        if prefetch:
+            pages = self._prefetch_pages(prefetch, pages)
+
+        for data, _ in pages:
             for d in data:
                 yield d
+
+    def iter_list_parallel(self, list_fn, *args, **kwargs):
+        """Iterate over every resource returned by a paginated ``list``
+        method, fetching pages in parallel.  The first page is fetched
+        normally; once its ``Links.last`` is known the remaining page
+        numbers are fanned out over a thread pool.  Resources are still
+        yielded in page order and at most ``workers`` pages are in
+        flight or buffered at once.  Each service's ``iter_list`` method
+        does the same when passed ``workers``.
+
+        Pages are fetched independently, so as with ``iter_list``,
+        resources created or deleted during iteration can cause rows to
+        be skipped or repeated.  Pass a ``sort`` on a stable field such
+        as ``id`` for full-table scans.
+
+        :param list_fn: Function taking ``page`` and returning a ``(data, links)`` tuple.
+        :param args: Arguments to pass to ``list_fn``.
+        :param kwargs: Optional arguments to pass to ``list_fn``.
+        :param workers: (optional) Thread pool size as an int.  Default is 4.
+        :return: Generator of resources.
+        """
+        kwargs.setdefault('workers', 4)
+        return self.iter_list(list_fn, *args, **kwargs)
+
+    def batch(self, max_workers=8):
+        """Run many independent service calls, like ``c.tests.list_log``
+        or ``c.captures.summary``, at once on a thread pool sharing this
+        object's connection pool.
+
+        :param max_workers: (optional) Most calls to run at once as an int.
+        :return: :class:`cdr_batch.Batch <cdr_batch.Batch>` object, for use in a ``with`` block.
+        """
+        from .cdr_batch import Batch # pylint: disable=import-outside-toplevel
+        return Batch(max_workers=max_workers)
+
+    def _iter_pages(self, sizer, list_fn, *args, **kwargs):
+        while True:
+            start = timer()
+            data, links = list_fn(*args, **kwargs)
+            elapsed = timer() - start
+            yield data, links
             if links.next is None:
                 break
-            kwargs.update({'page': links.next})
+            if sizer is not None and links.limit:
+                offset = (links.current - 1) * links.limit + len(data)
+                limit = sizer.next_limit(links.limit, len(data), elapsed, offset)
+                kwargs.update({'limit': limit, 'page': offset // limit + 1})
+            else:
+                kwargs.update({'page': links.next})
+
+    def _keyset_pages(self, sizer, key, list_fn, *args, **kwargs):
+        key, filter, sort = self._keyset_args(self._keyset_key(key, list_fn), kwargs) # pylint: disable=redefined-builtin
+        last = None
+        while True:
+            f = self._keyset_filter(key, filter, sort, last)
+            start = timer()
+            data, links = list_fn(*args, filter=f, sort=sort, **kwargs)
+            elapsed = timer() - start
+            if data and getattr(data[-1], key, None) is None:
+                if not kwargs.get('detailed'):
+                    # the key is left out of the summary, fetch the page again in full
+                    kwargs['detailed'] = True
+                    continue
+                raise CDRouterError('keyset field {} missing from listed resources'.format(key))
+            yield data, links
+            if links.next is None or len(data) == 0:
+                break
+            last = getattr(data[-1], key)
+            if sizer is not None and links.limit:
+                kwargs.update({'limit': sizer.next_limit(links.limit, len(data), elapsed)})
 
-    def get_id(self, base, id, params=None, stream=None): # pylint: disable=invalid-name,redefined-builtin
-        return self.get(base+str(id)+'/', params=params, stream=stream)
+    @staticmethod
+    def _keyset_key(key, list_fn):
+        # services whose id isn't unique per resource name another key
+        # in KEYSET, or None if they have none
+        fn = getattr(list_fn, 'func', list_fn)
+        default = getattr(getattr(fn, '__self__', None), 'KEYSET', 'id')
+        if default is None:
+            raise CDRouterError('keyset iteration is not supported for this resource')
+        if key is True:
+            return default
+        if key == 'id' and default != 'id':
+            raise CDRouterError('keyset iteration must use {}, id is not unique for this resource'.format(default))
+        return key
+
+    @staticmethod
+    def _keyset_args(key, kwargs):
+        sort = kwargs.pop('sort', None)
+        if isinstance(sort, list) and len(sort) == 1:
+            sort = sort[0]
+        if sort is None:
+            sort = key
+        if sort not in (key, '-'+key):
+            raise CDRouterError('keyset iteration must sort by {} or -{}'.format(key, key))
+        if kwargs.get('type', None) == 'union':
+            raise CDRouterError('keyset iteration does not support union filters')
+
+        filter = kwargs.pop('filter', None) # pylint: disable=redefined-builtin
+        if filter is None:
+            filter = []
+        elif not isinstance(filter, list):
+            filter = [filter]
+
+        kwargs.pop('page', None)
+        return key, filter, sort
+
+    @staticmethod
+    def _keyset_filter(key, filter, sort, last): # pylint: disable=redefined-builtin
+        if last is None:
+            return filter
+        if isinstance(last, datetime):
+            last = last.isoformat()
+        if sort.startswith('-'):
+            return filter + [field(key).lt(last)]
+        return filter + [field(key).gt(last)]
+
+    def _parallel_pages(self, workers, list_fn, *args, **kwargs):
+        data, links = list_fn(*args, **kwargs)
+        yield data, links
+        if links.next is None or links.last is None:
+            return
+
+        from concurrent.futures import ThreadPoolExecutor # pylint: disable=import-outside-toplevel
+        pages = iter(range(links.next, links.last+1))
+        ex = ThreadPoolExecutor(max_workers=workers)
+        futures = collections.deque()
+
+        def submit():
+            page = next(pages, None)
+            if page is not None:
+                futures.append(ex.submit(list_fn, *args, **dict(kwargs, page=page)))
+
+        try:
+            for _ in range(workers):
+                submit()
+            while futures:
+                f = futures.popleft()
+                submit()
+                yield f.result()
+        finally:
+            for f in futures:
+                f.cancel()
+            ex.shutdown(wait=True)
+
+    def _prefetch_pages(self, depth, pages):
+        import queue # pylint: disable=import-outside-toplevel
+        q = queue.Queue(maxsize=depth)
+        done = Event()
+
+        def put(item):
+            # block until there's room for another page, giving up if
+            # the consumer has gone away
+            while not done.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            try:
+                for page in pages:
+                    if not put((page, None)):
+                        return
+            except Exception as e: # pylint: disable=broad-except
+                put((None, e))
+                return
+            finally:
+                pages.close()
+            put((None, None))
+
+        t = Thread(target=produce)
+        t.daemon = True
+        t.start()
+
+        try:
+            while True:
+                page, err = q.get()
+                if err is not None:
+                    raise err
+                if page is None:
+                    break
+                yield page
+        finally:
+            done.set()
+
+    def get_id(self, base, id, params=None, stream=None, cached=True): # pylint: disable=invalid-name,redefined-builtin
+        path = base+str(id)+'/'
+        if self.validators is None or stream:
+            return self.get(path, params=params, stream=stream, cached=cached)
+        key, prev, headers = self._conditional(path, params)
+        resp = self._req(path, method='GET', params=params, headers=headers, cached=cached)
+        return self._revalidated(key, prev, resp)
+
+    def _conditional(self, path, params):
+        key = cache_key(path, params)
+        prev = self.validators.get(self.base, key)
+        headers = {}
+        if prev is not None:
+            if 'etag' in prev.headers:
+                headers['If-None-Match'] = prev.headers['etag']
+            if 'last-modified' in prev.headers:
+                headers['If-Modified-Since'] = prev.headers['last-modified']
+        return key, prev, headers
+
+    def _revalidated(self, key, prev, resp):
+        if prev is not None and (resp.status_code == 304 or resp.content == prev.content):
+            return prev
+        if resp.status_code != 200:
+            return resp
+        if getattr(resp, '_models', None) is None:
+            resp._models = {} # pylint: disable=protected-access
+        self.validators.set(self.base, key, resp)
+        return resp
 
     def create(self, base, resource):
         return self.post(base, json=resource)
@@ -330,27 +827,101 @@ class CDRouter(object):
                 filename = m.group(1)
         return filename
 
-    def export(self, base, id, format='gz', params=None): # pylint: disable=invalid-name,redefined-builtin
+    def download(self, resp, dest=None, stream=False, chunk_size=None):
+        """Read a streaming response, like an export or a capture, chunk
+        by chunk so memory use stays flat however large it is.
+
+        :param resp: Streaming response object.
+        :param dest: (optional) Path as a string or file object open for
+            binary writing to write the response to.  If a path to a
+            directory, the file is named after the response's filename.
+            If `None`, the response is read into an ``io.BytesIO``.
+        :param stream: (optional) If bool `True`, ignore ``dest`` and
+            return a generator of chunks as bytes.  The response is
+            closed once the generator is exhausted or closed.
+        :param chunk_size: (optional) Read size in bytes as an int.
+        :return: Tuple of the ``io.BytesIO``, path, file object or
+            generator written to and the response's filename.
+        :rtype: tuple `(dest, 'filename')`
+        """
+        if chunk_size is None:
+            chunk_size = self.STREAM_CHUNK_SIZE
+        filename = self.filename(resp)
+        if stream:
+            return (self._iter_chunks(resp, chunk_size), filename)
+
+        try:
+            if dest is None:
+                b = io.BytesIO()
+                self._write_chunks(resp, b, chunk_size)
+                b.seek(0)
+                return (b, filename)
+            if hasattr(dest, 'write'):
+                self._write_chunks(resp, dest, chunk_size)
+                return (dest, filename)
+            dest = self._dest_path(dest, filename)
+            with open(dest, 'wb') as fd:
+                self._write_chunks(resp, fd, chunk_size)
+            return (dest, filename)
+        finally:
+            resp.close()
+
+    @staticmethod
+    def _dest_path(dest, filename):
+        if os.path.isdir(dest):
+            if filename is None:
+                raise CDRouterError('no filename in response, pass a file path instead of a directory')
+            dest = os.path.join(dest, filename)
+        return dest
+
+    @staticmethod
+    def _write_chunks(resp, fd, chunk_size):
+        for chunk in resp.iter_content(chunk_size=chunk_size):
+            fd.write(chunk)
+
+    @staticmethod
+    def _iter_chunks(resp, chunk_size):
+        try:
+            for chunk in resp.iter_content(chunk_size=chunk_size):
+                yield chunk
+        finally:
+            resp.close()
+
+    def download_range(self, path, dest, params=None, ranges=1, chunk_size=None): # pylint: disable=too-many-arguments
+        """Download a file to disk with HTTP Range requests, resuming an
+        earlier interrupted download to the same ``dest``.
+
+        :param path: Request path relative to the API base as a string.
+        :param dest: Path to write to as a string, or a directory to
+            write to a file named after the response's filename.
+        :param params: (optional) Query params as a dict.
+        :param ranges: (optional) Number of byte ranges to fetch in parallel as an int.
+        :param chunk_size: (optional) Read size in bytes as an int.
+        :return: :meth:`cdr_range.RangeDownload.run <cdr_range.RangeDownload.run>` tuple
+        :rtype: tuple `('path', 'filename')`
+        """
+        if dest is None or hasattr(dest, 'write'):
+            raise CDRouterError('resumable downloads need dest to be a path')
+        from .cdr_range import RangeDownload # pylint: disable=import-outside-toplevel
+        return RangeDownload(self, path, dest, params=params, ranges=ranges, chunk_size=chunk_size).run()
+
+    def export(self, base, id, format='gz', params=None, dest=None, stream=False, chunk_size=None, resume=False, ranges=1): # pylint: disable=invalid-name,redefined-builtin,too-many-arguments
         if params is None:
             params = {}
         params.update({'format': format})
+        if resume or ranges > 1:
+            return self.download_range(base+str(id)+'/', dest, params=params, ranges=ranges, chunk_size=chunk_size)
         resp = self.get(base+str(id)+'/', params=params, stream=True)
-        b = io.BytesIO()
-        stream.stream_response_to_file(resp, path=b)
-        resp.close()
-        b.seek(0)
-        return (b, self.filename(resp))
+        return self.download(resp, dest=dest, stream=stream, chunk_size=chunk_size)
 
-    def bulk_export(self, base, ids, params=None):
+    def bulk_export(self, base, ids, params=None, dest=None, stream=False, chunk_size=None, resume=False, ranges=1): # pylint: disable=too-many-arguments
         if params is None:
             params = {}
         params.update({'bulk': 'export', 'ids': ','.join(map(str, ids))})
+        if resume or ranges > 1:
+            return self.download_range(base, dest, params=params, ranges=ranges, chunk_size=chunk_size)
         resp = self.get(base, params=params, stream=True)
-        b = io.BytesIO()
-        stream.stream_response_to_file(resp, path=b)
-        resp.close()
-        b.seek(0)
-        return (b, self.filename(resp))
+        return self.download(resp, dest=dest, stream=stream, chunk_size=chunk_size)
 
     def bulk_copy(self, base, resource, ids, schema):
         resp = self.post(base, params={'bulk': 'copy'},
@@ -373,6 +944,46 @@ class CDRouter(object):
             json = {resource: [{'id': str(x)} for x in ids]}
         return self.post(base, params={'bulk': 'delete', 'filter': filter, 'type': type, 'all': all}, json=json)
 
+    def get_many(self, list_fn, ids, workers=4):
+        ids = list(ids)
+        chunks = self._id_chunks(ids)
+        if workers > 1 and len(chunks) > 1:
+            from concurrent.futures import ThreadPoolExecutor # pylint: disable=import-outside-toplevel
+            with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as ex:
+                pages = list(ex.map(lambda chunk: list_fn(**self._id_filter(chunk)).data, chunks))
+        else:
+            pages = [list_fn(**self._id_filter(chunk)).data for chunk in chunks]
+        return self._many(ids, pages)
+
+    def _id_chunks(self, ids):
+        # split unique IDs into chunks whose filters fit in a URL
+        chunks = []
+        chunk, length = [], 0
+        for x in collections.OrderedDict.fromkeys(str(x) for x in ids):
+            n = len(urlencode({'filter': str(field('id').eq(x))})) + 1
+            if chunk and length + n > self.MAX_FILTER_LENGTH:
+                chunks.append(chunk)
+                chunk, length = [], 0
+            chunk.append(x)
+            length += n
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    @staticmethod
+    def _id_filter(chunk):
+        return dict(filter=[field('id').eq(x) for x in chunk], type='union', limit=len(chunk), detailed=True)
+
+    @staticmethod
+    def _many(ids, pages):
+        found = {}
+        for page in pages:
+            for m in page:
+                found[str(m.id)] = m
+        data = [found[str(x)] for x in ids if str(x) in found]
+        missing = [x for x in ids if str(x) not in found]
+        return Many(data, missing)
+
     @staticmethod
     def raise_for_status(resp):
         if 400 <= resp.status_code < 600:
@@ -396,24 +1007,79 @@ class CDRouter(object):
 
             raise CDRouterError(message, response=resp)
 
-    def decode(self, schema, resp, many=None, links=False):
-        json = resp.json()
+    def decode(self, schema, resp, many=None, links=False, stream=False):
+        if stream and many is True:
+            return self._stream_decode(schema, resp, links)
+
+        # responses kept by the cache or for revalidation remember
+        # what they decoded to, so hand out copies of that instead of
+        # decoding them again
+        models = getattr(resp, '_models', None)
+        if models is None:
+            return self._decode(schema, resp, many, links)
+
+        k = (type(schema), self._names(schema.only), self._names(schema.exclude), many, links)
+        if k not in models:
+            models[k] = self._decode(schema, resp, many, links)
+        return copy.deepcopy(models[k])
+
+    @staticmethod
+    def _names(names):
+        if not names:
+            return None
+        return tuple(sorted(names))
+
+    def _decode(self, schema, resp, many, links):
+        json = self.json_backend.loads(resp.content)
         resp_schema = ResponseSchema()
         if many is True:
             resp_schema = ListResponseSchema()
 
-        result = resp_schema.load(json).data
+        result = self._load(resp_schema, json)
 
         if result.data is None:
             raise CDRouterError('no data field in JSON response!', response=resp)
 
-        data = schema.load(result.data, many=many).data
+        data = self._load(schema, result.data, many=many)
 
         if many is True and links is True and result.links is not None:
             return (data, result.links)
 
         return data
 
+    def _stream_decode(self, schema, resp, links):
+        l = Links()
+        # released even if iterating never starts, since a generator's
+        # finally only runs once it has
+        data = StreamData(self._iter_decode(schema, resp, l), resp)
+        if links is True:
+            return (data, l)
+        return data
+
+    def _iter_decode(self, schema, resp, links):
+        parser = ArrayParser()
+        try:
+            for chunk in resp.iter_content(chunk_size=self.STREAM_CHUNK_SIZE):
+                for d in parser.feed(chunk):
+                    yield self._load(schema, d, many=False)
+            for d in parser.close():
+                yield self._load(schema, d, many=False)
+        finally:
+            resp.close()
+        self._stream_links(parser, resp, links)
+
+    def _stream_links(self, parser, resp, links):
+        if parser.envelope.get('data', None) is None:
+            raise CDRouterError('no data field in JSON response!', response=resp)
+        if parser.envelope.get('links', None) is not None:
+            l = self._load(LinksSchema(), parser.envelope['links'])
+            links.__dict__.update(l.__dict__)
+
+    def _load(self, schema, data, many=None):
+        if self.fast_decode:
+            return cdr_decode.load(schema, data, many=many)
+        return schema.load(data, many=many).data
+
     def encode(self, schema, resource, many=None, skip_none=False):
         result = schema.dump(resource, many=many)
         data = result.data
@@ -439,6 +1105,7 @@ class CDRouter(object):
             try:
                 resp = self.post(self.base+'/authenticate', params={'username': username, 'password': password})
 
+                from .users import UserSchema
                 schema = UserSchema()
                 u = self.decode(schema, resp)
 
@@ -184,7 +184,7 @@ class ConfigsService(object):
         self.service = service
         self.base = self.BASE
 
-    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None): # pylint: disable=redefined-builtin
+    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
         """Get a list of configs.
 
         :param filter: (optional) Filters to apply as a string list.
@@ -193,13 +193,17 @@ class ConfigsService(object):
         :param limit: (optional) Limit returned list length.
         :param page: (optional) Page to return.
         :param detailed: (optional) Return all fields if Bool `True`.
+        :param stream: (optional) If Bool `True`, read the response
+            incrementally: ``data`` of the returned page is a generator
+            decoding one resource at a time, and ``links`` is only
+            filled in once ``data`` has been exhausted.
         :return: :class:`configs.Page <configs.Page>` object
         """
         schema = self.GET_SCHEMA
         if not detailed:
             schema = self.LIST_SCHEMA
-        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed)
-        cs, l = self.service.decode(schema, resp, many=True, links=True)
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        cs, l = self.service.decode(schema, resp, many=True, links=True, stream=stream)
         return Page(cs, l)
 
     def iter_list(self, *args, **kwargs):
@@ -209,7 +213,8 @@ class ConfigsService(object):
         successive calls to ``list``.
 
         :param args: Arguments that ``list`` takes.
-        :param kwargs: Optional arguments that ``list`` takes.
+        :param kwargs: Optional arguments that ``list`` takes, plus
+            those taken by :meth:`CDRouter.iter_list <cdrouter.CDRouter.iter_list>`.
         :return: :class:`configs.Config <configs.Config>` list
 
         """
@@ -233,6 +238,19 @@ class ConfigsService(object):
         resp = self.service.get_id(self.base, id)
         return self.service.decode(schema, resp)
 
+    def get_many(self, ids, workers=4):
+        """Get several configs by ID.  Rather than one request per config,
+        IDs are sent in chunks as ``id`` filters to ``list``, with up
+        to ``workers`` chunks fetched at once.
+
+        :param ids: Config IDs as an int list.
+        :param workers: (optional) Most chunks to fetch at once as an int.
+        :return: :class:`cdrouter.Many <cdrouter.Many>` object of
+            :class:`configs.Config <configs.Config>` objects in the order of
+            ``ids`` and IDs not found
+        """
+        return self.service.get_many(self.list, ids, workers=workers)
+
     def get_plaintext(self, id): # pylint: disable=invalid-name,redefined-builtin
         """Get a config as plaintext.
 
@@ -305,13 +323,17 @@ class ConfigsService(object):
         """
         return self.service.edit_shares(self.base, id, user_ids)
 
-    def export(self, id): # pylint: disable=invalid-name,redefined-builtin
+    def export(self, id, dest=None, stream=False, chunk_size=None): # pylint: disable=invalid-name,redefined-builtin
         """Export a config.
 
         :param id: Config ID as an int.
+        :param dest: (optional) Path or file object to write to, see
+            :meth:`CDRouter.download <cdrouter.CDRouter.download>`.
+        :param stream: (optional) If bool `True`, return a generator of chunks instead.
+        :param chunk_size: (optional) Read size in bytes as an int.
         :rtype: tuple `(io.BytesIO, 'filename')`
         """
-        return self.service.export(self.base, id)
+        return self.service.export(self.base, id, dest=dest, stream=stream, chunk_size=chunk_size)
 
     def check_config(self, contents):
         """Process config contents with cdrouter-cli -check-config.
@@ -349,13 +371,17 @@ class ConfigsService(object):
                                  params={'process': 'networks'}, json={'contents': contents})
         return self.service.decode(schema, resp)
 
-    def bulk_export(self, ids):
+    def bulk_export(self, ids, dest=None, stream=False, chunk_size=None):
         """Bulk export a set of configs.
 
         :param ids: Int list of config IDs.
+        :param dest: (optional) Path or file object to write to, see
+            :meth:`CDRouter.download <cdrouter.CDRouter.download>`.
+        :param stream: (optional) If bool `True`, return a generator of chunks instead.
+        :param chunk_size: (optional) Read size in bytes as an int.
         :rtype: tuple `(io.BytesIO, 'filename')`
         """
-        return self.service.bulk_export(self.base, ids)
+        return self.service.bulk_export(self.base, ids, dest=dest, stream=stream, chunk_size=chunk_size)
 
     def bulk_copy(self, ids):
         """Bulk copy a set of configs.
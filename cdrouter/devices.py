@@ -182,7 +182,7 @@ class DevicesService(object):
         self.service = service
         self.base = self.BASE
 
-    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None): # pylint: disable=redefined-builtin
+    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
         """Get a list of devices.
 
         :param filter: (optional) Filters to apply as a string list.
@@ -191,6 +191,10 @@ class DevicesService(object):
         :param limit: (optional) Limit returned list length.
         :param page: (optional) Page to return.
         :param detailed: (optional) Return all fields if Bool `True`.
+        :param stream: (optional) If Bool `True`, read the response
+            incrementally: ``data`` of the returned page is a generator
+            decoding one resource at a time, and ``links`` is only
+            filled in once ``data`` has been exhausted.
         :return: :class:`devices.Page <devices.Page>` object
         """
         schema = DeviceSchema()
@@ -201,8 +205,8 @@ class DevicesService(object):
                                            'hardware_version', 'software_version', 'provisioning_code', 'note',
                                            'insecure_mgmt_url', 'mgmt_url', 'add_mgmt_addr', 'mgmt_interface',
                                            'mgmt_addr', 'power_on_cmd', 'power_off_cmd'))
-        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed)
-        ds, l = self.service.decode(schema, resp, many=True, links=True)
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        ds, l = self.service.decode(schema, resp, many=True, links=True, stream=stream)
         return Page(ds, l)
 
     def iter_list(self, *args, **kwargs):
@@ -212,7 +216,8 @@ class DevicesService(object):
         successive calls to ``list``.
 
         :param args: Arguments that ``list`` takes.
-        :param kwargs: Optional arguments that ``list`` takes.
+        :param kwargs: Optional arguments that ``list`` takes, plus
+            those taken by :meth:`CDRouter.iter_list <cdrouter.CDRouter.iter_list>`.
         :return: :class:`devices.Device <devices.Device>` list
 
         """
@@ -229,6 +234,19 @@ class DevicesService(object):
         resp = self.service.get_id(self.base, id)
         return self.service.decode(schema, resp)
 
+    def get_many(self, ids, workers=4):
+        """Get several devices by ID.  Rather than one request per device,
+        IDs are sent in chunks as ``id`` filters to ``list``, with up
+        to ``workers`` chunks fetched at once.
+
+        :param ids: Device IDs as an int list.
+        :param workers: (optional) Most chunks to fetch at once as an int.
+        :return: :class:`cdrouter.Many <cdrouter.Many>` object of
+            :class:`devices.Device <devices.Device>` objects in the order of
+            ``ids`` and IDs not found
+        """
+        return self.service.get_many(self.list, ids, workers=workers)
+
     def get_by_name(self, name): # pylint: disable=invalid-name,redefined-builtin
         """Get a device by name.
 
@@ -293,13 +311,17 @@ class DevicesService(object):
         """
         return self.service.edit_shares(self.base, id, user_ids)
 
-    def export(self, id): # pylint: disable=invalid-name,redefined-builtin
+    def export(self, id, dest=None, stream=False, chunk_size=None): # pylint: disable=invalid-name,redefined-builtin
         """Export a device.
 
         :param id: Device ID as an int.
+        :param dest: (optional) Path or file object to write to, see
+            :meth:`CDRouter.download <cdrouter.CDRouter.download>`.
+        :param stream: (optional) If bool `True`, return a generator of chunks instead.
+        :param chunk_size: (optional) Read size in bytes as an int.
         :rtype: tuple `(io.BytesIO, 'filename')`
         """
-        return self.service.export(self.base, id)
+        return self.service.export(self.base, id, dest=dest, stream=stream, chunk_size=chunk_size)
 
     def get_connection(self, id): # pylint: disable=invalid-name,redefined-builtin
         """Get information on proxy connection to a device's management interface.
@@ -352,13 +374,17 @@ class DevicesService(object):
         resp = self.service.post(self.base+str(id)+'/power/off/')
         return self.service.decode(schema, resp)
 
-    def bulk_export(self, ids):
+    def bulk_export(self, ids, dest=None, stream=False, chunk_size=None):
         """Bulk export a set of devices.
 
         :param ids: Int list of device IDs.
+        :param dest: (optional) Path or file object to write to, see
+            :meth:`CDRouter.download <cdrouter.CDRouter.download>`.
+        :param stream: (optional) If bool `True`, return a generator of chunks instead.
+        :param chunk_size: (optional) Read size in bytes as an int.
         :rtype: tuple `(io.BytesIO, 'filename')`
         """
-        return self.service.bulk_export(self.base, ids)
+        return self.service.bulk_export(self.base, ids, dest=dest, stream=stream, chunk_size=chunk_size)
 
     def bulk_copy(self, ids):
         """Bulk copy a set of devices.
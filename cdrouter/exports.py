@@ -5,10 +5,6 @@
 
 """Module for accessing CDRouter Exports."""
 
-import io
-
-from requests_toolbelt.downloadutils import stream
-
 class ExportsService(object):
     """Service for accessing CDRouter Exports."""
 
@@ -19,7 +15,7 @@ class ExportsService(object):
         self.service = service
         self.base = self.BASE
 
-    def bulk_export(self, config_ids=None, device_ids=None, package_ids=None, result_ids=None, exclude_captures=False):
+    def bulk_export(self, config_ids=None, device_ids=None, package_ids=None, result_ids=None, exclude_captures=False, dest=None, stream=False, chunk_size=None): # pylint: disable=too-many-arguments
         """Bulk export a set of configs, devices, packages and results.
 
         :param config_ids: (optional) Int list of config IDs.
@@ -27,6 +23,10 @@ class ExportsService(object):
         :param package_ids: (optional) Int list of package IDs.
         :param result_ids: (optional) Int list of result IDs.
         :param exclude_captures: (optional) Exclude capture files if bool `True`.
+        :param dest: (optional) Path or file object to write to, see
+            :meth:`CDRouter.download <cdrouter.CDRouter.download>`.
+        :param stream: (optional) If bool `True`, return a generator of chunks instead.
+        :param chunk_size: (optional) Read size in bytes as an int.
         :rtype: tuple `(io.BytesIO, 'filename')`
         """
         if config_ids is None:
@@ -38,15 +38,11 @@ class ExportsService(object):
         if result_ids is None:
             result_ids = []
         json = {
-            'configs': map(int, config_ids),
-            'devices': map(int, device_ids),
-            'packages': map(int, package_ids),
-            'results': map(int, result_ids),
+            'configs': [int(x) for x in config_ids],
+            'devices': [int(x) for x in device_ids],
+            'packages': [int(x) for x in package_ids],
+            'results': [int(x) for x in result_ids],
             'options': {'exclude_captures': exclude_captures}
         }
         resp = self.service.post(self.base, json=json, stream=True)
-        b = io.BytesIO()
-        stream.stream_response_to_file(resp, path=b)
-        resp.close()
-        b.seek(0)
-        return (b, self.service.filename(resp))
+        return self.service.download(resp, dest=dest, stream=stream, chunk_size=chunk_size)
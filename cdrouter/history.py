@@ -21,6 +21,8 @@ class History(object):
     :param action: (optional) Action name as string.
     :param description: (optional) Resource description as string.
     """
+    __slots__ = ('user_id', 'created', 'resource', 'id', 'name', 'action', 'description')
+
     def __init__(self, **kwargs):
         self.user_id = kwargs.get('user_id', None)
         self.created = kwargs.get('created', None)
@@ -55,12 +57,14 @@ class HistoryService(object):
 
     RESOURCE = 'history'
     BASE = RESOURCE + '/'
+    # id is the changed resource's ID, which several entries can share
+    KEYSET = None
 
     def __init__(self, service):
         self.service = service
         self.base = self.BASE
 
-    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None): # pylint: disable=redefined-builtin
+    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
         """Get a list of history entries.
 
         :param filter: (optional) Filters to apply as a string list.
@@ -69,11 +73,15 @@ class HistoryService(object):
         :param limit: (optional) Limit returned list length.
         :param page: (optional) Page to return.
         :param detailed: (optional) Return all fields if Bool `True`.
+        :param stream: (optional) If Bool `True`, read the response
+            incrementally: ``data`` of the returned page is a generator
+            decoding one resource at a time, and ``links`` is only
+            filled in once ``data`` has been exhausted.
         :return: :class:`history.Page <history.Page>` object
         """
         schema = HistorySchema()
-        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed)
-        hs, l = self.service.decode(schema, resp, many=True, links=True)
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        hs, l = self.service.decode(schema, resp, many=True, links=True, stream=stream)
         return Page(hs, l)
 
     def iter_list(self, *args, **kwargs):
@@ -83,7 +91,8 @@ class HistoryService(object):
         by internally making successive calls to ``list``.
 
         :param args: Arguments that ``list`` takes.
-        :param kwargs: Optional arguments that ``list`` takes.
+        :param kwargs: Optional arguments that ``list`` takes, plus
+            those taken by :meth:`CDRouter.iter_list <cdrouter.CDRouter.iter_list>`.
         :return: :class:`historys.History <historys.History>` list
 
         """
@@ -150,16 +150,19 @@ class ImportsService(object):
         resp = self.service.list(self.base)
         return self.service.decode(schema, resp, many=True)
 
-    def stage_import_from_file(self, fd, filename='upload.gz'):
-        """Stage an import from a file upload.
+    def stage_import_from_file(self, fd, filename='upload.gz', progress=None):
+        """Stage an import from a file upload.  The file is streamed, so
+        memory use stays flat however large it is.
 
         :param fd: File-like object to upload.
         :param filename: (optional) Filename to use for import as string.
+        :param progress: (optional) Function to call as ``progress(sent, total)``
+            while uploading, with the bytes sent so far and in total as ints.
         :return: :class:`imports.Import <imports.Import>` object
         """
         schema = ImportSchema()
         resp = self.service.post(self.base,
-                                 files={'file': (filename, fd)})
+                                 files={'file': (filename, fd)}, progress=progress)
         return self.service.decode(schema, resp)
 
     def stage_import_from_filesystem(self, filepath):
@@ -111,7 +111,7 @@ class JobsService(object):
         self.service = service
         self.base = self.BASE
 
-    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None): # pylint: disable=redefined-builtin
+    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
         """Get a list of jobs.
 
         :param filter: (optional) Filters to apply as a string list.
@@ -120,11 +120,15 @@ class JobsService(object):
         :param limit: (optional) Limit returned list length.
         :param page: (optional) Page to return.
         :param detailed: (optional) Return all fields if Bool `True`.
+        :param stream: (optional) If Bool `True`, read the response
+            incrementally: ``data`` of the returned page is a generator
+            decoding one resource at a time, and ``links`` is only
+            filled in once ``data`` has been exhausted.
         :return: :class:`jobs.Page <jobs.Page>` object
         """
         schema = JobSchema()
-        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed)
-        js, l = self.service.decode(schema, resp, many=True, links=True)
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        js, l = self.service.decode(schema, resp, many=True, links=True, stream=stream)
         return Page(js, l)
 
     def iter_list(self, *args, **kwargs):
@@ -134,7 +138,8 @@ class JobsService(object):
         calls to ``list``.
 
         :param args: Arguments that ``list`` takes.
-        :param kwargs: Optional arguments that ``list`` takes.
+        :param kwargs: Optional arguments that ``list`` takes, plus
+            those taken by :meth:`CDRouter.iter_list <cdrouter.CDRouter.iter_list>`.
         :return: :class:`jobs.Job <jobs.Job>` list
 
         """
@@ -151,6 +156,19 @@ class JobsService(object):
         resp = self.service.get_id(self.base, id)
         return self.service.decode(schema, resp)
 
+    def get_many(self, ids, workers=4):
+        """Get several jobs by ID.  Rather than one request per job,
+        IDs are sent in chunks as ``id`` filters to ``list``, with up
+        to ``workers`` chunks fetched at once.
+
+        :param ids: Job IDs as an int list.
+        :param workers: (optional) Most chunks to fetch at once as an int.
+        :return: :class:`cdrouter.Many <cdrouter.Many>` object of
+            :class:`jobs.Job <jobs.Job>` objects in the order of
+            ``ids`` and IDs not found
+        """
+        return self.service.get_many(self.list, ids, workers=workers)
+
     def edit(self, resource):
         """Edit a job.
 
@@ -187,7 +187,7 @@ class PackagesService(object):
         self.service = service
         self.base = self.BASE
 
-    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None): # pylint: disable=redefined-builtin
+    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
         """Get a list of packages.
 
         :param filter: (optional) Filters to apply as a string list.
@@ -196,13 +196,17 @@ class PackagesService(object):
         :param limit: (optional) Limit returned list length.
         :param page: (optional) Page to return.
         :param detailed: (optional) Return all fields if Bool `True`.
+        :param stream: (optional) If Bool `True`, read the response
+            incrementally: ``data`` of the returned page is a generator
+            decoding one resource at a time, and ``links`` is only
+            filled in once ``data`` has been exhausted.
         :return: :class:`packages.Page <packages.Page>` object
         """
         schema = PackageSchema()
         if not detailed:
             schema = PackageSchema(exclude=('testlist', 'extra_cli_args', 'agent_id', 'options', 'note'))
-        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed)
-        ps, l = self.service.decode(schema, resp, many=True, links=True)
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        ps, l = self.service.decode(schema, resp, many=True, links=True, stream=stream)
         return Page(ps, l)
 
     def iter_list(self, *args, **kwargs):
@@ -212,7 +216,8 @@ class PackagesService(object):
         successive calls to ``list``.
 
         :param args: Arguments that ``list`` takes.
-        :param kwargs: Optional arguments that ``list`` takes.
+        :param kwargs: Optional arguments that ``list`` takes, plus
+            those taken by :meth:`CDRouter.iter_list <cdrouter.CDRouter.iter_list>`.
         :return: :class:`packages.Package <packages.Package>` list
 
         """
@@ -229,6 +234,19 @@ class PackagesService(object):
         resp = self.service.get_id(self.base, id)
         return self.service.decode(schema, resp)
 
+    def get_many(self, ids, workers=4):
+        """Get several packages by ID.  Rather than one request per package,
+        IDs are sent in chunks as ``id`` filters to ``list``, with up
+        to ``workers`` chunks fetched at once.
+
+        :param ids: Package IDs as an int list.
+        :param workers: (optional) Most chunks to fetch at once as an int.
+        :return: :class:`cdrouter.Many <cdrouter.Many>` object of
+            :class:`packages.Package <packages.Package>` objects in the order of
+            ``ids`` and IDs not found
+        """
+        return self.service.get_many(self.list, ids, workers=workers)
+
     def get_by_name(self, name): # pylint: disable=invalid-name,redefined-builtin
         """Get a package by name.
 
@@ -293,13 +311,17 @@ class PackagesService(object):
         """
         return self.service.edit_shares(self.base, id, user_ids)
 
-    def export(self, id): # pylint: disable=invalid-name,redefined-builtin
+    def export(self, id, dest=None, stream=False, chunk_size=None): # pylint: disable=invalid-name,redefined-builtin
         """Export a package.
 
         :param id: Package ID as an int.
+        :param dest: (optional) Path or file object to write to, see
+            :meth:`CDRouter.download <cdrouter.CDRouter.download>`.
+        :param stream: (optional) If bool `True`, return a generator of chunks instead.
+        :param chunk_size: (optional) Read size in bytes as an int.
         :rtype: tuple `(io.BytesIO, 'filename')`
         """
-        return self.service.export(self.base, id)
+        return self.service.export(self.base, id, dest=dest, stream=stream, chunk_size=chunk_size)
 
     def analyze(self, id): # pylint: disable=invalid-name,redefined-builtin
         """Get a list of tests that will be skipped for a package.
@@ -309,7 +331,7 @@ class PackagesService(object):
         :rtype: packages.Analysis
         """
         schema = AnalysisSchema()
-        resp = self.service.post(self.base+str(id)+'/', params={'process': 'analyze'})
+        resp = self.service.post(self.base+str(id)+'/', params={'process': 'analyze'}, idempotent=True)
         return self.service.decode(schema, resp)
 
     def testlist_expanded(self, id): # pylint: disable=invalid-name,redefined-builtin
@@ -318,15 +340,19 @@ class PackagesService(object):
         :param id: Package ID as an int.
         :rtype: string list
         """
-        return self.service.post(self.base+str(id)+'/', params={'process': 'testlist-expanded'}).json()['data']
+        return self.service.post(self.base+str(id)+'/', params={'process': 'testlist-expanded'}, idempotent=True).json()['data']
 
-    def bulk_export(self, ids):
+    def bulk_export(self, ids, dest=None, stream=False, chunk_size=None):
         """Bulk export a set of packages.
 
         :param ids: Int list of package IDs.
+        :param dest: (optional) Path or file object to write to, see
+            :meth:`CDRouter.download <cdrouter.CDRouter.download>`.
+        :param stream: (optional) If bool `True`, return a generator of chunks instead.
+        :param chunk_size: (optional) Read size in bytes as an int.
         :rtype: tuple `(io.BytesIO, 'filename')`
         """
-        return self.service.bulk_export(self.base, ids)
+        return self.service.bulk_export(self.base, ids, dest=dest, stream=stream, chunk_size=chunk_size)
 
     def bulk_copy(self, ids):
         """Bulk copy a set of packages.
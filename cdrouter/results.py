@@ -7,6 +7,8 @@
 
 import collections
 import io
+import time
+from timeit import default_timer as timer
 
 from requests_toolbelt.downloadutils import stream
 from marshmallow import Schema, fields, post_load
@@ -15,6 +17,7 @@ from .cdr_datetime import DateTime
 from .cdr_dictfield import DictField
 from .testresults import TestResultSchema
 from .alerts import AlertSchema
+from .cdr_watch import Watch, Watcher
 
 class TestCount(object):
     """Model for CDRouter Test Counts.
@@ -525,6 +528,12 @@ class Result(object):
     :param options: (optional) :class:`results.Options <results.Options>` object
     :param features: (optional) Dict of feature name strings to :class:`results.Feature <results.Feature>` objects.
     """
+    __slots__ = ('id', 'created', 'updated', 'result', 'status', 'loops', 'tests', 'passed',
+                 'fail', 'alerts', 'duration', 'size_on_disk', 'starred', 'archived', 'result_dir',
+                 'agent_name', 'package_name', 'device_name', 'config_name', 'package_id',
+                 'device_id', 'config_id', 'user_id', 'note', 'pause_message', 'build_info',
+                 'tags', 'testcases', 'options', 'features')
+
     def __init__(self, **kwargs):
         self.id = kwargs.get('id', None)
         self.created = kwargs.get('created', None)
@@ -610,7 +619,7 @@ class ResultsService(object):
         self.service = service
         self.base = self.BASE
 
-    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None): # pylint: disable=redefined-builtin
+    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
         """Get a list of results.
 
         :param filter: (optional) Filters to apply as a string list.
@@ -619,13 +628,17 @@ class ResultsService(object):
         :param limit: (optional) Limit returned list length.
         :param page: (optional) Page to return.
         :param detailed: (optional) Return all fields if Bool `True`.
+        :param stream: (optional) If Bool `True`, read the response
+            incrementally: ``data`` of the returned page is a generator
+            decoding one resource at a time, and ``links`` is only
+            filled in once ``data`` has been exhausted.
         :return: :class:`results.Page <results.Page>` object
         """
         schema = ResultSchema()
         if not detailed:
             schema = ResultSchema(exclude=('result', 'loops', 'tests', 'result_dir', 'agent_name', 'config_name', 'note', 'pause_message', 'testcases', 'options', 'build_info'))
-        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed)
-        rs, l = self.service.decode(schema, resp, many=True, links=True)
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        rs, l = self.service.decode(schema, resp, many=True, links=True, stream=stream)
         return Page(rs, l)
 
     def iter_list(self, *args, **kwargs):
@@ -635,7 +648,8 @@ class ResultsService(object):
         successive calls to ``list``.
 
         :param args: Arguments that ``list`` takes.
-        :param kwargs: Optional arguments that ``list`` takes.
+        :param kwargs: Optional arguments that ``list`` takes, plus
+            those taken by :meth:`CDRouter.iter_list <cdrouter.CDRouter.iter_list>`.
         :return: :class:`results.Result <results.Result>` list
 
         """
@@ -653,17 +667,32 @@ class ResultsService(object):
         """
         return self.service.list(self.base, filter, type, sort, limit, page, format='csv').text
 
-    def get(self, id): # pylint: disable=invalid-name,redefined-builtin
+    def get(self, id, cached=True): # pylint: disable=invalid-name,redefined-builtin
         """Get a result.
 
         :param id: Result ID as an int.
+        :param cached: (optional) If bool `False`, fetch the result from
+            the CDRouter system even if the client's ``cache`` holds it.
         :return: :class:`results.Result <results.Result>` object
         :rtype: results.Result
         """
         schema = ResultSchema()
-        resp = self.service.get_id(self.base, id)
+        resp = self.service.get_id(self.base, id, cached=cached)
         return self.service.decode(schema, resp)
 
+    def get_many(self, ids, workers=4):
+        """Get several results by ID.  Rather than one request per result,
+        IDs are sent in chunks as ``id`` filters to ``list``, with up
+        to ``workers`` chunks fetched at once.
+
+        :param ids: Result IDs as an int list.
+        :param workers: (optional) Most chunks to fetch at once as an int.
+        :return: :class:`cdrouter.Many <cdrouter.Many>` object of
+            :class:`results.Result <results.Result>` objects in the order of
+            ``ids`` and IDs not found
+        """
+        return self.service.get_many(self.list, ids, workers=workers)
+
     def updates(self, id, update_id=None): # pylint: disable=invalid-name,redefined-builtin
         """Get updates of a running result via long-polling.  If no updates are available, CDRouter waits up to 10 seconds before sending an empty response.
 
@@ -676,9 +705,66 @@ class ResultsService(object):
         if update_id is None:
             update_id = -1
         schema = UpdateSchema()
-        resp = self.service.get_id(self.base, id, params={'updates': update_id})
+        # a cached poll would hide new updates
+        resp = self.service.get_id(self.base, id, params={'updates': update_id}, cached=False)
         return self.service.decode(schema, resp)
 
+    def watch(self, id, update_id=None, min_interval=0.0, max_interval=5.0): # pylint: disable=invalid-name,redefined-builtin
+        """Follow a running result until it finishes.  The result is polled
+        via ``updates``, keeping track of the last update ID so every
+        update is yielded exactly once.  While updates keep coming the
+        next poll is made after ``min_interval``, and while they don't
+        polls back off up to ``max_interval``.  The last object yielded
+        is the finished :class:`results.Result <results.Result>`.
+
+        Usage::
+
+          for u in c.results.watch(result_id):
+              if isinstance(u, TestResult):
+                  print(u.name, u.result)
+
+        :param id: Result ID as an int.
+        :param update_id: (optional) Update ID to start after as an int.
+        :param min_interval: (optional) Seconds to wait between polls
+            while updates keep coming as a float.
+        :param max_interval: (optional) Most seconds to wait between
+            polls as a float.
+        :return: Generator of :class:`results.Result <results.Result>`,
+            :class:`testresults.TestResult <testresults.TestResult>` and
+            :class:`alerts.Alert <alerts.Alert>` objects.
+        """
+        w = Watch(id, update_id, min_interval, max_interval)
+        while not w.finished:
+            start = timer()
+            items = w.handle(self.updates(id, w.update_id), timer() - start)
+            if w.check:
+                items = w.handle_result(self.get(id, cached=False))
+            for item in items:
+                yield item
+            if not w.finished and w.interval:
+                time.sleep(w.interval)
+
+    def watch_many(self, ids, max_workers=4, min_interval=0.0, max_interval=5.0): # pylint: disable=invalid-name,redefined-builtin
+        """Follow several running results at once until they finish, as
+        one stream of updates.  Polls are shared out over a pool of
+        ``max_workers`` threads, see :class:`cdr_watch.Watcher
+        <cdr_watch.Watcher>`, which can also follow results on several
+        CDRouter systems.
+
+        :param ids: Result IDs as an int list.
+        :param max_workers: (optional) Most polls to run at once as an int.
+        :param min_interval: (optional) Seconds to wait between polls of
+            a result while updates keep coming as a float.
+        :param max_interval: (optional) Most seconds to wait between
+            polls of a result as a float.
+        :return: Generator of :class:`cdr_watch.Event <cdr_watch.Event>` objects.
+        """
+        with Watcher(max_workers, min_interval, max_interval) as w:
+            for id in ids:
+                w.add(self.service, id)
+            for e in w:
+                yield e
+
     def stop(self, id, when=None): # pylint: disable=invalid-name,redefined-builtin
         """Stop a running result.
 
@@ -768,22 +854,44 @@ class ResultsService(object):
         """
         return self.service.edit_shares(self.base, id, user_ids)
 
-    def export(self, id, exclude_captures=False): # pylint: disable=invalid-name,redefined-builtin
+    def export(self, id, exclude_captures=False, dest=None, stream=False, chunk_size=None, resume=False, ranges=1): # pylint: disable=invalid-name,redefined-builtin,too-many-arguments
         """Export a result.
 
         :param id: Result ID as an int.
         :param exclude_captures: If bool `True`, don't export capture files
+        :param dest: (optional) Path or file object to write to, see
+            :meth:`CDRouter.download <cdrouter.CDRouter.download>`.
+        :param stream: (optional) If bool `True`, return a generator of chunks instead.
+        :param chunk_size: (optional) Read size in bytes as an int.
+        :param resume: (optional) If bool `True`, download to ``dest``
+            (a path) with HTTP Range requests, continuing an earlier
+            interrupted download, see :class:`cdr_range.RangeDownload
+            <cdr_range.RangeDownload>`.
+        :param ranges: (optional) Number of byte ranges to fetch in
+            parallel as an int.  Implies ``resume``.
         :rtype: tuple `(io.BytesIO, 'filename')`
         """
-        return self.service.export(self.base, id, params={'exclude_captures': exclude_captures})
+        return self.service.export(self.base, id, params={'exclude_captures': exclude_captures}, dest=dest, stream=stream,
+                                   chunk_size=chunk_size, resume=resume, ranges=ranges)
 
-    def bulk_export(self, ids, exclude_captures=False):
+    def bulk_export(self, ids, exclude_captures=False, dest=None, stream=False, chunk_size=None, resume=False, ranges=1): # pylint: disable=too-many-arguments
         """Bulk export a set of results.
 
         :param ids: Int list of result IDs.
+        :param dest: (optional) Path or file object to write to, see
+            :meth:`CDRouter.download <cdrouter.CDRouter.download>`.
+        :param stream: (optional) If bool `True`, return a generator of chunks instead.
+        :param chunk_size: (optional) Read size in bytes as an int.
+        :param resume: (optional) If bool `True`, download to ``dest``
+            (a path) with HTTP Range requests, continuing an earlier
+            interrupted download, see :class:`cdr_range.RangeDownload
+            <cdr_range.RangeDownload>`.
+        :param ranges: (optional) Number of byte ranges to fetch in
+            parallel as an int.  Implies ``resume``.
         :rtype: tuple `(io.BytesIO, 'filename')`
         """
-        return self.service.bulk_export(self.base, ids, params={'exclude_captures': exclude_captures})
+        return self.service.bulk_export(self.base, ids, params={'exclude_captures': exclude_captures}, dest=dest, stream=stream,
+                                        chunk_size=chunk_size, resume=resume, ranges=ranges)
 
     def bulk_copy(self, ids):
         """Bulk copy a set of results.
@@ -824,7 +932,7 @@ class ResultsService(object):
         :rtype: results.AllStats
         """
         schema = AllStatsSchema()
-        resp = self.service.post(self.base, params={'stats': 'all'})
+        resp = self.service.post(self.base, params={'stats': 'all'}, idempotent=True)
         return self.service.decode(schema, resp)
 
     def set_stats(self, ids):
@@ -835,7 +943,7 @@ class ResultsService(object):
         :rtype: results.SetStats
         """
         schema = SetStatsSchema()
-        resp = self.service.post(self.base, params={'stats': 'set'}, json=[{'id': str(x)} for x in ids])
+        resp = self.service.post(self.base, params={'stats': 'set'}, json=[{'id': str(x)} for x in ids], idempotent=True)
         return self.service.decode(schema, resp)
 
     def diff_stats(self, ids):
@@ -846,7 +954,7 @@ class ResultsService(object):
         :rtype: results.DiffStats
         """
         schema = DiffStatsSchema()
-        resp = self.service.post(self.base, params={'stats': 'diff'}, json=[{'id': str(x)} for x in ids])
+        resp = self.service.post(self.base, params={'stats': 'diff'}, json=[{'id': str(x)} for x in ids], idempotent=True)
         return self.service.decode(schema, resp)
 
     def single_stats(self, id): # pylint: disable=invalid-name,redefined-builtin
@@ -908,20 +1016,30 @@ class ResultsService(object):
         b.seek(0)
         return (b, self.service.filename(resp))
 
-    def download_logdir_archive(self, id, format='zip', exclude_captures=False): # pylint: disable=invalid-name,redefined-builtin
+    def download_logdir_archive(self, id, format='zip', exclude_captures=False, dest=None, stream=False, chunk_size=None, resume=False, ranges=1): # pylint: disable=invalid-name,redefined-builtin,too-many-arguments
         """Download logdir archive in tgz or zip format.
 
         :param id: Result ID as an int.
         :param format: (optional) Format to download, must be string `zip` or `tgz`.
         :param exclude_captures: If bool `True`, don't include capture files
+        :param dest: (optional) Path or file object to write to, see
+            :meth:`CDRouter.download <cdrouter.CDRouter.download>`.
+        :param stream: (optional) If bool `True`, return a generator of chunks instead.
+        :param chunk_size: (optional) Read size in bytes as an int.
+        :param resume: (optional) If bool `True`, download to ``dest``
+            (a path) with HTTP Range requests, continuing an earlier
+            interrupted download, see :class:`cdr_range.RangeDownload
+            <cdr_range.RangeDownload>`.
+        :param ranges: (optional) Number of byte ranges to fetch in
+            parallel as an int.  Implies ``resume``.
         :rtype: tuple `(io.BytesIO, 'filename')`
         """
-        resp = self.service.get(self.base+str(id)+'/logdir/', params={'format': format, 'exclude_captures': exclude_captures}, stream=True)
-        b = io.BytesIO()
-        stream.stream_response_to_file(resp, path=b)
-        resp.close()
-        b.seek(0)
-        return (b, self.service.filename(resp))
+        path = self.base+str(id)+'/logdir/'
+        params = {'format': format, 'exclude_captures': exclude_captures}
+        if resume or ranges > 1:
+            return self.service.download_range(path, dest, params=params, ranges=ranges, chunk_size=chunk_size)
+        resp = self.service.get(path, params=params, stream=True)
+        return self.service.download(resp, dest=dest, stream=stream, chunk_size=chunk_size)
 
     def get_test_metric(self, id, name, metric): # pylint: disable=invalid-name,redefined-builtin
         """Get a test metric.
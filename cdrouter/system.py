@@ -346,19 +346,21 @@ class SystemService(object):
                                  json={'email': email, 'release': {'nonce': nonce, 'filename': filename}})
         return self.service.decode(schema, resp)
 
-    def manual_upgrade(self, fd, filename='cdrouter.bin'):
+    def manual_upgrade(self, fd, filename='cdrouter.bin', progress=None):
         """Upgrade CDRouter manually by uploading a .bin installer from the
         CDRouter Support Lounge. Please note that any running tests will be
         stopped.
 
         :param fd: File-like object to upload.
         :param filename: (optional) Filename to use for installer as string.
+        :param progress: (optional) Function to call as ``progress(sent, total)``
+            while uploading, with the bytes sent so far and in total as ints.
         :return: :class:`system.Upgrade <system.Upgrade>` object
         :rtype: system.Upgrade
         """
         schema = UpgradeSchema()
         resp = self.service.post(self.base+'upgrade/',
-                                 files={'file': (filename, fd)})
+                                 files={'file': (filename, fd)}, progress=progress)
         return self.service.decode(schema, resp)
 
     def lounge_update_license(self):
@@ -372,18 +374,20 @@ class SystemService(object):
         resp = self.service.post(self.base+'license/')
         return self.service.decode(schema, resp)
 
-    def manual_update_license(self, fd, filename='cdrouter.lic'):
+    def manual_update_license(self, fd, filename='cdrouter.lic', progress=None):
         """Update the license on your CDRouter system manually by uploading a
         .lic license from the CDRouter Support Lounge.
 
         :param fd: File-like object to upload.
         :param filename: (optional) Filename to use for license as string.
+        :param progress: (optional) Function to call as ``progress(sent, total)``
+            while uploading, with the bytes sent so far and in total as ints.
         :return: :class:`system.Upgrade <system.Upgrade>` object
         :rtype: system.Upgrade
         """
         schema = UpgradeSchema()
         resp = self.service.post(self.base+'license/',
-                                 files={'file': (filename, fd)})
+                                 files={'file': (filename, fd)}, progress=progress)
         return self.service.decode(schema, resp)
 
     def restart(self):
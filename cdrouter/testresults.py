@@ -7,9 +7,11 @@
 
 import collections
 from functools import partial
+from timeit import default_timer as timer
 
 from marshmallow import Schema, fields, post_load
 from .cdr_datetime import DateTime
+from .cdr_pagesize import PageSizer
 
 class Summary(object):
     """Model for CDRouter Log Section Summaries.
@@ -71,6 +73,12 @@ class Line(object):
 
     :param summary: (optional) :class:`testresults.Summary <testresults.Summary>` object (if section log)
     """
+    __slots__ = ('raw', 'line', 'header', 'section', 'prefix', 'name', 'timestamp',
+                 'timestamp_display', 'message', 'interface', 'packet', 'src', 'dst', 'proto',
+                 'info', 'alert_interface', 'alert_index', 'alert_src', 'alert_dst', 'alert_proto',
+                 'alert_src_port', 'alert_dst_port', 'alert_signature', 'alert_severity',
+                 'alert_severity_display', 'alert_sid', 'alert_rev', 'summary')
+
     def __init__(self, **kwargs):
         self.raw = kwargs.get('raw', None)
 
@@ -190,6 +198,9 @@ class TestResult(object):
     :param log: (optional) Logfile path for TestResult as string.
     :param note: (optional) Note for TestResult as string.
     """
+    __slots__ = ('id', 'seq', 'loop', 'result', 'alerts', 'retries', 'started', 'duration',
+                 'flagged', 'name', 'description', 'skip_name', 'skip_reason', 'log', 'note')
+
     def __init__(self, **kwargs):
         self.id = kwargs.get('id', None)
         self.seq = kwargs.get('seq', None)
@@ -240,6 +251,8 @@ class TestResultsService(object):
 
     RESOURCE = 'tests'
     BASE = '/' + RESOURCE + '/'
+    # id is the result's ID, so keyset iteration goes by seq
+    KEYSET = 'seq'
 
     def __init__(self, service):
         self.service = service
@@ -247,7 +260,7 @@ class TestResultsService(object):
     def _base(self, id): # pylint: disable=invalid-name,redefined-builtin
         return 'results/'+str(id)+self.BASE
 
-    def list(self, id, filter=None, type=None, sort=None, limit=None, page=None, detailed=None): # pylint: disable=invalid-name,redefined-builtin
+    def list(self, id, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=invalid-name,redefined-builtin
         """Get a list of test results.
 
         :param id: Result ID as an int.
@@ -257,11 +270,15 @@ class TestResultsService(object):
         :param limit: (optional) Limit returned list length.
         :param page: (optional) Page to return.
         :param detailed: (optional) Return all fields if Bool `True`.
+        :param stream: (optional) If Bool `True`, read the response
+            incrementally: ``data`` of the returned page is a generator
+            decoding one resource at a time, and ``links`` is only
+            filled in once ``data`` has been exhausted.
         :return: :class:`testresults.Page <testresults.Page>` object
         """
         schema = TestResultSchema()
-        resp = self.service.list(self._base(id), filter, type, sort, limit, page, detailed=detailed)
-        trs, l =self.service.decode(schema, resp, many=True, links=True)
+        resp = self.service.list(self._base(id), filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        trs, l =self.service.decode(schema, resp, many=True, links=True, stream=stream)
         return Page(trs, l)
 
     def iter_list(self, id, *args, **kwargs):
@@ -272,7 +289,8 @@ class TestResultsService(object):
 
         :param id: Result ID as an int.
         :param args: Arguments that ``list`` takes.
-        :param kwargs: Optional arguments that ``list`` takes.
+        :param kwargs: Optional arguments that ``list`` takes, plus
+            those taken by :meth:`CDRouter.iter_list <cdrouter.CDRouter.iter_list>`.
         :return: :class:`testresults.TestResult <testresults.TestResult>` list
 
         """
@@ -346,7 +364,9 @@ class TestResultsService(object):
         :param id: Result ID as an int.
         :param seq: TestResult sequence ID as an int.
         :param args: Arguments that ``list_log`` takes.
-        :param kwargs: Optional arguments that ``list_log`` takes.
+        :param kwargs: Optional arguments that ``list_log`` takes,
+            plus ``page_time`` and ``max_limit`` as taken by
+            :meth:`CDRouter.iter_list <cdrouter.CDRouter.iter_list>`.
         :return: :class:`testresults.Line <testresults.Line>` list
 
         """
@@ -356,8 +376,16 @@ class TestResultsService(object):
             if 'limit' not in kwargs:
                 kwargs['limit'] = 250
 
+            sizer = None
+            page_time = kwargs.pop('page_time', None)
+            max_limit = kwargs.pop('max_limit', None)
+            if page_time and PageSizer.adaptable(kwargs['limit']):
+                sizer = PageSizer(page_time, max_limit)
+
             while True:
+                start = timer()
                 logs = self.list_log(id, seq, *args, **kwargs)
+                elapsed = timer() - start
                 nlines = len(logs.lines)
                 if nlines == 0:
                     break
@@ -365,6 +393,8 @@ class TestResultsService(object):
                     yield l
                 offset = logs.lines[nlines-1].line
                 kwargs.update({'offset': offset})
+                if sizer is not None:
+                    kwargs.update({'limit': sizer.next_limit(kwargs['limit'], nlines, elapsed)})
 
         return generate()
 
@@ -72,7 +72,7 @@ class UsersService(object):
         self.service = service
         self.base = self.BASE
 
-    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None): # pylint: disable=redefined-builtin
+    def list(self, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin
         """Get a list of users.
 
         :param filter: (optional) Filters to apply as a string list.
@@ -81,13 +81,17 @@ class UsersService(object):
         :param limit: (optional) Limit returned list length.
         :param page: (optional) Page to return.
         :param detailed: (optional) Return all fields if Bool `True`.
+        :param stream: (optional) If Bool `True`, read the response
+            incrementally: ``data`` of the returned page is a generator
+            decoding one resource at a time, and ``links`` is only
+            filled in once ``data`` has been exhausted.
         :return: :class:`users.Page <users.Page>` object
         """
         schema = UserSchema()
         if not detailed:
             schema = UserSchema(exclude=('created', 'updated', 'token', 'password', 'password_confirm'))
-        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed)
-        us, l = self.service.decode(schema, resp, many=True, links=True)
+        resp = self.service.list(self.base, filter, type, sort, limit, page, detailed=detailed, stream=stream)
+        us, l = self.service.decode(schema, resp, many=True, links=True, stream=stream)
         return Page(us, l)
 
     def iter_list(self, *args, **kwargs):
@@ -97,7 +101,8 @@ class UsersService(object):
         successive calls to ``list``.
 
         :param args: Arguments that ``list`` takes.
-        :param kwargs: Optional arguments that ``list`` takes.
+        :param kwargs: Optional arguments that ``list`` takes, plus
+            those taken by :meth:`CDRouter.iter_list <cdrouter.CDRouter.iter_list>`.
         :return: :class:`users.User <users.User>` list
 
         """
@@ -114,6 +119,19 @@ class UsersService(object):
         resp = self.service.get_id(self.base, id)
         return self.service.decode(schema, resp)
 
+    def get_many(self, ids, workers=4):
+        """Get several users by ID.  Rather than one request per user,
+        IDs are sent in chunks as ``id`` filters to ``list``, with up
+        to ``workers`` chunks fetched at once.
+
+        :param ids: User IDs as an int list.
+        :param workers: (optional) Most chunks to fetch at once as an int.
+        :return: :class:`cdrouter.Many <cdrouter.Many>` object of
+            :class:`users.User <users.User>` objects in the order of
+            ``ids`` and IDs not found
+        """
+        return self.service.get_many(self.list, ids, workers=workers)
+
     def get_by_name(self, name): # pylint: disable=invalid-name,redefined-builtin
         """Get a user by name.
 
@@ -14,7 +14,15 @@ token = sys.argv[2]
 c = CDRouter(base, token=token)
 
 for r in c.results.iter_list(filter=['fail>0'], sort=['-id']):
-    for tr in c.tests.iter_list(r.id, filter=['result=fail']):
-        logs = c.tests.list_log(tr.id, tr.seq, filter=['prefix=FAIL'], limit='100000')
-        msg = ' '.join([log.message for log in logs.lines])
-        print('Result {}: Test {}: Name {}: {}'.format(r.id, tr.seq, tr.name, msg))
+    # fetch the logs of every failed test in the result at once
+    with c.batch(max_workers=8) as b:
+        trs = list(c.tests.iter_list(r.id, filter=['result=fail']))
+        for tr in trs:
+            b.submit(c.tests.list_log, tr.id, tr.seq, filter=['prefix=FAIL'], limit='100000')
+
+        for tr, logs in zip(trs, b.results()):
+            if isinstance(logs, Exception):
+                print('Result {}: Test {}: Name {}: error: {}'.format(r.id, tr.seq, tr.name, logs))
+                continue
+            msg = ' '.join([log.message for log in logs.lines])
+            print('Result {}: Test {}: Name {}: {}'.format(r.id, tr.seq, tr.name, msg))
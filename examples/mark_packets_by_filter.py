@@ -64,10 +64,15 @@ for tr in c.tests.iter_list(result_id):
             # (first summary column is frame number)
             frames = [s.sections[0].value for s in summ.summaries]
 
+            # look up the log line of each matching packet at once
+            with c.batch(max_workers=8) as b:
+                for frame in frames:
+                    b.submit(c.tests.list_log, tr.id, tr.seq, filter=[field('interface').eq(cap.interface),
+                                                                      field('packet').eq(frame)])
+                logs_list = list(b.results(return_exceptions=False))
+
             # add highlight and comment in the logfile for matching packets
-            for frame in frames:
-                logs = c.tests.list_log(tr.id, tr.seq, filter=[field('interface').eq(cap.interface),
-                                                               field('packet').eq(frame)])
+            for logs in logs_list:
                 if len(logs.lines) == 0:
                     continue
                 l = logs.lines[0]
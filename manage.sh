@@ -12,7 +12,15 @@ function setup {
 
 function requirements {
     pip install --no-cache-dir -r requirements.txt
-    pip install --no-cache-dir twine
+    pip install --no-cache-dir twine pytest pyflakes
+}
+
+function test {
+    python -m pytest -q tests
+}
+
+function lint {
+    python -m pyflakes cdrouter
 }
 
 function install {
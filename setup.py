@@ -44,5 +44,8 @@ setup(
     ],
     keywords='cdrouter json rest api client',
     packages=['cdrouter'],
-    install_requires=['future', 'marshmallow', 'requests', 'requests-toolbelt']
+    install_requires=['future', 'futures; python_version < "3.0"', 'marshmallow', 'requests', 'requests-toolbelt'],
+    extras_require={
+        'async': ['aiohttp'],
+    }
 )
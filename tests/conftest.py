@@ -0,0 +1,225 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+"""Stub CDRouter Web API server for tests."""
+
+import json
+import re
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlparse
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlparse
+
+import pytest
+
+def result(i, status='completed'):
+    return {'id': str(i), 'created': '2020-01-01T00:00:00Z', 'updated': '2020-01-01T00:00:00Z',
+            'result': 'pass', 'status': status, 'loops': 1, 'tests': 1, 'pass': 1, 'fail': 0,
+            'alerts': 0, 'duration': 1, 'size_on_disk': 1, 'starred': False, 'archived': False,
+            'package_name': 'p', 'device_name': 'd', 'package_id': '1', 'device_id': '1',
+            'config_id': '1', 'user_id': '1', 'tags': []}
+
+class State(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = []
+        self.results = 50
+        self.status = 'completed'
+        self.delay = 0.0
+        # GET responses to fail with 503 before answering
+        self.fail_next = 0
+        self.blob = b''
+        self.blob_filename = 'blob.bin'
+        self.etag = None
+        # change the ETag on every blob request
+        self.etag_every = False
+        # blob responses to cut short after drop_after bytes
+        self.drops = 0
+        self.drop_after = 1000
+        self.ranges = []
+        # query params of results/ listings
+        self.queries = []
+        # ETag of results/<id>/, answered with 304 when it matches
+        self.result_etag = None
+        self.not_modified = 0
+        # data of successive results/<id>/?updates= polls, the last repeated
+        self.update_polls = [{}]
+        self.polls = 0
+        # (method, path, query, headers, body) of requests other than GETs
+        self.writes = []
+        # when set, requests without this bearer token get a 401 and
+        # POST /authenticate answers with it
+        self.token = None
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args): # pylint: disable=arguments-differ
+        pass
+
+    def send(self, code, obj=None, body=None, headers=None, drop=False):
+        if body is None:
+            body = json.dumps(obj).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {'Content-Type': 'application/json'}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if drop:
+            self.wfile.write(body[:self.server.state.drop_after])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def authorized(self):
+        token = self.server.state.token
+        return token is None or self.headers.get('Authorization') == 'Bearer ' + token
+
+    def do_GET(self): # pylint: disable=invalid-name
+        st = self.server.state
+        u = urlparse(self.path)
+        q = parse_qs(u.query)
+        with st.lock:
+            st.hits.append(u.path)
+            fail = st.fail_next > 0
+            if fail:
+                st.fail_next -= 1
+        if st.delay:
+            time.sleep(st.delay)
+        if fail:
+            return self.send(503, {'error': 'busy'}, headers={'Retry-After': '0'})
+        if not self.authorized():
+            return self.send(401, {'error': 'authentication required'})
+
+        if u.path == '/api/v1/system/hostname/':
+            return self.send(200, {'data': {'hostname': 'stub'}})
+
+        if u.path == '/api/v1/results/':
+            limit = q.get('limit', ['20'])[0]
+            limit = max(st.results, 1) if limit == 'none' else int(limit)
+            page = int(q.get('page', ['1'])[0])
+            ids = list(range(1, st.results + 1))
+            filters = q.get('filter', [])
+            with st.lock:
+                st.queries.append(q)
+            if filters and all(f.startswith('id=') for f in filters):
+                # type=union of id filters, answered in id order
+                wanted = set(int(f[3:]) for f in filters)
+                ids = [i for i in ids if i in wanted]
+            for f in filters:
+                m = re.match(r'id([<>])(\d+)$', f)
+                if m:
+                    n = int(m.group(2))
+                    ids = [i for i in ids if (i > n if m.group(1) == '>' else i < n)]
+            if q.get('sort', ['id'])[0] == '-id':
+                ids.reverse()
+            last = max(1, -(-len(ids) // limit))
+            data = [result(i, st.status) for i in ids][(page-1)*limit:page*limit]
+            links = {'first': 1, 'last': last, 'current': page, 'total': len(ids), 'limit': limit}
+            if page < last:
+                links['next'] = page + 1
+            return self.send(200, {'data': data, 'links': links})
+        m = re.match(r'/api/v1/results/(\d+)/$', u.path)
+        if m:
+            if int(m.group(1)) > st.results:
+                return self.send(404, {'error': 'no such result'})
+            if 'updates' in q:
+                with st.lock:
+                    data = st.update_polls[min(st.polls, len(st.update_polls) - 1)]
+                    st.polls += 1
+                return self.send(200, {'data': data})
+            headers = {'Content-Type': 'application/json'}
+            if st.result_etag:
+                headers['ETag'] = st.result_etag
+                if self.headers.get('If-None-Match') == st.result_etag:
+                    with st.lock:
+                        st.not_modified += 1
+                    return self.send(304, body=b'', headers=headers)
+            return self.send(200, {'data': result(int(m.group(1)), st.status)}, headers=headers)
+        if u.path == '/api/v1/blob/':
+            return self.blob()
+        return self.send(404, {'error': 'not found'})
+
+    def do_POST(self): # pylint: disable=invalid-name
+        st = self.server.state
+        u = urlparse(self.path)
+        body = self.body()
+        with st.lock:
+            st.hits.append(u.path)
+            st.writes.append((self.command, u.path, parse_qs(u.query), dict(self.headers), body))
+        if u.path == '/authenticate':
+            return self.send(200, {'data': {'id': '1', 'name': 'admin', 'token': st.token}})
+        if not self.authorized():
+            return self.send(401, {'error': 'authentication required'})
+        m = re.match(r'/api/v1/results/(\d+)/$', u.path)
+        if m and self.command in ('PATCH', 'PUT'):
+            return self.send(200, {'data': result(int(m.group(1)))})
+        return self.send(200, {'data': {}})
+
+    do_PATCH = do_PUT = do_DELETE = do_POST
+
+    def body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                n = int(self.rfile.readline().split(b';')[0], 16)
+                chunks.append(self.rfile.read(n))
+                self.rfile.readline()
+                if n == 0:
+                    return b''.join(chunks)
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def blob(self):
+        st = self.server.state
+        with st.lock:
+            if st.etag_every:
+                st.etag = '"e{}"'.format(len(st.hits))
+            drop = st.drops > 0
+            if drop:
+                st.drops -= 1
+        headers = {'Content-Type': 'application/octet-stream', 'Accept-Ranges': 'bytes'}
+        if st.blob_filename:
+            headers['Content-Disposition'] = 'attachment; filename="{}"'.format(st.blob_filename)
+        if st.etag:
+            headers['ETag'] = st.etag
+        rng = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if rng and (if_range is None or if_range == st.etag):
+            m = re.match(r'bytes=(\d+)-(\d*)', rng)
+            start = int(m.group(1))
+            end = int(m.group(2)) if m.group(2) else len(st.blob) - 1
+            with st.lock:
+                st.ranges.append((start, end))
+            headers['Content-Range'] = 'bytes {}-{}/{}'.format(start, end, len(st.blob))
+            return self.send(206, body=st.blob[start:end+1], headers=headers, drop=drop)
+        return self.send(200, body=st.blob, headers=headers, drop=drop)
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients hanging up early is expected
+        pass
+
+@pytest.fixture
+def server():
+    """Stub server with a ``state`` and a ``url`` to point a client at."""
+    srv = Server(('127.0.0.1', 0), Handler)
+    srv.state = State()
+    srv.url = 'http://127.0.0.1:{}'.format(srv.server_address[1])
+    t = threading.Thread(target=srv.serve_forever, kwargs={'poll_interval': 0.05})
+    t.daemon = True
+    t.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
@@ -0,0 +1,99 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+import asyncio
+
+import aiohttp
+
+from cdrouter.aio import AsyncCDRouter
+from cdrouter.cdr_error import CDRouterError
+
+import pytest
+
+def run(main):
+    return asyncio.run(asyncio.wait_for(main(), 20))
+
+def listings(server):
+    return [h for h in server.state.hits if h == '/api/v1/results/']
+
+def test_get(server):
+    async def main():
+        async with AsyncCDRouter(server.url, token='x') as c:
+            r = await c.results.get(3)
+            assert r.id == 3 and r.status == 'completed'
+            with pytest.raises(CDRouterError, match='no such result'):
+                await c.results.get(999)
+
+    run(main)
+
+def test_list(server):
+    async def main():
+        async with AsyncCDRouter(server.url, token='x') as c:
+            rs, links = await c.results.list(limit=10, page=2)
+            assert [r.id for r in rs] == list(range(11, 21))
+            assert (links.current, links.next, links.last, links.total) == (2, 3, 5, 50)
+
+    run(main)
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_iter_list(server, stream):
+    async def main():
+        async with AsyncCDRouter(server.url, token='x') as c:
+            return [r.id async for r in c.results.iter_list(limit=7, stream=stream)]
+
+    assert run(main) == list(range(1, 51))
+    assert len(listings(server)) == 8
+    assert [q['page'] for q in server.state.queries[1:]] == [[str(p)] for p in range(2, 9)]
+
+@pytest.mark.parametrize('sort,filters', [('id', ['id>20', 'id>40']), ('-id', ['id<31', 'id<11'])])
+def test_iter_list_keyset(server, sort, filters):
+    async def main():
+        async with AsyncCDRouter(server.url, token='x') as c:
+            return [r.id async for r in c.results.iter_list(limit=20, sort=sort, keyset=True)]
+
+    ids = list(range(1, 51))
+    assert run(main) == (ids if sort == 'id' else ids[::-1])
+    queries = server.state.queries
+    assert all('page' not in q and q['sort'] == [sort] for q in queries)
+    assert [q.get('filter') for q in queries] == [None] + [[f] for f in filters]
+
+def test_relogin_on_401(server):
+    async def main():
+        async with AsyncCDRouter(server.url, username='admin', password='secret') as c:
+            # Automatic Login is enabled, requests go without a token
+            assert (await c.results.get(1)).id == 1
+            assert c.auto_login is True and c.token is None
+
+            # until it's disabled
+            server.state.token = 't0ken'
+            assert (await c.results.get(2)).id == 2
+            assert c.auto_login is False and c.token == 't0ken'
+            assert (await c.results.get(3)).id == 3
+
+    run(main)
+    assert server.state.hits == ['/api/v1/system/hostname/', '/api/v1/results/1/', '/api/v1/results/2/',
+                                 '/authenticate', '/api/v1/results/2/', '/api/v1/results/3/']
+    auth = server.state.writes[0]
+    assert auth[2] == {'username': ['admin'], 'password': ['secret']}
+
+def test_session_close(server):
+    async def main():
+        c = AsyncCDRouter(server.url, token='x')
+        await c.results.get(1)
+        session = c.session
+        await c.close()
+        assert session.closed and c.session is None
+        # a new session is created on next use
+        await c.results.get(1)
+        assert c.session is not session
+        await c.close()
+
+        # a session passed in is left open
+        async with aiohttp.ClientSession() as session:
+            async with AsyncCDRouter(server.url, token='x', session=session) as c:
+                await c.results.get(1)
+            assert not session.closed and c.session is session
+
+    run(main)
@@ -0,0 +1,78 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+import threading
+import time
+
+from cdrouter import CDRouter
+from cdrouter.cdr_batch import Batch
+
+import pytest
+
+def slow(x, delay=0.0):
+    time.sleep(delay)
+    return x * 2
+
+def fail(x):
+    raise ValueError(x)
+
+def test_results_in_submit_order():
+    with Batch(max_workers=4) as b:
+        for i in range(8):
+            # later calls finish first
+            b.submit(slow, i, delay=(8 - i) * 0.01)
+        assert list(b.results()) == [i * 2 for i in range(8)]
+
+def test_map():
+    with Batch(max_workers=2) as b:
+        futures = b.map(slow, [1, 2, 3])
+        assert [f.result() for f in futures] == [2, 4, 6]
+        assert list(b.results()) == [2, 4, 6]
+
+def test_exceptions_captured():
+    with Batch(max_workers=2) as b:
+        b.submit(slow, 1)
+        b.submit(fail, 'boom')
+        b.submit(slow, 3)
+        results = list(b.results())
+        assert results[0] == 2 and results[2] == 6
+        assert isinstance(results[1], ValueError)
+        assert [(i, str(e)) for i, e in b.errors()] == [(1, 'boom')]
+        with pytest.raises(ValueError):
+            list(b.results(return_exceptions=False))
+
+def test_submit_while_iterating():
+    with Batch(max_workers=2) as b:
+        b.submit(slow, 1)
+        out = []
+        for r in b.results():
+            out.append(r)
+            if r < 8:
+                b.submit(slow, r)
+    assert out == [2, 4, 8]
+
+def test_error_in_block_cancels_rest():
+    gate = threading.Event()
+    ran = []
+
+    def call(i):
+        gate.wait(5)
+        ran.append(i)
+
+    with pytest.raises(RuntimeError):
+        with Batch(max_workers=1) as b:
+            futures = b.map(call, range(5))
+            # the first call is running, the others are queued
+            threading.Timer(0.2, gate.set).start()
+            raise RuntimeError('stop')
+    assert ran == [0]
+    assert all(f.cancelled() for f in futures[1:])
+
+def test_shares_client(server):
+    c = CDRouter(server.url, token='x')
+    with c.batch(max_workers=4) as b:
+        b.map(c.results.get, range(1, 9))
+        assert [r.id for r in b.results()] == list(range(1, 9))
+    assert len(server.state.hits) == 8
@@ -0,0 +1,206 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+import json
+import os
+import stat
+import threading
+import time
+
+from cdrouter import CDRouter
+from cdrouter.cdr_cache import CachedResponse, DiskCache, ResponseCache
+from cdrouter.results import Result
+
+import pytest
+
+BASE = 'http://cdrouter'
+
+def response(data, size=0):
+    return CachedResponse(200, {'Content-Type': 'application/json'},
+                          json.dumps({'data': data, 'pad': 'x' * size}).encode('utf-8'))
+
+def cached(cache, key):
+    resp = cache.get(BASE, key)
+    return None if resp is None else resp.json()['data']
+
+def hits(server, path):
+    return server.state.hits.count('/api/v1/' + path)
+
+@pytest.fixture
+def directory(tmpdir):
+    return str(tmpdir.join('cache'))
+
+def test_disk_persists(directory):
+    DiskCache(directory, ttl=60).set(BASE, 'devices/1/', response({'id': '1'}))
+    assert cached(DiskCache(directory), 'devices/1/') == {'id': '1'}
+    assert cached(DiskCache(directory), 'devices/2/') is None
+
+def test_disk_ttl(directory):
+    c = DiskCache(directory, ttl=0)
+    c.set(BASE, 'devices/1/', response({'id': '1'}))
+    assert len(c) == 0
+    c = DiskCache(directory, ttl=-1, ttls={'devices/': 60})
+    c.set(BASE, 'devices/1/', response({'id': '1'}))
+    assert len(c) == 1
+
+@pytest.mark.skipif(os.name != 'posix', reason='needs POSIX permissions')
+def test_disk_permissions(directory):
+    c = DiskCache(directory, ttl=60)
+    c.set(BASE, 'devices/1/', response({'id': '1'}))
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    for name in os.listdir(directory):
+        assert stat.S_IMODE(os.stat(os.path.join(directory, name)).st_mode) & 0o077 == 0
+
+def test_disk_evicts_lru(directory):
+    c = DiskCache(directory, max_bytes=2500, ttl=60)
+    c.set(BASE, 'devices/1/', response({'id': '1'}, 1000))
+    c.set(BASE, 'devices/2/', response({'id': '2'}, 1000))
+    cached(c, 'devices/1/')
+    c.set(BASE, 'devices/3/', response({'id': '3'}, 1000))
+    assert cached(c, 'devices/1/') is not None
+    assert cached(c, 'devices/2/') is None
+    assert cached(c, 'devices/3/') is not None
+
+def test_disk_finished_results(directory):
+    c = DiskCache(directory)
+    # not cached without a TTL while running
+    c.set(BASE, 'results/1/', response({'id': '1', 'status': 'running'}))
+    c.set(BASE, 'results/1/tests/', response([]))
+    assert len(c) == 0
+    c.set(BASE, 'results/1/', response({'id': '1', 'status': 'completed'}))
+    c.set(BASE, 'results/1/tests/', response([]))
+    c = DiskCache(directory)
+    assert cached(c, 'results/1/') == {'id': '1', 'status': 'completed'}
+    assert cached(c, 'results/1/tests/') == []
+
+def test_disk_invalidate(directory):
+    c = DiskCache(directory, ttl=60)
+    for key in ('results/', 'results/?page=2', 'results/#abc', 'results/1/', 'results/2/tests/'):
+        c.set(BASE, key, response({'id': '1', 'status': 'completed'}))
+    c.invalidate('results/', base=BASE, children=False)
+    assert len(c) == 2
+    c.invalidate('results/2/', base=BASE)
+    assert len(c) == 1
+    c.invalidate('results/', base='http://other')
+    assert len(c) == 1
+    # result 1 is still known to be finished
+    c.set(BASE, 'results/1/tests/', response([]))
+    assert c._result_id(BASE, 'results/1/tests/', 0) == '1' # pylint: disable=protected-access
+    c.invalidate()
+    assert len(c) == 0
+    assert c._result_id(BASE, 'results/1/tests/', 0) is None # pylint: disable=protected-access
+
+def test_client_per_user(server, directory):
+    c1 = CDRouter(server.url, token='one', cache=DiskCache(directory))
+    c2 = CDRouter(server.url, token='two', cache=DiskCache(directory))
+    c1.results.get(1)
+    c2.results.get(1)
+    c1.results.get(1)
+    c2.results.get(1)
+    assert hits(server, 'results/1/') == 2
+    # a new process starts with the finished result cached
+    CDRouter(server.url, token='one', cache=DiskCache(directory)).results.get(1)
+    assert hits(server, 'results/1/') == 2
+
+def test_client_writes(server, directory):
+    c = CDRouter(server.url, token='x', cache=DiskCache(directory, ttls={'results/': 60}))
+    c.results.get(1)
+    c.results.get(2)
+    c.results.list()
+    # only reads, so nothing is dropped
+    c.results.all_stats()
+    c.results.get(1)
+    c.results.get(2)
+    c.results.list()
+    assert len(server.state.hits) == 4
+
+    # editing result 2 drops it and the listings, not result 1
+    c.results.edit(Result(id=2, starred=True))
+    c.results.get(1)
+    c.results.get(2)
+    c.results.list()
+    assert hits(server, 'results/1/') == 1
+    assert hits(server, 'results/2/') == 3
+    assert hits(server, 'results/') == 3
+
+def test_memory_ttl():
+    c = ResponseCache(ttl=0.05, ttls={'results/': None, 'results/1/': 60})
+    assert c.ttl_for('devices/1/') == 0.05
+    assert c.ttl_for('results/2/') is None
+    assert c.ttl_for('results/1/tests/') == 60
+    c.set(BASE, 'devices/1/', response({'id': '1'}))
+    c.set(BASE, 'results/2/', response({'id': '2'}))
+    c.set(BASE, 'results/1/', response({'id': '1'}))
+    assert len(c) == 2
+    assert cached(c, 'devices/1/') == {'id': '1'}
+    time.sleep(0.06)
+    assert cached(c, 'devices/1/') is None
+    assert cached(c, 'results/1/') == {'id': '1'}
+
+def test_memory_lru():
+    c = ResponseCache(maxsize=2, ttl=60)
+    c.set(BASE, 'devices/1/', response({'id': '1'}))
+    c.set(BASE, 'devices/2/', response({'id': '2'}))
+    cached(c, 'devices/1/')
+    c.set(BASE, 'devices/3/', response({'id': '3'}))
+    assert cached(c, 'devices/1/') is not None
+    assert cached(c, 'devices/2/') is None
+    assert cached(c, 'devices/3/') is not None
+
+def test_memory_invalidate():
+    c = ResponseCache(ttl=60)
+    for key in ('results/', 'results/?page=2', 'results/#abc', 'results/1/', 'results/2/tests/'):
+        c.set(BASE, key, response({}))
+    c.set('http://other', 'results/', response({}))
+    c.invalidate('results/', base=BASE, children=False)
+    assert sorted(k for _, k in c.entries) == ['results/', 'results/1/', 'results/2/tests/']
+    c.invalidate('results/2/')
+    assert len(c) == 2
+    c.invalidate()
+    assert len(c) == 0
+
+def test_memory_client(server):
+    c = CDRouter(server.url, token='x', cache=ResponseCache(ttls={'results/': 60}))
+    r = c.results.get(1)
+    r.status = 'changed'
+    assert c.results.get(1).status == 'completed'
+    c.results.list()
+    c.results.list()
+    c.results.get(2)
+    assert len(server.state.hits) == 3
+    c.results.edit(Result(id=2, starred=True))
+    c.results.get(1)
+    c.results.get(2)
+    c.results.list()
+    assert hits(server, 'results/1/') == 1
+    assert hits(server, 'results/2/') == 3
+    assert hits(server, 'results/') == 2
+    assert c.results.get(1, cached=False).id == 1
+    assert hits(server, 'results/1/') == 2
+
+def run_with_timeout(fn, timeout=20):
+    out = []
+    t = threading.Thread(target=lambda: out.append(fn()))
+    t.daemon = True
+    t.start()
+    t.join(timeout)
+    assert not t.is_alive(), 'watch never finished'
+    return out[0]
+
+def test_watch_bypasses_cache(server):
+    tr = {'id': '1', 'seq': '1', 'result': 'pass', 'name': 'first'}
+    server.state.update_polls = [
+        {'id': '1', 'updates': [tr], 'running': tr},
+        {'running': tr},
+        {'id': '2', 'updates': [dict(tr, seq='2', name='second')], 'running': tr},
+        {},
+    ]
+    server.state.status = 'running'
+    c = CDRouter(server.url, token='x', cache=ResponseCache(ttls={'results/': 60}))
+    c.results.get(1)
+    server.state.status = 'completed'
+    items = run_with_timeout(lambda: list(c.results.watch(1, max_interval=0.01)))
+    assert [getattr(i, 'name', None) for i in items] == ['first', 'second', None]
+    assert items[-1].status == 'completed'
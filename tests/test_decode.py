@@ -0,0 +1,109 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+import copy
+import datetime
+
+from cdrouter import cdr_decode
+from cdrouter.cdrouter import LinksSchema, ListResponseSchema
+from cdrouter.configs import ConfigSchema
+from cdrouter.packages import PackageSchema
+from cdrouter.results import ResultSchema
+from cdrouter import testresults
+
+import pytest
+
+RESULT = {'id': '12', 'created': '2020-01-01T00:00:00.123456Z', 'updated': '2020-01-02T00:00:00Z',
+          'result': 'pass', 'status': 'completed', 'loops': 1, 'tests': 10, 'pass': 9, 'fail': 1,
+          'alerts': 0, 'duration': 61, 'size_on_disk': 4096, 'starred': False, 'archived': True,
+          'package_name': 'p', 'device_name': 'd', 'package_id': '3', 'device_id': '4',
+          'config_id': '5', 'user_id': '1', 'note': '', 'tags': ['a', 'b'], 'testcases': None}
+TEST_RESULT = {'id': '12', 'seq': '7', 'loop': '1', 'result': 'fail', 'alerts': 2, 'retries': 0,
+               'started': '2020-01-01T00:00:00Z', 'duration': 3, 'flagged': True, 'name': 'cdrouter_basic_1',
+               'description': 'Basic', 'skip_name': '', 'skip_reason': '', 'log': 'log.txt', 'note': ''}
+PACKAGE = {'id': '3', 'name': 'p', 'description': '', 'created': '2020-01-01T00:00:00Z',
+           'updated': '2020-01-01T00:00:00Z', 'test_count': '20', 'testlist': ['start', 'cdrouter_basic_1'],
+           'extra_cli_args': '', 'user_id': '1', 'agent_id': '0', 'config_id': '5', 'result_id': None,
+           'device_id': '4', 'tags': [], 'use_as_testlist': False, 'note': None}
+CONFIG = {'id': '5', 'name': 'c', 'description': 'd', 'created': '2020-01-01T00:00:00Z',
+          'updated': '2020-01-01T00:00:00Z', 'contents': 'testvar lanIp 192.168.1.1', 'user_id': '1',
+          'result_id': None, 'tags': ['x'], 'note': 'n'}
+LINKS = {'first': 1, 'last': 5, 'current': 2, 'total': 100, 'limit': 20, 'next': 3, 'prev': 1}
+
+def plain(value):
+    # models to comparable dicts, whether they use __dict__ or __slots__
+    if isinstance(value, list):
+        return [plain(v) for v in value]
+    if isinstance(value, dict):
+        return dict((k, plain(v)) for k, v in value.items())
+    if isinstance(value, (str, int, float, bool, type(None), datetime.datetime)):
+        return value
+    attrs = {}
+    for cls in type(value).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if hasattr(value, name):
+                attrs[name] = getattr(value, name)
+    attrs.update(getattr(value, '__dict__', {}))
+    return (type(value).__name__, plain(attrs))
+
+def variants(data):
+    yield data
+    # numbers as strings, and strings which aren't numbers
+    for k, v in data.items():
+        if isinstance(v, int) and not isinstance(v, bool):
+            yield dict(data, **{k: str(v)})
+            yield dict(data, **{k: 'x'})
+        if isinstance(v, str):
+            yield dict(data, **{k: 5})
+        # None where it isn't allowed, and missing keys
+        yield dict(data, **{k: None})
+        d = dict(data)
+        del d[k]
+        yield d
+    yield {}
+
+def check(schema, data, many=None):
+    expected = schema.load(copy.deepcopy(data), many=many).data
+    assert plain(cdr_decode.load(schema, copy.deepcopy(data), many=many)) == plain(expected)
+
+@pytest.mark.parametrize('schema, data', [
+    (ResultSchema(), RESULT),
+    (testresults.TestResultSchema(), TEST_RESULT),
+    (PackageSchema(), PACKAGE),
+    (ConfigSchema(), CONFIG),
+    (LinksSchema(), LINKS),
+])
+def test_same_as_marshmallow(schema, data):
+    assert cdr_decode.compile_schema(schema) is not None
+    for d in variants(data):
+        check(schema, d)
+
+@pytest.mark.parametrize('schema, data', [
+    (ResultSchema(only=('id', 'status', 'tags')), RESULT),
+    (ResultSchema(exclude=('created', 'updated', 'pass')), RESULT),
+    (ConfigSchema(exclude=('contents', 'note')), CONFIG),
+    (PackageSchema(only=('id', 'testlist')), PACKAGE),
+])
+def test_only_exclude(schema, data):
+    assert cdr_decode.compile_schema(schema) is not None
+    for d in variants(data):
+        check(schema, d)
+
+def test_many():
+    check(ResultSchema(), [RESULT, dict(RESULT, id='13')], many=True)
+    check(ResultSchema(), [RESULT, dict(RESULT, loops='x')], many=True)
+    check(ResultSchema(many=True), [RESULT])
+    check(ResultSchema(), {'not': 'a list'}, many=True)
+
+def test_nested_links():
+    schema = ListResponseSchema()
+    assert cdr_decode.compile_schema(schema) is not None
+    data = {'timestamp': '2020-01-01T00:00:00Z', 'data': [RESULT], 'links': LINKS}
+    check(schema, data)
+    for links in variants(LINKS):
+        check(schema, dict(data, links=links))
+    check(schema, dict(data, links=None))
+    del data['links']
+    check(schema, data)
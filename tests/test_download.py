@@ -0,0 +1,76 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+import io
+import os
+import types
+
+from cdrouter import CDRouter
+from cdrouter.cdr_error import CDRouterError
+
+import pytest
+
+BLOB = os.urandom(200000)
+
+@pytest.fixture
+def c(server):
+    server.state.blob = BLOB
+    return CDRouter(server.url, token='x')
+
+def get(c):
+    return c.get('blob/', stream=True)
+
+def test_bytesio(c):
+    b, filename = c.download(get(c))
+    assert isinstance(b, io.BytesIO)
+    assert b.read() == BLOB
+    assert filename == 'blob.bin'
+
+def test_file_path(c, tmpdir):
+    dest = str(tmpdir.join('out.bin'))
+    path, filename = c.download(get(c), dest=dest, chunk_size=1000)
+    assert path == dest
+    assert filename == 'blob.bin'
+    with open(dest, 'rb') as fd:
+        assert fd.read() == BLOB
+
+def test_directory(c, tmpdir):
+    path, filename = c.download(get(c), dest=str(tmpdir))
+    assert path == str(tmpdir.join('blob.bin'))
+    with open(path, 'rb') as fd:
+        assert fd.read() == BLOB
+
+def test_directory_without_filename(server, c, tmpdir):
+    server.state.blob_filename = None
+    with pytest.raises(CDRouterError):
+        c.download(get(c), dest=str(tmpdir))
+    assert os.listdir(str(tmpdir)) == []
+
+def test_file_object(c):
+    fd = io.BytesIO()
+    out, filename = c.download(get(c), dest=fd)
+    assert out is fd
+    assert fd.getvalue() == BLOB
+    assert filename == 'blob.bin'
+
+def test_stream(c, tmpdir):
+    gen, filename = c.download(get(c), dest=str(tmpdir), stream=True, chunk_size=1000)
+    assert isinstance(gen, types.GeneratorType)
+    assert filename == 'blob.bin'
+    chunks = list(gen)
+    assert max(len(chunk) for chunk in chunks) <= 1000
+    assert b''.join(chunks) == BLOB
+    # dest is ignored
+    assert os.listdir(str(tmpdir)) == []
+
+def test_stream_closed_early(c):
+    resp = get(c)
+    closed = []
+    close = resp.close
+    resp.close = lambda: closed.append(close())
+    gen, _ = c.download(resp, stream=True)
+    next(gen)
+    gen.close()
+    assert closed
@@ -0,0 +1,129 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+import asyncio
+import threading
+
+from cdrouter import CDRouter
+from cdrouter.aio import AsyncCDRouter
+from cdrouter.cdr_error import CDRouterError
+from cdrouter.cdr_flight import SingleFlight
+
+import pytest
+
+def run_concurrently(sf, fn, n=5):
+    out = [None] * n
+
+    def call(i):
+        try:
+            out[i] = sf.do('k', fn)
+        except Exception as e: # pylint: disable=broad-except
+            out[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    return threads, out
+
+def wait_for_waiters(sf, n):
+    for _ in range(500):
+        with sf.lock:
+            if 'k' in sf.calls and sf.calls['k'].waiters == n:
+                return
+        threading.Event().wait(0.01)
+    raise AssertionError('callers never joined the flight')
+
+def test_shares_result():
+    sf = SingleFlight()
+    gate = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(True)
+        gate.wait(5)
+        return 42
+
+    threads, out = run_concurrently(sf, fn)
+    wait_for_waiters(sf, 4)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert out == [42] * 5
+    assert len(calls) == 1
+    assert sf.shared == 4
+    assert not sf.calls
+    # a finished call isn't reused
+    assert sf.do('k', lambda: 43) == 43
+
+def test_shares_error():
+    sf = SingleFlight()
+    gate = threading.Event()
+
+    def fn():
+        gate.wait(5)
+        raise ValueError('boom')
+
+    threads, out = run_concurrently(sf, fn, n=3)
+    wait_for_waiters(sf, 2)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert all(isinstance(e, ValueError) for e in out)
+    assert not sf.calls
+
+def test_share_hook_only_when_shared():
+    sf = SingleFlight()
+    shared = []
+    sf.do('k', lambda: 1, share=shared.append)
+    assert not shared
+
+def get_concurrently(c, n=5):
+    threads = [threading.Thread(target=c.results.get, args=(1,)) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+def test_client_coalesces(server):
+    server.state.delay = 0.2
+    c = CDRouter(server.url, token='x', coalesce=True)
+    get_concurrently(c)
+    assert len(server.state.hits) == 1
+    assert c.flights.shared == 4
+
+def test_client_off_by_default(server):
+    server.state.delay = 0.1
+    get_concurrently(CDRouter(server.url, token='x'))
+    assert len(server.state.hits) == 5
+
+def test_async_leader_cancel_keeps_waiters(server):
+    async def main():
+        async with AsyncCDRouter(server.url, token='x', coalesce=True) as c:
+            server.state.delay = 0.3
+            leader = asyncio.ensure_future(c.results.get(1))
+            await asyncio.sleep(0.05)
+            others = [asyncio.ensure_future(c.results.get(1)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            leader.cancel()
+            results = await asyncio.gather(*others)
+            assert [r.id for r in results] == [1, 1, 1]
+            assert len(server.state.hits) == 1
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+
+            # once every caller is gone the request is cancelled too
+            callers = [asyncio.ensure_future(c.results.get(2)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            for t in callers:
+                t.cancel()
+            await asyncio.gather(*callers, return_exceptions=True)
+            await asyncio.sleep(0.01)
+            assert not c.flights
+
+            server.state.delay = 0.1
+            errors = await asyncio.gather(c.results.get(999), c.results.get(999), return_exceptions=True)
+            assert all(isinstance(e, CDRouterError) for e in errors)
+
+    asyncio.run(asyncio.wait_for(main(), 20))
@@ -0,0 +1,56 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+from cdrouter import CDRouter
+
+from requests.compat import urlencode
+
+import pytest
+
+@pytest.fixture
+def c(server):
+    return CDRouter(server.url, token='x')
+
+def test_input_order(server, c):
+    many = c.results.get_many([5, 2, 9, 1])
+    assert [r.id for r in many.data] == [5, 2, 9, 1]
+    assert many.missing == []
+    assert len(server.state.queries) == 1
+    assert server.state.queries[0]['type'] == ['union']
+
+def test_duplicates(server, c):
+    many = c.results.get_many([3, '3', 1, 3])
+    assert [r.id for r in many.data] == [3, 3, 1, 3]
+    # each ID is only asked for once
+    assert sorted(server.state.queries[0]['filter']) == ['id=1', 'id=3']
+
+def test_missing(c):
+    many = c.results.get_many([1, 999, 2, 1000])
+    assert [r.id for r in many.data] == [1, 2]
+    assert many.missing == [999, 1000]
+    assert c.results.get_many([]) == ([], [])
+
+def test_chunks(c):
+    ids = list(range(1, 1001))
+    chunks = c._id_chunks(ids) # pylint: disable=protected-access
+    assert len(chunks) > 1
+    assert [int(x) for chunk in chunks for x in chunk] == ids
+    for chunk in chunks:
+        length = sum(len(urlencode({'filter': 'id=' + x})) + 1 for x in chunk)
+        assert length <= c.MAX_FILTER_LENGTH
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_split_requests(server, c, workers):
+    server.state.results = 100
+    c.MAX_FILTER_LENGTH = 100
+    ids = list(range(100, 0, -1)) + [500]
+    many = c.results.get_many(ids, workers=workers)
+    assert [r.id for r in many.data] == ids[:-1]
+    assert many.missing == [500]
+    queries = server.state.queries
+    assert len(queries) == len(c._id_chunks(ids)) > 1 # pylint: disable=protected-access
+    for q in queries:
+        assert len(urlencode([('filter', f) for f in q['filter']])) <= c.MAX_FILTER_LENGTH
+        assert q['limit'] == [str(len(q['filter']))]
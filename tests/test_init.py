@@ -0,0 +1,29 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run(code):
+    return subprocess.check_output([sys.executable, '-c', code], cwd=ROOT,
+                                   stderr=subprocess.STDOUT).decode().strip()
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='needs module __getattr__')
+def test_lazy_import():
+    assert run("import sys, cdrouter; print('requests' in sys.modules)") == 'False'
+
+def test_names():
+    out = run("import cdrouter; from cdrouter import CDRouter; "
+              "print(CDRouter.__name__, cdrouter.jobs.__name__, cdrouter.cdrouter.CDRouter is CDRouter)")
+    assert out == 'CDRouter cdrouter.jobs True'
+
+def test_missing_attribute():
+    with pytest.raises(subprocess.CalledProcessError):
+        run("import cdrouter; cdrouter.nosuchmodule")
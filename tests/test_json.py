@@ -0,0 +1,79 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+import sys
+
+from cdrouter import CDRouter
+from cdrouter import cdr_json
+
+import pytest
+
+def installed(name):
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+@pytest.fixture
+def hide(monkeypatch):
+    """Make importing the named modules raise ImportError."""
+    def hide(*names):
+        for name in names:
+            monkeypatch.setitem(sys.modules, name, None)
+    return hide
+
+def available():
+    out = []
+    for name, _ in cdr_json.BACKENDS:
+        try:
+            out.append(cdr_json.backend(name))
+        except ImportError:
+            pass
+    return out
+
+def test_default_prefers_fastest():
+    expected = [n for n, _ in cdr_json.BACKENDS if n == 'json' or installed(n)][0]
+    assert cdr_json.backend().name == expected
+
+def test_falls_back_to_ujson(hide):
+    if not installed('ujson'):
+        pytest.skip('ujson not installed')
+    hide('orjson')
+    assert cdr_json.backend().name == 'ujson'
+
+def test_falls_back_to_json(hide):
+    hide('orjson', 'ujson')
+    assert cdr_json.backend().name == 'json'
+    with pytest.raises(ImportError):
+        cdr_json.backend('orjson')
+    with pytest.raises(ImportError):
+        cdr_json.backend('ujson')
+    assert CDRouter('http://localhost', token='x').json_backend.name == 'json'
+
+def test_named_and_passthrough():
+    b = cdr_json.backend('json')
+    assert b.name == 'json'
+    assert cdr_json.backend(b) is b
+    with pytest.raises(ValueError):
+        cdr_json.backend('simplejson')
+
+@pytest.mark.parametrize('b', available(), ids=lambda b: b.name)
+def test_round_trip(b):
+    obj = {'id': '1', 'tags': ['a', '/b', u'é'], 'n': 2**40, 'ok': True, 'none': None, 'f': 1.5}
+    doc = b.dumps(obj)
+    assert isinstance(doc, bytes)
+    assert b.loads(doc) == obj
+    assert cdr_json.backend('json').loads(doc) == obj
+    # orjson can't encode these itself
+    assert b.loads(b.dumps({'n': 2**70})) == {'n': 2**70}
+    assert b.loads(b.dumps({'ids': (1, 2)})) == {'ids': [1, 2]}
+
+def test_client_with_fallback(server, hide):
+    hide('orjson', 'ujson')
+    c = CDRouter(server.url, token='x')
+    assert c.results.get(3).id == 3
+    c.results.edit(c.results.get(4))
+    assert server.state.writes[0][1] == '/api/v1/results/4/'
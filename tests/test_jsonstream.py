@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+import gc
+import json
+
+from cdrouter import CDRouter
+from cdrouter.cdr_jsonstream import ArrayParser, StreamData
+
+import pytest
+
+DOC = {
+    'timestamp': '2020-01-01T00:00:00Z',
+    'data': [
+        {'id': '1', 'name': u'café 日本 \U0001f600', 'n': 12345, 'f': -1.5e10},
+        {'id': '2', 'nested': {'a': [1, 2, {'b': None}]}, 'ok': True},
+        123456789,
+        u'é',
+        [],
+    ],
+    'links': {'first': 1, 'last': 1, 'total': 5},
+}
+
+def parse(body, splits):
+    p = ArrayParser()
+    items = []
+    start = 0
+    for end in splits:
+        items.extend(p.feed(body[start:end]))
+        start = end
+    items.extend(p.feed(body[start:]))
+    items.extend(p.close())
+    return items, p.envelope
+
+def test_every_split():
+    body = json.dumps(DOC, ensure_ascii=False).encode('utf-8')
+    envelope = dict(DOC, data=[])
+    for i in range(len(body) + 1):
+        items, env = parse(body, [i])
+        assert items == DOC['data']
+        assert env == envelope
+
+def test_byte_at_a_time():
+    body = json.dumps(DOC, ensure_ascii=False, indent=2).encode('utf-8')
+    items, env = parse(body, range(len(body)))
+    assert items == DOC['data']
+    assert env['links'] == DOC['links']
+
+def test_number_split():
+    # a number ending a chunk may go on in the next one
+    items, _ = parse(b'{"data": [12, 345]}', [11, 12])
+    assert items == [12, 345]
+    items, _ = parse(b'{"data": [-1.5e10]}', [12, 14])
+    assert items == [-1.5e10]
+
+@pytest.mark.parametrize('body', [
+    b'{"data": [1, 2], "links": {"total": 2}, "timestamp": "t"}',
+    b'{"links": {"total": 2}, "timestamp": "t", "data": [1, 2]}',
+    b'{"links": {"total": 2}, "data": [1, 2], "timestamp": "t"}',
+])
+def test_envelope_around_data(body):
+    items, env = parse(body, [len(body) // 2])
+    assert items == [1, 2]
+    assert env == {'data': [], 'links': {'total': 2}, 'timestamp': 't'}
+
+def test_no_data():
+    items, env = parse(b'{"error": "no such result"}', [])
+    assert items == []
+    assert env == {'error': 'no such result'}
+
+@pytest.mark.parametrize('body', [
+    b'{"data": [1, 2',
+    b'{"data": [1, 2]',
+    b'{"data": [{"id": "1"',
+    b'{"data": [12',
+    b'{"data": [1] "x"',
+    b'{"data": []} trailing',
+    b'[1, 2]',
+    b'{"data": ["\xc3"]}',
+])
+def test_truncated_or_invalid(body):
+    p = ArrayParser()
+    with pytest.raises(ValueError):
+        p.feed(body)
+        p.close()
+
+class Resp(object):
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed += 1
+
+def test_stream_data_close():
+    resp = Resp()
+    gen = iter([1, 2, 3])
+    data = StreamData((x for x in gen), resp)
+    assert next(data) == 1
+    data.close()
+    assert resp.closed == 1
+    assert list(data) == []
+
+def test_stream_data_del():
+    resp = Resp()
+    data = StreamData((x for x in [1]), resp)
+    del data
+    gc.collect()
+    assert resp.closed == 1
+
+def test_client_stream(server):
+    c = CDRouter(server.url, token='x')
+    data, links = c.results.list(stream=True, limit=10)
+    assert [r.id for r in data] == list(range(1, 11))
+    assert links.total == 50
+    assert links.next == 2
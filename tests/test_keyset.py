@@ -0,0 +1,59 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+from functools import partial
+
+from cdrouter import CDRouter
+from cdrouter.alerts import AlertsService
+from cdrouter.cdr_error import CDRouterError
+from cdrouter.cdrouter import Links
+from cdrouter.history import HistoryService
+from cdrouter import testresults
+
+import pytest
+
+class Row(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+class FakeAlerts(AlertsService):
+    """Alerts of one result, idx 1 to 10, without idx unless detailed."""
+    def __init__(self, service, total=10, detailed_idx=True):
+        super(FakeAlerts, self).__init__(service)
+        self.total = total
+        self.detailed_idx = detailed_idx
+        self.calls = []
+
+    def list(self, id, filter=None, type=None, sort=None, limit=None, page=None, detailed=None, stream=None): # pylint: disable=redefined-builtin,arguments-differ
+        self.calls.append((list(map(str, filter)), detailed))
+        after = int(str(filter[-1]).split('>')[1]) if filter else 0
+        idx = list(range(after + 1, min(after + 4, self.total) + 1))
+        rows = [Row(id=id, idx=i if detailed and self.detailed_idx else None) for i in idx]
+        return rows, Links(next=None if not idx or idx[-1] == self.total else 2, limit=4)
+
+@pytest.fixture
+def c():
+    return CDRouter('http://localhost', token='x')
+
+def test_keyset_uses_service_key(c):
+    a = FakeAlerts(c)
+    rows = list(c.iter_list(partial(a.list, 5), keyset=True))
+    assert [r.idx for r in rows] == list(range(1, 11))
+    assert all(r.id == 5 for r in rows)
+    # the summary leaves idx out, so the first page is fetched again in full
+    assert a.calls[0] == ([], None)
+    assert a.calls[1] == ([], True)
+    assert a.calls[2] == (['idx>4'], True)
+
+def test_keyset_missing_key(c):
+    a = FakeAlerts(c, detailed_idx=False)
+    with pytest.raises(CDRouterError):
+        list(c.iter_list(partial(a.list, 5), keyset=True))
+
+def test_keyset_rejects_non_unique_id(c):
+    with pytest.raises(CDRouterError):
+        list(c.iter_list(HistoryService(c).list, keyset=True))
+    with pytest.raises(CDRouterError):
+        list(c.iter_list(partial(testresults.TestResultsService(c).list, 1), keyset='id'))
@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+import asyncio
+import threading
+import time
+
+from cdrouter import CDRouter
+from cdrouter.aio import AsyncCDRouter
+from cdrouter.cdr_limit import BULK, DOWNLOADS, METADATA, UPLOADS, Limit, RateLimiter, release_on_close
+
+def test_reserve():
+    l = Limit(rate=10, burst=2)
+    assert l.reserve() == 0
+    assert l.reserve() == 0
+    assert 0 < l.reserve() <= 0.1
+    assert Limit().reserve() == 0
+
+def test_max_in_flight():
+    l = Limit(max_in_flight=1)
+    l.acquire()
+    got = threading.Event()
+
+    def second():
+        l.acquire()
+        got.set()
+
+    t = threading.Thread(target=second)
+    t.start()
+    assert not got.wait(0.1)
+    l.release()
+    assert got.wait(5)
+    t.join()
+    l.release()
+
+def test_classify():
+    assert RateLimiter.classify('POST', files={'file': 'x'}) == UPLOADS
+    assert RateLimiter.classify('GET', stream=True) == DOWNLOADS
+    assert RateLimiter.classify('POST', params={'bulk': True}) == BULK
+    assert RateLimiter.classify('GET') == METADATA
+    downloads = Limit()
+    rl = RateLimiter({DOWNLOADS: downloads})
+    assert rl.limit_for('GET', stream=True) is downloads
+    assert rl.limit_for('GET') is None
+
+def test_release_on_close():
+    class Resp(object):
+        closed = 0
+
+        def close(self):
+            self.closed += 1
+
+    released = []
+    r = Resp()
+    release_on_close(r, lambda: released.append(True))
+    r.close()
+    r.close()
+    assert r.closed == 2
+    assert len(released) == 1
+
+def run_with_timeout(fn, timeout=20):
+    errors = []
+
+    def run():
+        try:
+            fn()
+        except BaseException as e: # pylint: disable=broad-except
+            errors.append(e)
+
+    t = threading.Thread(target=run)
+    t.daemon = True
+    t.start()
+    t.join(timeout)
+    assert not t.is_alive(), 'deadlocked'
+    if errors:
+        raise errors[0]
+
+def test_stream_page_not_iterated_releases_slot(server):
+    c = CDRouter(server.url, token='x', rate_limiter=RateLimiter({DOWNLOADS: Limit(max_in_flight=1)}))
+
+    def pages():
+        for _ in range(3):
+            # dropped without reading its data
+            c.results.list(stream=True, limit=5)
+        page = c.results.list(stream=True, limit=5)
+        assert len(list(page.data)) == 5
+
+    run_with_timeout(pages)
+
+def test_async_stream_page_not_iterated_releases_slot(server):
+    async def pages():
+        rl = RateLimiter({DOWNLOADS: Limit(max_in_flight=1)})
+        async with AsyncCDRouter(server.url, token='x', rate_limiter=rl) as c:
+            for _ in range(3):
+                await c.results.list(stream=True, limit=5)
+            page = await c.results.list(stream=True, limit=5)
+            assert len([r async for r in page.data]) == 5
+
+    asyncio.run(asyncio.wait_for(pages(), 20))
+
+def test_rate(server):
+    c = CDRouter(server.url, token='x', rate_limiter=RateLimiter(default=Limit(rate=20, burst=1)))
+    start = time.time()
+    for i in range(5):
+        c.results.get(i + 1)
+    assert time.time() - start >= 0.15
@@ -0,0 +1,44 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+from cdrouter import CDRouter
+from cdrouter.cdr_pagesize import PageSizer
+
+def test_adaptable():
+    assert PageSizer.adaptable(None)
+    assert PageSizer.adaptable(50)
+    assert PageSizer.adaptable('50')
+    assert not PageSizer.adaptable('none')
+
+def test_next_limit():
+    s = PageSizer(1.0, max_limit=400)
+    # fast pages grow by at most a factor of two, up to max_limit
+    assert s.next_limit(100, 100, 0.01) == 200
+    assert s.next_limit(300, 300, 0.01) == 400
+    # slow pages shrink by at most half
+    assert s.next_limit(100, 100, 10) == 50
+    assert s.next_limit(100, 0, 1) == 100
+
+def test_next_limit_by_page():
+    s = PageSizer(1.0)
+    # doubling keeps offset // limit + 1 on the next page
+    assert s.next_limit(100, 100, 0.01, offset=200) == 200
+    assert s.next_limit(100, 100, 0.01, offset=300) == 100
+    assert s.next_limit(100, 100, 10, offset=300) == 50
+    assert s.next_limit(25, 25, 10, offset=300) == 25
+
+def test_iter_list_adapts(server):
+    server.state.results = 300
+    c = CDRouter(server.url, token='x')
+    ids = [r.id for r in c.results.iter_list(limit=10, page_time=10)]
+    assert ids == list(range(1, 301))
+    # pages grew from the first limit of 10
+    assert len(server.state.hits) < 30
+
+def test_iter_list_limit_none(server):
+    c = CDRouter(server.url, token='x')
+    ids = [r.id for r in c.results.iter_list(limit='none', page_time=1)]
+    assert ids == list(range(1, 51))
+    assert len(server.state.hits) == 1
@@ -0,0 +1,69 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+import os
+
+import requests
+
+from cdrouter import CDRouter
+from cdrouter.cdr_error import CDRouterError
+from cdrouter.cdr_retry import RetryPolicy
+
+import pytest
+
+BLOB = bytes(bytearray(i % 251 for i in range(30000)))
+
+@pytest.fixture
+def blob(server):
+    server.state.blob = BLOB
+    server.state.etag = '"v1"'
+    return server
+
+def test_download(blob, tmpdir):
+    c = CDRouter(blob.url, token='x')
+    path, filename = c.download_range('blob/', str(tmpdir), ranges=3)
+    assert filename == 'blob.bin'
+    with open(path, 'rb') as fd:
+        assert fd.read() == BLOB
+    assert sorted(blob.state.ranges)[1:] == [(10000, 19999), (20000, 29999)]
+    assert os.listdir(str(tmpdir)) == ['blob.bin']
+
+def test_resume(blob, tmpdir):
+    dest = str(tmpdir.join('blob.bin'))
+    blob.state.drops = 4
+    c = CDRouter(blob.url, token='x', retry_policy=False)
+    with pytest.raises(requests.exceptions.RequestException):
+        c.download_range('blob/', dest, ranges=3, chunk_size=100)
+    assert os.path.exists(dest + '.part')
+    assert os.path.exists(dest + '.part.json')
+
+    blob.state.drops = 0
+    del blob.state.ranges[:]
+    c.download_range('blob/', dest, ranges=3, chunk_size=100)
+    with open(dest, 'rb') as fd:
+        assert fd.read() == BLOB
+    # the first range picked up where it stopped, the others at most
+    # where they started
+    ranges = sorted(blob.state.ranges)
+    assert ranges[0] == (1000, 9999)
+    assert [end for _, end in ranges] == [9999, 19999, 29999]
+    assert ranges[1][0] >= 10000 and ranges[2][0] >= 20000
+    assert sorted(os.listdir(str(tmpdir))) == ['blob.bin']
+
+def test_retry_resumes_range(blob, tmpdir):
+    dest = str(tmpdir.join('blob.bin'))
+    blob.state.drops = 2
+    c = CDRouter(blob.url, token='x', retry_policy=RetryPolicy(backoff=0))
+    c.download_range('blob/', dest, ranges=1, chunk_size=100)
+    with open(dest, 'rb') as fd:
+        assert fd.read() == BLOB
+    assert blob.state.ranges == [(0, 29999), (1000, 29999), (2000, 29999)]
+
+def test_changed_twice(blob, tmpdir):
+    blob.state.etag_every = True
+    c = CDRouter(blob.url, token='x')
+    with pytest.raises(CDRouterError, match='changed'):
+        c.download_range('blob/', str(tmpdir.join('blob.bin')), ranges=3)
+    assert not os.listdir(str(tmpdir))
@@ -0,0 +1,51 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+from cdrouter import CDRouter
+from cdrouter.cdr_error import CDRouterError
+from cdrouter.cdr_retry import RetryPolicy
+
+import pytest
+
+def test_retryable():
+    p = RetryPolicy()
+    assert p.retryable('GET')
+    assert not p.retryable('POST')
+    assert p.retryable('POST', idempotent=True)
+
+def test_wait_backoff():
+    p = RetryPolicy(total=3, backoff=0.5, max_backoff=1)
+    assert p.wait('GET', 'results/', 0, status=404) is None
+    for attempt, most in ((0, 0.5), (1, 1), (2, 1)):
+        for _ in range(20):
+            assert 0 <= p.wait('GET', 'results/', attempt, status=503) <= most
+    assert p.wait('GET', 'results/', 3, status=503) is None
+    assert p.counts['retries'] == 60
+    assert p.counts[503] == 60
+    assert p.counts['exhausted'] == 1
+
+def test_wait_retry_after_and_hook():
+    calls = []
+    p = RetryPolicy(max_backoff=5, hook=lambda *args: calls.append(args))
+    assert p.wait('GET', 'results/', 0, status=429, retry_after='2') == 2
+    assert p.wait('GET', 'results/', 0, status=429, retry_after='60') == 5
+    assert p.wait('GET', 'results/', 0, error=IOError('reset')) is not None
+    assert calls[0] == ('GET', 'results/', 0, 2, 429)
+    assert p.counts['OSError'] == 1
+
+def test_retries_requests(server):
+    server.state.fail_next = 2
+    c = CDRouter(server.url, token='x', retry_policy=RetryPolicy(backoff=0))
+    assert c.results.get(1).id == 1
+    assert len(server.state.hits) == 3
+    assert c.retry_policy.counts['retries'] == 2
+
+def test_gives_up(server):
+    server.state.fail_next = 5
+    c = CDRouter(server.url, token='x', retry_policy=RetryPolicy(total=1, backoff=0))
+    with pytest.raises(CDRouterError):
+        c.results.get(1)
+    assert len(server.state.hits) == 2
+    assert c.retry_policy.counts['exhausted'] == 1
@@ -0,0 +1,44 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+from cdrouter import CDRouter
+
+def test_not_modified(server):
+    server.state.result_etag = '"r1"'
+    c = CDRouter(server.url, token='x', revalidate=True)
+    r1 = c.results.get(1)
+    r2 = c.results.get(1)
+    assert len(server.state.hits) == 2
+    assert server.state.not_modified == 1
+    assert r1.status == r2.status == 'completed'
+    # each call gets its own copy of the models
+    assert r1 is not r2
+    assert len(c.validators) == 1
+
+def test_unchanged_body(server):
+    c = CDRouter(server.url, token='x', revalidate=True)
+    c.results.get(1)
+    prev = c.validators.get(c.base, 'results/1/')
+    c.results.get(1)
+    # the same body again is reused like a 304
+    assert server.state.not_modified == 0
+    assert c.validators.get(c.base, 'results/1/') is prev
+
+def test_changed(server):
+    server.state.result_etag = '"r1"'
+    c = CDRouter(server.url, token='x', revalidate=True)
+    assert c.results.get(1).status == 'completed'
+    server.state.result_etag = '"r2"'
+    server.state.status = 'stopped'
+    assert c.results.get(1).status == 'stopped'
+    assert c.results.get(1).status == 'stopped'
+    assert server.state.not_modified == 1
+
+def test_off(server):
+    server.state.result_etag = '"r1"'
+    c = CDRouter(server.url, token='x')
+    c.results.get(1)
+    c.results.get(1)
+    assert server.state.not_modified == 0
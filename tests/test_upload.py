@@ -0,0 +1,58 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+import asyncio
+from email.parser import BytesParser
+import io
+import os
+
+from cdrouter import CDRouter
+from cdrouter.aio import AsyncCDRouter
+
+DATA = os.urandom(3 * 1024 * 1024 + 17)
+
+def parts(write):
+    _, _, _, headers, body = write
+    ctype = dict((k.lower(), v) for k, v in headers.items())['content-type']
+    assert ctype.startswith('multipart/form-data; boundary=')
+    msg = BytesParser().parsebytes(b'Content-Type: ' + ctype.encode() + b'\r\n\r\n' + body)
+    return [(p.get_param('name', header='content-disposition'), p.get_filename(), p.get_payload(decode=True))
+            for p in msg.get_payload()]
+
+def check_progress(calls, total):
+    assert len(calls) > 1
+    assert all(t == total for _, t in calls)
+    sent = [s for s, _ in calls]
+    assert sent == sorted(sent)
+    assert sent[-1] == total
+
+def test_upload(server):
+    c = CDRouter(server.url, token='x')
+    calls = []
+    c.attachments.create(1, io.BytesIO(DATA), filename='big.bin', progress=lambda *args: calls.append(args))
+    write = server.state.writes[0]
+    assert write[:2] == ('POST', '/api/v1/devices/1/attachments/')
+    assert parts(write) == [('file', 'big.bin', DATA)]
+    # streamed with a known length rather than chunked
+    length = int(write[3]['Content-Length'])
+    assert length == len(write[4])
+    check_progress(calls, length)
+
+def test_upload_without_progress(server):
+    c = CDRouter(server.url, token='x')
+    c.attachments.create(1, io.BytesIO(b'small'), filename='small.txt')
+    assert parts(server.state.writes[0]) == [('file', 'small.txt', b'small')]
+
+def test_async_upload(server):
+    calls = []
+
+    async def main():
+        async with AsyncCDRouter(server.url, token='x') as c:
+            await c.attachments.create(1, io.BytesIO(DATA), filename='big.bin',
+                                       progress=lambda *args: calls.append(args))
+
+    asyncio.run(asyncio.wait_for(main(), 20))
+    assert parts(server.state.writes[0]) == [('file', 'big.bin', DATA)]
+    check_progress(calls, len(DATA))
@@ -0,0 +1,137 @@
+#
+# Copyright (c) 2020 by QA Cafe.
+# All Rights Reserved.
+#
+
+import threading
+import time
+
+from cdrouter.cdr_watch import Watch, Watcher
+from cdrouter.results import Result, Update
+from cdrouter import testresults
+
+def test_watch_dedups_updates():
+    w = Watch(1)
+    tr = testresults.TestResult(seq=1)
+    assert w.handle(Update(id=3, updates=[tr], running=tr)) == [tr]
+    assert w.update_id == 3
+    assert w.handle(Update(id=3, updates=[tr], running=tr)) == []
+    assert not w.finished
+
+def test_watch_backoff():
+    w = Watch(1, min_interval=0.0, max_interval=1.0)
+    running = testresults.TestResult(seq=1)
+    intervals = []
+    for _ in range(4):
+        w.handle(Update(running=running))
+        intervals.append(w.interval)
+    assert intervals == [0.25, 0.5, 1.0, 1.0]
+    assert not w.check
+    # a poll the server held open isn't backed off further
+    w.handle(Update(running=running), elapsed=1.0)
+    assert w.interval == 0.0
+    w.handle(Update(running=running))
+    w.handle(Update(id=1, updates=[], running=running))
+    assert w.interval == 0.0
+
+def test_watch_checks_idle_result():
+    w = Watch(1)
+    w.handle(Update())
+    assert w.check
+    assert w.handle_result(Result(id=1, status='running')) == []
+    assert not w.finished
+    w.handle(Update())
+    r = Result(id=1, status='completed')
+    assert w.handle_result(r) == [r]
+    assert w.finished
+
+def test_watch_finished_update():
+    w = Watch(1)
+    r = Result(id=1, status='stopped')
+    w.handle(Update(id=1, updates=[testresults.TestResult(seq=1), r]))
+    assert w.finished
+
+class FakeResults(object):
+    """Results service with three updates per result: two test results
+    then the finished result."""
+    def __init__(self, fail=()):
+        self.fail = fail
+        self.lock = threading.Lock()
+        self.inflight = 0
+        self.most = 0
+        self.polls = []
+
+    def updates(self, id, update_id=None): # pylint: disable=redefined-builtin
+        with self.lock:
+            self.inflight += 1
+            self.most = max(self.most, self.inflight)
+            self.polls.append(id)
+        try:
+            time.sleep(0.01)
+            if id in self.fail:
+                raise IOError('poll failed')
+            n = (update_id or 0) + 1
+            if n < 3:
+                return Update(id=n, updates=[testresults.TestResult(id=id, seq=n)], running=testresults.TestResult(id=id, seq=n))
+            return Update(id=n, updates=[Result(id=id, status='completed')])
+        finally:
+            with self.lock:
+                self.inflight -= 1
+
+    def get(self, id, cached=True): # pylint: disable=redefined-builtin,unused-argument
+        return Result(id=id, status='completed')
+
+class FakeCDRouter(object):
+    def __init__(self, results):
+        self.results = results
+
+def test_watcher_polls_every_result():
+    c = FakeCDRouter(FakeResults())
+    with Watcher(max_workers=2) as w:
+        for i in range(10):
+            w.add(c, i)
+        w.add(c, 0)
+        seen = {}
+        for e in w:
+            assert e.c is c
+            seen.setdefault(e.id, []).append(e.item)
+    assert sorted(seen) == list(range(10))
+    for items in seen.values():
+        assert [type(i) for i in items] == [testresults.TestResult, testresults.TestResult, Result]
+    assert c.results.most <= 2
+    assert len(c.results.polls) == 30
+
+def test_watcher_emits_errors():
+    c = FakeCDRouter(FakeResults(fail=(1,)))
+    with Watcher(max_workers=2) as w:
+        w.add(c, 1)
+        w.add(c, 2)
+        events = list(w)
+    errors = [e for e in events if isinstance(e.item, Exception)]
+    assert [e.id for e in errors] == [1]
+    assert c.results.polls.count(1) == 1
+    assert len([e for e in events if e.id == 2]) == 3
+
+def test_watcher_polls_in_order_due():
+    c = FakeCDRouter(FakeResults())
+    with Watcher(max_workers=1) as w:
+        w.add(c, 2)
+        w.add(c, 1)
+        added = False
+        for e in w:
+            if not added:
+                # results can be added from the loop body
+                w.add(c, 3)
+                added = True
+    assert c.results.polls[:4] == [2, 1, 2, 3]
+
+def test_watcher_remove():
+    c = FakeCDRouter(FakeResults())
+    with Watcher(max_workers=1) as w:
+        w.add(c, 1)
+        w.add(c, 2)
+        events = []
+        for e in w:
+            events.append(e)
+            w.remove(c, 2)
+    assert set(e.id for e in events) == set([1])